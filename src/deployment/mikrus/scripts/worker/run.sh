@@ -2,4 +2,4 @@
 
 set -e
 
-celery -A psmproject.celery worker -l INFO --concurrency 2
+celery -A psmproject.celery worker -B -l INFO --concurrency 2
@@ -1,4 +1,4 @@
-from chatapp.models import Chat, Message, Participant
+from chatapp.models import Chat, Message, MessageTombstone, Participant
 from django.contrib import admin  # noqa
 
-admin.site.register([Chat, Participant, Message])
+admin.site.register([Chat, Participant, Message, MessageTombstone])
@@ -0,0 +1,252 @@
+import asyncio
+import atexit
+import logging
+from typing import Dict, List
+from uuid import uuid4
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from chatapp.models import Chat, Message, Participant
+from chatapp.utils.group_names import chat_group_name
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+logger = logging.getLogger(__name__)
+
+PROVISIONAL_ID_PREFIX = "tmp-"
+
+
+def is_provisional_id(message_id) -> bool:
+    return str(message_id).startswith(PROVISIONAL_ID_PREFIX)
+
+
+class MessageBuffer:
+    """
+    Write-behind buffer for chat messages. Messages validated by consumers are queued in process memory with
+    a provisional id and persisted with a single bulk_create once the batch size or the flush interval is reached.
+    Once a batch is persisted, chat groups are told which real id replaces each provisional one.
+    When a batch cannot be saved, its messages are saved one by one. Messages which still fail are kept for the next
+    flush and dropped after CHAT_WRITE_BEHIND_MAX_ATTEMPTS attempts, so one broken message does not block the buffer.
+    Durability:
+    - "shutdown": pending messages are flushed on thresholds and when the process exits
+    - "disconnect": as above, and pending messages are also flushed before a websocket connection is closed
+    """
+
+    def __init__(self, max_batch=None, flush_interval=None, durability=None, notify=True):
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._durability = durability
+        self.notify = notify
+        self._pending: List[tuple[str, Message]] = []
+        self._attempts: Dict[str, int] = {}
+        self._timer = None
+        self._exit_hook_registered = False
+
+    @property
+    def max_batch(self):
+        return self._max_batch or settings.CHAT_WRITE_BEHIND_MAX_BATCH
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or settings.CHAT_WRITE_BEHIND_FLUSH_INTERVAL
+
+    @property
+    def durability(self):
+        return self._durability or settings.CHAT_WRITE_BEHIND_DURABILITY
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def add(self, message: Message) -> str:
+        """
+        Queue validated message and return its provisional id
+        """
+        provisional_id = f"{PROVISIONAL_ID_PREFIX}{uuid4().hex}"
+        self._pending.append((provisional_id, message))
+        self._register_exit_hook()
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        else:
+            self._schedule_flush()
+        return provisional_id
+
+    async def flush(self) -> Dict[str, int]:
+        batch = self._take_batch()
+        if not batch:
+            return {}
+        try:
+            persisted = await database_sync_to_async(self.persist)(batch)
+        except Exception:
+            logger.exception("Chat messages could not be persisted in batch, saving %s messages one by one", len(batch))
+            persisted = await database_sync_to_async(self.persist_each)(batch)
+            self._keep_failed(batch, persisted)
+        if self.notify and persisted:
+            await self.send_persisted_notifications(batch, persisted)
+        return persisted
+
+    def flush_sync(self) -> Dict[str, int]:
+        """
+        Persist pending messages without event loop, used on process shutdown
+        """
+        batch = self._take_batch()
+        if not batch:
+            return {}
+        try:
+            return self.persist(batch)
+        except Exception:
+            logger.exception("Chat messages could not be persisted in batch, saving %s messages one by one", len(batch))
+            return self.persist_each(batch)
+
+    @staticmethod
+    def persist(batch) -> Dict[str, int]:
+        messages = [message for _, message in batch]
+        by_chat: Dict[int, List[Message]] = {}
+        with transaction.atomic():
+            Message.objects.bulk_create(messages)
+            for message in messages:
+                by_chat.setdefault(message.chat_id, []).append(message)
+            for chat_id, chat_messages in by_chat.items():
+                Chat.messages_added(chat_id, len(chat_messages), chat_messages[-1])
+        return {provisional_id: message.pk for provisional_id, message in batch}
+
+    @staticmethod
+    def persist_each(batch) -> Dict[str, int]:
+        """
+        Persist messages one by one, leaving out the ones which cannot be saved
+        """
+        persisted = {}
+        for provisional_id, message in batch:
+            # ids may be set by a bulk_create rolled back afterwards
+            message.pk = None
+            message._state.adding = True
+            try:
+                message.save()
+            except Exception:
+                logger.exception("Chat message %s could not be persisted", provisional_id)
+            else:
+                persisted[provisional_id] = message.pk
+        return persisted
+
+    async def send_persisted_notifications(self, batch, persisted):
+        channel_layer = get_channel_layer()
+        by_chat: Dict[int, Dict[str, int]] = {}
+        for provisional_id, message in batch:
+            if provisional_id in persisted:
+                by_chat.setdefault(message.chat_id, {})[provisional_id] = persisted[provisional_id]
+        for chat_id, ids in by_chat.items():
+            await channel_layer.group_send(
+                chat_group_name(chat_id), {"type": "messages_persisted", "chat_id": chat_id, "ids": ids}
+            )
+
+    def _take_batch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, lambda: asyncio.ensure_future(self.flush()))
+
+    def _keep_failed(self, batch, persisted):
+        failed = []
+        for provisional_id, message in batch:
+            attempts = self._attempts.pop(provisional_id, 0) + 1
+            if provisional_id in persisted:
+                continue
+            if attempts >= settings.CHAT_WRITE_BEHIND_MAX_ATTEMPTS:
+                logger.error("Chat message %s dropped after %s failed attempts", provisional_id, attempts)
+                continue
+            self._attempts[provisional_id] = attempts
+            failed.append((provisional_id, message))
+        if failed:
+            self._pending[:0] = failed
+            self._schedule_flush()
+
+    def _register_exit_hook(self):
+        if not self._exit_hook_registered:
+            atexit.register(self.flush_sync)
+            self._exit_hook_registered = True
+
+
+class ReadCursorBuffer:
+    """
+    Collects "seen" notifications of chat participants and moves their read cursors in batches.
+    Only the newest seen message id of each participant is kept, pending cursors are saved with a single UPDATE
+    once the flush interval has elapsed, when a connection is closed and when the process exits.
+    Read cursors never move backwards. When the UPDATE fails, cursors are saved one by one and the ones which still
+    fail are dropped, as the next "seen" notification of the participant sends a newer cursor anyway.
+    """
+
+    def __init__(self, flush_interval=None):
+        self._flush_interval = flush_interval
+        self._pending: Dict[int, int] = {}
+        self._timer = None
+        self._exit_hook_registered = False
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or settings.CHAT_READ_CURSOR_FLUSH_INTERVAL
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, participant_id: int, message_id: int):
+        self._pending[participant_id] = max(message_id, self._pending.get(participant_id, 0))
+        if not self._exit_hook_registered:
+            atexit.register(self.flush_sync)
+            self._exit_hook_registered = True
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self) -> int:
+        cursors = self._take_cursors()
+        if not cursors:
+            return 0
+        return await database_sync_to_async(self.persist_or_save_each)(cursors)
+
+    def flush_sync(self) -> int:
+        cursors = self._take_cursors()
+        return self.persist_or_save_each(cursors) if cursors else 0
+
+    def persist_or_save_each(self, cursors: Dict[int, int]) -> int:
+        try:
+            with transaction.atomic():
+                return self.persist(cursors)
+        except Exception:
+            logger.exception("Read cursors could not be saved together, saving %s cursors one by one", len(cursors))
+        saved = 0
+        for participant_id, message_id in cursors.items():
+            try:
+                with transaction.atomic():
+                    saved += self.persist({participant_id: message_id})
+            except Exception:
+                logger.exception("Read cursor of participant %s dropped", participant_id)
+        return saved
+
+    @staticmethod
+    def persist(cursors: Dict[int, int]) -> int:
+        seen = Case(
+            *[When(pk=participant_id, then=Value(message_id)) for participant_id, message_id in cursors.items()],
+            default=F("last_read_message_id"),
+            output_field=Participant._meta.get_field("last_read_message_id"),
+        )
+        return Participant.objects.filter(pk__in=cursors.keys()).update(
+            last_read_message_id=Greatest(F("last_read_message_id"), seen)
+        )
+
+    def _take_cursors(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        cursors, self._pending = self._pending, {}
+        return cursors
+
+
+message_buffer = MessageBuffer()
+read_cursor_buffer = ReadCursorBuffer()
@@ -1,25 +1,48 @@
 import json
+from datetime import timedelta
 from typing import Dict, List
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from chatapp.buffer import is_provisional_id, message_buffer, read_cursor_buffer
 from chatapp.exceptions import DeleteMessageRightsMissing, MessageAuthorNotInChat
-from chatapp.models import Chat, Message, Participant, RoleChoices
-from chatapp.serializers import message_to_json, messages_to_json
+from chatapp.managers import parse_message_id
+from chatapp.models import Chat, Message, MessageTombstone, Participant, RoleChoices
+from chatapp.serializers import message_to_dict, messages_to_json, serialize_messages
+from chatapp.utils.group_names import chat_group_name, user_group_name
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from usersapp.helpers import has_group
 
 GROUP_TO_ROLE = {settings.GROUP_NAMES["MODERATOR"]: RoleChoices.MODERATOR}
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.chat_id = None
-        self.chat_group_name = None
-        self.user_group_name = None
+class ChatSubscription:
+    """
+    State and actions of one chat followed by a websocket connection: chat, participant role and moderator rights of
+    the connected user are cached here. Every frame sent for the chat is tagged with its chat id, so one connection
+    can follow several chats.
+    """
+
+    def __init__(self, consumer: "ChatConsumer", chat_id: int):
+        self.consumer = consumer
+        self.chat_id = chat_id
+        self.chat_group_name = chat_group_name(chat_id)
+        self.user_group_name = user_group_name(chat_id, consumer.user.id)
+        self.chat = None
+        self.participant = None
+        self.is_moderator = False
+
+    @property
+    def user(self):
+        return self.consumer.user
+
+    @property
+    def channel_layer(self):
+        return self.consumer.channel_layer
 
     @property
     def do_action(self):
@@ -29,61 +52,90 @@ class ChatConsumer(AsyncWebsocketConsumer):
             "join_chat": self.join_chat,
             "leave_chat": self.leave_chat,
             "delete_message": self.delete_message,
+            "mark_seen": self.mark_seen,
+            "sync_since": self.sync_since,
         }
 
-    async def connect(self):
-        self.chat_id = self.scope["url_route"]["kwargs"]["pk"]
-        self.chat_group_name = f"chat_{self.chat_id}"
-        username = self.scope["url_route"]["kwargs"]["username"]
-        user = await User.objects.aget(username=username)
-        self.user_group_name = f"{self.chat_group_name}_username_{user.id}"
-        await self.channel_layer.group_add(self.chat_group_name, self.channel_name)
-        await self.channel_layer.group_add(self.user_group_name, self.channel_name)
-        await self.accept()
+    @property
+    def can_follow_chat(self):
+        return self.participant is not None or self.is_moderator
 
-    async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.chat_group_name, self.channel_name)
+    async def add_to_groups(self):
+        await self.channel_layer.group_add(self.chat_group_name, self.consumer.channel_name)
+        await self.channel_layer.group_add(self.user_group_name, self.consumer.channel_name)
 
-    async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        await self.do_action[text_data_json["action"]](text_data_json)
+    async def discard_from_groups(self):
+        await self.channel_layer.group_discard(self.chat_group_name, self.consumer.channel_name)
+        await self.channel_layer.group_discard(self.user_group_name, self.consumer.channel_name)
+
+    async def reply(self, payload: Dict, fan_out=False):
+        """
+        Send response meant for the requesting user. In direct-reply mode it is sent straight to the requesting socket
+        without a channel layer round trip, unless fan out to all connections of the user to this chat is requested.
+        """
+        event = {"type": "data_response", "chat_id": self.chat_id} | payload
+        if settings.CHAT_DIRECT_REPLY and not fan_out:
+            await self.consumer.data_response(event)
+        else:
+            await self.channel_layer.group_send(self.user_group_name, event)
+
+    async def broadcast(self, payload: Dict):
+        """
+        Send response to all connections following the chat
+        """
+        await self.channel_layer.group_send(
+            self.chat_group_name, {"type": "data_response", "chat_id": self.chat_id} | payload
+        )
 
     async def send_new_message(self, data):
         content = data["content"]
         author = data["author"]
-        new_message = await self.save_message_in_db(content, author)
-        if isinstance(new_message, Message):
-            await self.channel_layer.group_send(
-                self.chat_group_name,
-                {
-                    "type": "data_response",
-                    "action": data["action"],
-                    "message": await message_to_json(new_message),
-                },
-            )
+        if settings.CHAT_WRITE_BEHIND:
+            new_message = await self.buffer_message(content, author)
         else:
-            await self.channel_layer.group_send(
-                self.user_group_name,
-                {
-                    "type": "data_response",
-                    "action": "throw_error",
-                }
-                | new_message,
-            )
+            new_message = await self.save_message_in_db(content, author)
+        if "error" not in new_message.keys():
+            await self.broadcast({"action": data["action"], "message": new_message})
+        else:
+            await self.reply({"action": "throw_error"} | new_message, fan_out=data.get("fan_out", False))
 
     async def fetch_messages(self, data):
-        chat_connection_timestamp = data["chat_connection_timestamp"]
-        visible_messages = data["visible_messages"]
         messages = await database_sync_to_async(Message.objects.get_chat_message_history)(
-            chat_id=self.chat_id, max_datetime=chat_connection_timestamp, visible_messages=visible_messages
+            chat_id=self.chat_id,
+            max_datetime=data["chat_connection_timestamp"],
+            last_message_id=data.get("last_message_id"),
+            page_size=data.get("page_size"),
         )
-        await self.channel_layer.group_send(
-            self.user_group_name,
+        await self.reply(
+            {"action": data["action"], "messages": await messages_to_json(messages)}, fan_out=data.get("fan_out", False)
+        )
+
+    async def sync_since(self, data):
+        """
+        Send to reconnecting client messages newer than the last one it holds and ids of messages deleted since its
+        last sync, instead of reloading chat history. Client repeats the sync while has_more is set, and reloads the
+        chat when reload is set because deletions older than tombstone retention are unknown.
+        """
+        synced_at = timezone.now()
+        try:
+            last_message_id, last_synced_at = self.parse_sync_state(data.get("last_message_id"), data.get("synced_at"))
+        except (TypeError, ValueError):
+            await self.reply(
+                {"action": "throw_error", "error": ["Invalid sync state, please reload the chat."]},
+                fan_out=data.get("fan_out", False),
+            )
+            return
+        changes = await self.get_changes_since(last_message_id, last_synced_at, data.get("limit"))
+        await self.reply(
             {
-                "type": "data_response",
                 "action": data["action"],
-                "messages": await messages_to_json(messages),
+                "messages": changes["messages"],
+                "deleted_message_ids": changes["deleted_message_ids"],
+                "has_more": changes["has_more"],
+                "reload": changes["reload"],
+                "synced_at": synced_at.isoformat(),
             },
+            fan_out=data.get("fan_out", False),
         )
 
     async def delete_message(self, data):
@@ -91,40 +143,95 @@ class ChatConsumer(AsyncWebsocketConsumer):
         requester = data["requester"]
         response = await self.delete_message_from_db(msg_id, requester)
         if "error" in response.keys():
-            await self.channel_layer.group_send(
-                self.user_group_name,
-                {
-                    "type": "data_response",
-                    "action": "throw_error",
-                }
-                | response,
-            )
+            await self.reply({"action": "throw_error"} | response, fan_out=data.get("fan_out", False))
         else:
-            await self.channel_layer.group_send(
-                self.chat_group_name,
-                {
-                    "type": "data_response",
-                    "action": data["action"],
-                    "notification": "Message has been removed.",
-                },
-            )
+            await self.broadcast({"action": data["action"], "notification": "Message has been removed."})
+
+    async def mark_seen(self, data):
+        """
+        Move read cursor of the connected participant, cursors are saved in batches by read_cursor_buffer.
+        Provisional and invalid message ids are ignored.
+        """
+        message_id = parse_message_id(data.get("message_id"))
+        if not self.participant or message_id is None:
+            return
+        read_cursor_buffer.add(self.participant.pk, message_id)
 
     async def join_chat(self, data):
-        await self.create_new_participant(data["user"])
-        await self.channel_layer.group_send(
-            self.user_group_name,
-            {"type": "data_response", "action": data["action"], "notification": "You have joined the chat."},
+        participant = await self.create_new_participant(data["user"])
+        await self.notify_participant_changed("participant_added", participant.user_id)
+        await self.reply(
+            {"action": data["action"], "notification": "You have joined the chat."}, fan_out=data.get("fan_out", False)
         )
 
     async def leave_chat(self, data):
-        await self.remove_participant(data["user"])
+        leaving_user_id = await self.remove_participant(data["user"])
+        await self.notify_participant_changed("participant_removed", leaving_user_id)
+        await self.reply(
+            {"action": data["action"], "notification": "You have left the chat."}, fan_out=data.get("fan_out", False)
+        )
+
+    async def notify_participant_changed(self, event_type, user_id):
+        """
+        Refresh membership cached on this connection and tell other connections to the chat to refresh theirs
+        """
+        if user_id == self.user.id:
+            await self.load_membership()
         await self.channel_layer.group_send(
-            self.user_group_name,
-            {"type": "data_response", "action": data["action"], "notification": "You have left the chat."},
+            self.chat_group_name,
+            {
+                "type": event_type,
+                "chat_id": self.chat_id,
+                "user_id": user_id,
+                "sender_channel": self.consumer.channel_name,
+            },
         )
 
-    async def data_response(self, event):
-        await self.send(text_data=json.dumps(event))
+    async def refresh_membership(self, event):
+        if event["user_id"] == self.user.id and event["sender_channel"] != self.consumer.channel_name:
+            await self.load_membership()
+
+    @database_sync_to_async
+    def load_membership(self):
+        """
+        Resolve chat, participant role and moderator rights of the connected user once and keep them on the connection
+        """
+        self.chat = Chat.objects.filter(pk=self.chat_id).first()
+        self.participant = self.chat.participants.filter(user=self.user).first() if self.chat else None
+        self.is_moderator = has_group(self.user, settings.GROUP_NAMES.get("MODERATOR"))
+
+    @staticmethod
+    def parse_sync_state(last_message_id, synced_at):
+        """
+        Last held message id and last sync time sent by the client, raises ValueError or TypeError when invalid
+        """
+        last_message_id = int(last_message_id or 0)
+        if last_message_id < 0:
+            raise ValueError("Message id must not be negative.")
+        if not synced_at:
+            return last_message_id, None
+        parsed = parse_datetime(synced_at)
+        if parsed is None:
+            raise ValueError("Invalid sync time.")
+        return last_message_id, timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+    @database_sync_to_async
+    def get_changes_since(self, last_message_id, synced_at, limit):
+        retention_start = timezone.now() - timedelta(days=settings.CHAT_TOMBSTONE_RETENTION_DAYS)
+        messages = serialize_messages(
+            Message.objects.get_messages_since(chat_id=self.chat_id, last_message_id=last_message_id, limit=limit)
+        )
+        tombstones = MessageTombstone.objects.filter(chat=self.chat_id, message_id__lte=last_message_id)
+        if synced_at:
+            tombstones = tombstones.filter(deleted_at__gte=synced_at)
+        return {
+            "messages": messages,
+            "deleted_message_ids": list(tombstones.values_list("message_id", flat=True)),
+            "has_more": Message.objects.filter(
+                chat=self.chat_id, pk__gt=messages[-1]["message_id"] if messages else last_message_id
+            ).exists(),
+            "reload": synced_at is None or synced_at < retention_start,
+        }
 
     @database_sync_to_async
     def create_new_participant(self, username):
@@ -139,34 +246,54 @@ class ChatConsumer(AsyncWebsocketConsumer):
         chat = Chat.objects.get(pk=self.chat_id)
         participant = Participant.objects.get(chat=chat, user=leaving_user)
         participant.delete()
+        return leaving_user.id
+
+    def build_message(self, content: str, author: str) -> Message:
+        """
+        Build and validate new message in process, relations come from the connection cache
+        """
+        if author != self.user.username or not self.participant:
+            raise MessageAuthorNotInChat
+        msg = Message(chat=self.chat, author=self.user, content=content)
+        msg.full_clean(exclude=["chat", "author"])
+        return msg
+
+    @staticmethod
+    def new_message_error(exception: Exception) -> Dict[str, List]:
+        if isinstance(exception, MessageAuthorNotInChat):
+            return {"error": ["You are not a participant to this chat."]}
+        if isinstance(exception, ValidationError):
+            return {"error": ["Your message could not be sent."] + exception.message_dict["content"]}
+        return {"error": ["Your message could not be sent, unexpected error:", str(exception)]}
 
     @database_sync_to_async
-    def save_message_in_db(self, content: str, author: str) -> Message | Dict[str, List]:
+    def save_message_in_db(self, content: str, author: str) -> Dict:
         try:
-            author = User.objects.get(username=author)
-            chat = Chat.objects.get(pk=self.chat_id)
-            if not chat.has_participant(author):
-                raise MessageAuthorNotInChat
-            msg = Message(chat=chat, author=author, content=content)
-            msg.full_clean()
+            msg = self.build_message(content, author)
             msg.save()
-            return msg
-        except MessageAuthorNotInChat:
-            return {"error": ["You are not a participant to this chat."]}
-        except ValidationError as ve:
-            return {"error": ["Your message could not be sent."] + ve.message_dict["content"]}
+            return message_to_dict(msg)
+        except Exception as e:
+            return self.new_message_error(e)
+
+    async def buffer_message(self, content: str, author: str) -> Dict:
+        """
+        Queue new message in write-behind buffer, message is broadcast with a provisional id until it is persisted
+        """
+        try:
+            msg = self.build_message(content, author)
         except Exception as e:
-            return {"error": ["Your message could not be sent, unexpected error:", str(e)]}
+            return self.new_message_error(e)
+        provisional_id = await message_buffer.add(msg)
+        return message_to_dict(msg) | {"message_id": provisional_id}
 
     @database_sync_to_async
     def delete_message_from_db(self, msg_id: int, requester: str) -> Dict:
         try:
-            message = Message.objects.get(pk=msg_id)
-            user_requester = User.objects.get(username=requester)
-            if (
-                message.author != user_requester
-                and not message.chat.has_participant(user_requester)
-                and not has_group(user_requester, settings.GROUP_NAMES.get("MODERATOR"))
+            if is_provisional_id(msg_id):
+                return {"error": ["This message is still being saved, please try again in a moment."]}
+            message = Message.objects.get(pk=msg_id, chat=self.chat_id)
+            if requester != self.user.username or (
+                message.author_id != self.user.id and not self.participant and not self.is_moderator
             ):
                 raise DeleteMessageRightsMissing
             message.delete()
@@ -175,3 +302,108 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return {"error": ["You must be author of this message or a Moderator to be able to delete this message"]}
         except Exception as e:
             return {"error": ["Your message could not be deleted, unexpected error:", str(e)]}
+
+
+class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    Websocket connection following the single chat given in its URL
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chat_id = None
+        self.user = None
+        self.subscriptions: Dict[int, ChatSubscription] = {}
+
+    async def connect(self):
+        self.chat_id = int(self.scope["url_route"]["kwargs"]["pk"])
+        await self.load_user()
+        await self.subscribe(self.chat_id)
+        await self.accept()
+
+    async def load_user(self):
+        username = self.scope["url_route"]["kwargs"]["username"]
+        self.user = await User.objects.select_related("profile").aget(username=username)
+
+    async def subscribe(self, chat_id: int) -> ChatSubscription:
+        subscription = ChatSubscription(self, chat_id)
+        await subscription.load_membership()
+        await subscription.add_to_groups()
+        self.subscriptions[chat_id] = subscription
+        return subscription
+
+    async def unsubscribe(self, chat_id: int):
+        subscription = self.subscriptions.pop(chat_id, None)
+        if subscription:
+            await subscription.discard_from_groups()
+
+    async def disconnect(self, close_code):
+        if settings.CHAT_WRITE_BEHIND and settings.CHAT_WRITE_BEHIND_DURABILITY == "disconnect":
+            await message_buffer.flush()
+        await read_cursor_buffer.flush()
+        for chat_id in list(self.subscriptions):
+            await self.unsubscribe(chat_id)
+
+    async def receive(self, text_data):
+        text_data_json = json.loads(text_data)
+        await self.subscriptions[self.chat_id].do_action[text_data_json["action"]](text_data_json)
+
+    async def data_response(self, event):
+        await self.send(text_data=json.dumps(event))
+
+    async def messages_persisted(self, event):
+        await self.send(
+            text_data=json.dumps({"action": "confirm_messages", "chat_id": event["chat_id"], "ids": event["ids"]})
+        )
+
+    async def participant_added(self, event):
+        await self.refresh_membership(event)
+
+    async def participant_removed(self, event):
+        await self.refresh_membership(event)
+
+    async def refresh_membership(self, event):
+        subscription = self.subscriptions.get(event["chat_id"])
+        if subscription:
+            await subscription.refresh_membership(event)
+
+
+class MultiplexChatConsumer(ChatConsumer):
+    """
+    Websocket connection following many chats at once. Client subscribes and unsubscribes to chats and tags every
+    action with chat_id, chat actions are the same as on ChatConsumer.
+    """
+
+    async def connect(self):
+        await self.load_user()
+        await self.accept()
+
+    async def receive(self, text_data):
+        text_data_json = json.loads(text_data)
+        action = text_data_json["action"]
+        chat_id = int(text_data_json["chat_id"])
+        if action == "subscribe":
+            await self.subscribe_to_chat(chat_id)
+        elif action == "unsubscribe":
+            await self.unsubscribe(chat_id)
+            await self.send_to_chat(chat_id, {"action": action})
+        elif chat_id in self.subscriptions:
+            await self.subscriptions[chat_id].do_action[action](text_data_json)
+        else:
+            await self.send_to_chat(
+                chat_id, {"action": "throw_error", "error": ["You are not subscribed to this chat."]}
+            )
+
+    async def subscribe_to_chat(self, chat_id: int):
+        if chat_id not in self.subscriptions:
+            subscription = await self.subscribe(chat_id)
+            if not subscription.can_follow_chat:
+                await self.unsubscribe(chat_id)
+                await self.send_to_chat(
+                    chat_id, {"action": "throw_error", "error": ["You are not allowed to follow this chat."]}
+                )
+                return
+        await self.send_to_chat(chat_id, {"action": "subscribe"})
+
+    async def send_to_chat(self, chat_id: int, payload: Dict):
+        await self.send(text_data=json.dumps({"chat_id": chat_id} | payload))
@@ -0,0 +1,71 @@
+"""
+Django command comparing websocket reply throughput and latency of channel layer replies and of direct replies
+"""
+
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from channels.testing import WebsocketCommunicator
+from chatapp.consumers import ChatConsumer
+from chatapp.models import Chat
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+
+User = get_user_model()
+
+IN_MEMORY_CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+class Command(BaseCommand):
+    help = "Measure frames/sec and latency of replies sent through the channel layer and of direct replies."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--frames", type=int, default=2000, help="number of request/reply frames in each mode")
+
+    def handle(self, *args, **options):
+        nb_frames = options["frames"]
+        user = User.objects.create(username=f"bench_{uuid4().hex[:12]}")
+        chat = Chat.objects.create()
+        chat.add_participant(user)
+        try:
+            results = {
+                "channel layer": self.measure(chat, user, nb_frames, direct_reply=False),
+                "direct reply": self.measure(chat, user, nb_frames, direct_reply=True),
+            }
+        finally:
+            chat.delete()
+            user.delete()
+        for mode, (elapsed, latencies) in results.items():
+            mean_ms = statistics.mean(latencies) * 1000
+            p95_ms = statistics.quantiles(latencies, n=20)[-1] * 1000
+            self.stdout.write(
+                f"{mode + ':':15}{nb_frames / elapsed:10.1f} frames/sec, "
+                f"latency mean {mean_ms:.3f} ms, p95 {p95_ms:.3f} ms"
+            )
+        speed_up = results["channel layer"][0] / results["direct reply"][0]
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: x{speed_up:.1f}"))
+
+    def measure(self, chat, user, nb_frames, direct_reply):
+        with override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, CHAT_DIRECT_REPLY=direct_reply):
+            return asyncio.run(self.request_replies(chat, user, nb_frames))
+
+    @staticmethod
+    async def request_replies(chat, user, nb_frames):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/bench/")
+        communicator.scope["url_route"] = {"kwargs": {"pk": chat.id, "username": user.username}}
+        await communicator.connect()
+        request = {"action": "fetch_messages", "chat_connection_timestamp": timezone.now().isoformat()}
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(nb_frames):
+            sent_at = time.perf_counter()
+            await communicator.send_json_to(request)
+            await communicator.receive_json_from()
+            latencies.append(time.perf_counter() - sent_at)
+        elapsed = time.perf_counter() - start
+        await communicator.disconnect()
+        return elapsed, latencies
@@ -0,0 +1,58 @@
+"""
+Django command comparing chat message write throughput of per-message saves and of the write-behind buffer
+"""
+
+import asyncio
+import time
+from uuid import uuid4
+
+from channels.db import database_sync_to_async
+from chatapp.buffer import MessageBuffer
+from chatapp.models import Chat, Message
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure messages/sec of per-message saves and of write-behind buffered saves."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000, help="number of messages written in each mode")
+        parser.add_argument("--batch", type=int, default=100, help="write-behind batch size")
+
+    def handle(self, *args, **options):
+        nb_messages = options["messages"]
+        chat = Chat.objects.create()
+        author = User.objects.create(username=f"bench_{uuid4().hex[:12]}")
+        try:
+            per_message = asyncio.run(self.per_message_writes(chat, author, nb_messages))
+            buffered = asyncio.run(self.buffered_writes(chat, author, nb_messages, options["batch"]))
+        finally:
+            chat.delete()
+            author.delete()
+        self.stdout.write(f"per-message: {nb_messages / per_message:10.1f} messages/sec")
+        self.stdout.write(f"buffered:    {nb_messages / buffered:10.1f} messages/sec (batch {options['batch']})")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: x{per_message / buffered:.1f}"))
+
+    @staticmethod
+    def build_message(chat, author, index):
+        message = Message(chat=chat, author=author, content=f"benchmark message {index}")
+        message.full_clean(exclude=["chat", "author"])
+        return message
+
+    async def per_message_writes(self, chat, author, nb_messages):
+        save = database_sync_to_async(lambda message: message.save())
+        start = time.perf_counter()
+        for index in range(nb_messages):
+            await save(self.build_message(chat, author, index))
+        return time.perf_counter() - start
+
+    async def buffered_writes(self, chat, author, nb_messages, batch):
+        buffer = MessageBuffer(max_batch=batch, flush_interval=3600, notify=False)
+        start = time.perf_counter()
+        for index in range(nb_messages):
+            await buffer.add(self.build_message(chat, author, index))
+        await buffer.flush()
+        return time.perf_counter() - start
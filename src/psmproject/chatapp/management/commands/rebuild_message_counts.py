@@ -0,0 +1,20 @@
+"""
+Django command to recompute denormalized message counters and last message columns of all chats
+"""
+
+from chatapp.models import Chat, Message
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class Command(BaseCommand):
+    help = "Recompute message counters and last message columns of all chats from the messages stored in database."
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding chat message counters and last messages...")
+        counts = Message.objects.filter(chat=OuterRef("pk")).order_by().values("chat").annotate(count=Count("pk"))
+        updated = Chat.objects.update(
+            message_count=Coalesce(Subquery(counts.values("count")), 0), **Chat.latest_message_columns()
+        )
+        self.stdout.write(self.style.SUCCESS(f"Message counters rebuilt for {updated} chats."))
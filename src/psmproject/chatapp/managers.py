@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, Q
 from tasksapp.models import Complaint, Task
 
 
@@ -17,9 +19,65 @@ class ComplaintChatManager(models.Manager):
         return super().get_queryset().filter(content_type__model=Complaint._meta.model_name)
 
 
+def clamp_page_size(value, default):
+    """
+    Page size sent by the client as a number from 1 to CHAT_HISTORY_MAX_PAGE_SIZE, default when missing or invalid.
+    """
+    try:
+        value = int(value or default)
+    except (TypeError, ValueError):
+        value = default
+    return min(max(value, 1), settings.CHAT_HISTORY_MAX_PAGE_SIZE)
+
+
+def parse_message_id(value):
+    """
+    Message id sent by the client as a positive number, None when missing or invalid.
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
 class MessageManager(models.Manager):
-    def get_chat_message_history(self, *, chat_id, max_datetime, visible_messages):
-        upper = visible_messages
-        lower = visible_messages - 10
-        messages = self.filter(chat=chat_id, timestamp__lte=max_datetime)[lower:upper]
-        return messages
+    def get_chat_message_history(self, *, chat_id, max_datetime, last_message_id=None, page_size=None):
+        """
+        Returns one page of chat history, newest first, with messages older than the last one seen by the client.
+        Pages are keyed on (timestamp, id) so each page is an index seek instead of an offset scan.
+        """
+        page_size = clamp_page_size(page_size, settings.CHAT_HISTORY_PAGE_SIZE)
+        last_message_id = parse_message_id(last_message_id)
+        messages = self.filter(chat=chat_id, timestamp__lte=max_datetime)
+        if last_message_id:
+            messages = messages.filter(self._older_than(chat_id, last_message_id))
+        return messages.order_by("-timestamp", "-id")[:page_size]
+
+    def get_messages_since(self, *, chat_id, last_message_id, limit=None):
+        """
+        Returns messages newer than the last one held by the client, oldest first, at most limit of them.
+        """
+        limit = clamp_page_size(limit, settings.CHAT_HISTORY_MAX_PAGE_SIZE)
+        return self.filter(chat=chat_id, pk__gt=last_message_id).order_by("id")[:limit]
+
+    def _older_than(self, chat_id, message_id):
+        cursor = self.filter(chat=chat_id, pk=message_id).values_list("timestamp", flat=True).first()
+        if cursor is None:
+            # cursor message has been deleted in the meantime, ids are assigned in timestamp order
+            return Q(pk__lt=message_id)
+        return Q(timestamp__lt=cursor) | Q(timestamp=cursor, pk__lt=message_id)
+
+    def unread_counts(self, user, chat_ids=None):
+        """
+        Returns number of unread messages per chat of the user, chats without unread messages are left out.
+        Messages are unread when they are newer than the participant read cursor and written by someone else,
+        counts of all chats come from a single grouped query.
+        """
+        messages = self.filter(
+            chat__participants__user=user, pk__gt=F("chat__participants__last_read_message_id")
+        ).exclude(author=user)
+        if chat_ids is not None:
+            messages = messages.filter(chat__in=chat_ids)
+        counts = messages.order_by().values("chat").annotate(unread=Count("pk"))
+        return {row["chat"]: row["unread"] for row in counts}
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["chat", "-timestamp", "-id"], name="chatapp_message_history_idx"),
+        ),
+    ]
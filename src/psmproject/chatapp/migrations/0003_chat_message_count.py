@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_messages(apps, schema_editor):
+    Chat = apps.get_model("chatapp", "Chat")
+    Message = apps.get_model("chatapp", "Message")
+    counts = Message.objects.filter(chat=OuterRef("pk")).order_by().values("chat").annotate(count=Count("pk"))
+    Chat.objects.update(message_count=Coalesce(Subquery(counts.values("count")), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatapp", "0002_message_history_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chat",
+            name="message_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="message count"),
+        ),
+        migrations.RunPython(count_existing_messages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+
+def fill_last_message(apps, schema_editor):
+    Chat = apps.get_model("chatapp", "Chat")
+    Message = apps.get_model("chatapp", "Message")
+    latest = Message.objects.filter(chat=OuterRef("pk")).order_by("-timestamp", "-id")
+    Chat.objects.update(
+        last_message=Subquery(latest.values("pk")[:1]),
+        last_message_at=Subquery(latest.values("timestamp")[:1]),
+        last_message_author=Subquery(latest.values("author")[:1]),
+        last_message_preview=Coalesce(
+            Subquery(latest.annotate(preview=Substr("content", 1, 100)).values("preview")[:1]), Value("")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("chatapp", "0003_chat_message_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chat",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chatapp.message",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chat",
+            name="last_message_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name="last message at"),
+        ),
+        migrations.AddField(
+            model_name="chat",
+            name="last_message_author",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="last message author",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chat",
+            name="last_message_preview",
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name="last message preview"),
+        ),
+        migrations.AddIndex(
+            model_name="chat",
+            index=models.Index(fields=["-last_message_at", "-id"], name="chatapp_chat_last_message_idx"),
+        ),
+        migrations.RunPython(fill_last_message, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:30
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def mark_existing_messages_as_read(apps, schema_editor):
+    Chat = apps.get_model("chatapp", "Chat")
+    Participant = apps.get_model("chatapp", "Participant")
+    last_message = Chat.objects.filter(pk=OuterRef("chat")).values("last_message")
+    Participant.objects.update(last_read_message_id=Coalesce(Subquery(last_message), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatapp", "0004_chat_last_message"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="participant",
+            name="last_read_message_id",
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name="last read message id"),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["chat", "id"], name="chatapp_message_unread_idx"),
+        ),
+        migrations.RunPython(mark_existing_messages_as_read, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatapp", "0005_participant_read_cursor"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MessageTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("message_id", models.PositiveBigIntegerField(verbose_name="message id")),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, verbose_name="deleted at")),
+                (
+                    "chat",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tombstones",
+                        to="chatapp.chat",
+                        verbose_name="chat",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["chat", "deleted_at"], name="chatapp_tombstone_sync_idx")],
+            },
+        ),
+    ]
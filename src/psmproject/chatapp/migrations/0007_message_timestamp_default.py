@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatapp", "0006_message_tombstone"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="message",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name="timestamp"),
+        ),
+    ]
@@ -7,8 +7,10 @@ from chatapp.managers import (
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Substr
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -19,14 +21,40 @@ class RoleChoices(models.TextChoices):
     MODERATOR = "MO", ("Moderator")
 
 
+MESSAGE_PREVIEW_LENGTH = 100
+
+
 class Chat(models.Model):
     """
     This model represents Chat. Model is related to Task, Complaint with use GenericForeignKey.
+    Message counter and last message columns are denormalized and maintained when messages are added or deleted.
     """
 
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
     object_id = models.PositiveIntegerField(null=True, blank=True)
     content_object = GenericForeignKey("content_type", "object_id")
+    message_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("message count"))
+    last_message = models.ForeignKey(
+        "Message", null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="+"
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name=_("last message at"))
+    last_message_author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name=_("last message author"),
+    )
+    last_message_preview = models.CharField(
+        max_length=MESSAGE_PREVIEW_LENGTH, blank=True, editable=False, verbose_name=_("last message preview")
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-last_message_at", "-id"], name="chatapp_chat_last_message_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Chat - {self.id}"
@@ -45,6 +73,50 @@ class Chat(models.Model):
     def has_participant(self, user):
         return self.participants.filter(user=user).first()
 
+    @staticmethod
+    def messages_added(chat_id, count, last_message):
+        """
+        Shifts message counter and, unless a newer message is already recorded, sets last message columns of the chat
+        in a single UPDATE, without loading the chat
+        """
+        is_newer = Q(last_message_at__isnull=True) | Q(last_message_at__lte=last_message.timestamp)
+
+        def if_newer(value, field):
+            return Case(When(is_newer, then=Value(value)), default=F(field), output_field=Chat._meta.get_field(field))
+
+        Chat.objects.filter(pk=chat_id).update(
+            message_count=F("message_count") + count,
+            last_message=if_newer(last_message.pk, "last_message"),
+            last_message_at=if_newer(last_message.timestamp, "last_message_at"),
+            last_message_author=if_newer(last_message.author_id, "last_message_author"),
+            last_message_preview=if_newer(last_message.content[:MESSAGE_PREVIEW_LENGTH], "last_message_preview"),
+        )
+
+    @staticmethod
+    def message_removed(chat_id):
+        """
+        Decrements message counter and recomputes last message columns from the latest remaining message
+        """
+        Chat.objects.filter(pk=chat_id).update(
+            message_count=Greatest(F("message_count") - 1, 0), **Chat.latest_message_columns()
+        )
+
+    @staticmethod
+    def latest_message_columns():
+        """
+        Expressions computing last message columns of each chat from its messages, for use in update()
+        """
+        latest = Message.objects.filter(chat=OuterRef("pk")).order_by("-timestamp", "-id")
+        return {
+            "last_message": Subquery(latest.values("pk")[:1]),
+            "last_message_at": Subquery(latest.values("timestamp")[:1]),
+            "last_message_author": Subquery(latest.values("author")[:1]),
+            "last_message_preview": Coalesce(
+                Subquery(latest.annotate(preview=Substr("content", 1, MESSAGE_PREVIEW_LENGTH)).values("preview")[:1]),
+                Value(""),
+            ),
+        }
+
 
 class PrivateChat(Chat):
     objects = PrivateChatManager()
@@ -74,11 +146,15 @@ class Participant(models.Model):
     chat (ForeginKey): associated chat
     user (userModel): associated user - participant of chat
     role (CharField): role choice for participant
+    last_read_message_id (PositiveBigIntegerField): read cursor, id of the newest message seen by participant
     """
 
     chat = models.ForeignKey(Chat, related_name="participants", on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     role = models.CharField(max_length=2, choices=RoleChoices.choices, blank=True, null=True)
+    last_read_message_id = models.PositiveBigIntegerField(
+        default=0, editable=False, verbose_name=_("last read message id")
+    )
 
     class Meta:
         constraints = [
@@ -108,12 +184,27 @@ class Message(models.Model):
     chat = models.ForeignKey(Chat, related_name="messages", on_delete=models.CASCADE, verbose_name=_("chat"))
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name=_("author"))
     content = models.CharField(max_length=500, verbose_name=_("content"))
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name=_("timestamp"))
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, verbose_name=_("timestamp"))
 
     objects = MessageManager()
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["chat", "-timestamp", "-id"], name="chatapp_message_history_idx"),
+            models.Index(fields=["chat", "id"], name="chatapp_message_unread_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if created:
+                Chat.messages_added(self.chat_id, 1, self)
+            else:
+                Chat.objects.filter(pk=self.chat_id, last_message=self.pk).update(
+                    last_message_preview=self.content[:MESSAGE_PREVIEW_LENGTH]
+                )
 
     @property
     def author_username(self):
@@ -127,3 +218,25 @@ class Message(models.Model):
 
     def __str__(self) -> str:
         return f"{self.timestamp.strftime('%Y-%m-%d %H:%M')}{self.author}: {self.content}"
+
+
+class MessageTombstone(models.Model):
+    """
+    This model records deleted messages, so reconnecting clients can drop messages removed while they were offline.
+    Fields:
+    chat (ForeignKey): chat of the deleted message
+    message_id (PositiveBigIntegerField): id of the deleted message
+    deleted_at (DateTimeField): deletion timestamp
+    """
+
+    chat = models.ForeignKey(Chat, related_name="tombstones", on_delete=models.CASCADE, verbose_name=_("chat"))
+    message_id = models.PositiveBigIntegerField(verbose_name=_("message id"))
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name=_("deleted at"))
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["chat", "deleted_at"], name="chatapp_tombstone_sync_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Message {self.message_id} deleted from Chat {self.chat_id}"
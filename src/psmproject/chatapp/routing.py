@@ -1,6 +1,7 @@
-from chatapp.consumers import ChatConsumer
+from chatapp.consumers import ChatConsumer, MultiplexChatConsumer
 from django.urls import path
 
 websocket_urlpatterns = [
     path("ws/chat/room/<pk>/user/<username>/", ChatConsumer.as_asgi()),
+    path("ws/chat/user/<username>/", MultiplexChatConsumer.as_asgi()),
 ]
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 from channels.db import database_sync_to_async
 from chatapp.models import Message
@@ -6,15 +6,30 @@ from chatapp.utils.timestamp_to_string import timestamp_to_str
 from django.db.models import QuerySet
 
 
-async def messages_to_json(messages: QuerySet) -> List[Dict]:
-    return [await message_to_json(message) async for message in messages]
+def serialize_messages(messages: QuerySet | Iterable[Message]) -> List[Dict]:
+    """
+    Builds JSON-ready dicts for a page of messages. Authors and their profiles are loaded together with messages in a
+    single query, so the page costs one database round trip whatever its size.
+    """
+    if not isinstance(messages, QuerySet):
+        ids = [message.pk for message in messages]
+        messages = Message.objects.filter(pk__in=ids).order_by("-timestamp", "-id")
+    return [message_to_dict(message) for message in messages.select_related("author__profile")]
 
 
-async def message_to_json(message: Message) -> Dict:
+def message_to_dict(message: Message) -> Dict:
     return {
-        "message_id": await database_sync_to_async(lambda: message.pk)(),
-        "author": await database_sync_to_async(lambda: message.author_username)(),
+        "message_id": message.pk,
+        "author": message.author_username,
         "content": message.content,
-        "picture": await database_sync_to_async(lambda: message.author_profile_picture_url)(),
+        "picture": message.author_profile_picture_url,
         "timestamp": timestamp_to_str(message.timestamp),
     }
+
+
+async def messages_to_json(messages: QuerySet | Iterable[Message]) -> List[Dict]:
+    return await database_sync_to_async(serialize_messages)(messages)
+
+
+async def message_to_json(message: Message) -> Dict:
+    return (await messages_to_json([message]))[0]
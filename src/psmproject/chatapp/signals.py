@@ -1,4 +1,6 @@
-from chatapp.models import Chat, Participant, RoleChoices
+from chatapp.models import Chat, Message, MessageTombstone, Participant, RoleChoices
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from fieldsignals import post_save_changed
 from tasksapp.models import Complaint, Task
@@ -13,6 +15,19 @@ def create_task_related_chat(sender, instance, **kwargs):
         Participant.objects.create(user=instance.selected_offer.contractor, chat=chat, role=RoleChoices.CONTRACTOR)
 
 
+@receiver(post_delete, sender=Message)
+def update_chat_after_message_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Keeps chat counter and last message columns up to date and records a tombstone for every deleted message, also
+    for queryset and cascade deletes. Nothing is left to update when the chat itself is deleted.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if issubclass(origin_model, Chat):
+        return
+    Chat.message_removed(instance.chat_id)
+    MessageTombstone.objects.create(chat_id=instance.chat_id, message_id=instance.pk)
+
+
 @receiver_not_in_test(post_save_changed, sender=Complaint, fields=["arbiter"])
 def create_complaint_related_chat(sender, instance, **kwargs):
     if instance.arbiter:
@@ -8,6 +8,7 @@ const chatHistoryLength = JSON.parse(document.getElementById("chat-history-lengt
 const currentUser = JSON.parse(document.getElementById("current-user").textContent);
 const userHasModeratorRole = JSON.parse(document.getElementById("user-has-moderator-role").textContent);
 const moderator = JSON.parse(document.getElementById("moderator").textContent);
+const maxReconnectAttempts = 5;
 
 
 class Chat  {
@@ -17,18 +18,12 @@ class Chat  {
     * - fetch messages from chat history
     * - retrieves sent or fetched messages and display them accordingly
     * - checks message input before sending to avoid validation errors
+    * - reconnects when connection drops and only asks for changes made in the meantime
     */
     constructor(roomId, currentUser, chatHistoryLength)   {
-        this.socket = new WebSocket(
-            ws_scheme
-            + "://"
-            + window.location.host
-            + "/ws/chat/room/"
-            + roomId
-            + "/user/"
-            + currentUser
-            + "/"
-        );
+        this.socketUrl = ws_scheme + "://" + window.location.host + "/ws/chat/room/" + roomId + "/user/" + currentUser + "/";
+        this.socket = new WebSocket(this.socketUrl);
+        this.reconnectAttempts = 0;
         this.currentUser = currentUser
         this.chatLog = document.querySelector("#chat-log");
         this.messageInputDom = document.querySelector("#chat-message-input");
@@ -39,6 +34,9 @@ class Chat  {
         this.warningMessageDiv = document.querySelector("#warning-msg");
         this.connectionTimestamp = new Date().toJSON();
         this.nbVisibleMessages = 0;
+        this.oldestMessageId = null;
+        this.newestMessageId = null;
+        this.syncedAt = this.connectionTimestamp;
         this.chatHistoryLength = chatHistoryLength;
         this.joinChatButton = document.querySelector("#join-chat");
         this.leaveChatButton = document.querySelector("#leave-chat");
@@ -72,6 +70,12 @@ class Chat  {
             case "fetch_messages":
                 this.loadMessages(data);
                 break;
+            case "confirm_messages":
+                this.confirmMessages(data["ids"]);
+                break;
+            case "sync_since":
+                this.syncMessages(data);
+                break;
             case "delete_message":
             case "join_chat":
             case "leave_chat":
@@ -90,30 +94,111 @@ class Chat  {
         this.addMessageMenuEventListeners(newMessageEl);
         this.chatLog.append(newMessageEl);
         this.chatLog.scrollTo(0, this.chatLog.scrollHeight);
+        this.setNewestMessageId(data["message"]["message_id"]);
+        this.markSeen(data["message"]["message_id"]);
+    };
+
+    setNewestMessageId(messageId)   {
+        /**
+        * Keep id of the newest saved message displayed, used as cursor to resume chat after reconnection
+        */
+        if (Number.isInteger(messageId) && messageId > this.newestMessageId)  {
+            this.newestMessageId = messageId;
+        };
     };
 
     loadMessages(data)  {
         /**
         * Display messages from chat history and change number of remaining messages
-        * If it displays the first 10 messaged when starting the chat, view will scrolldown
+        * If it displays the first page of messages when starting the chat, view will scrolldown
+        * Oldest displayed message is kept as a cursor for the next page of history
         * Once there is no more message to display, load message button disappears
         */
         const message_list = data["messages"];
+        const isFirstPage = this.oldestMessageId === null;
         for (let i in message_list)   {
             const message = new NewMessage(message_list[i]);
             const messageEl = message.create(this.currentUser);
             this.addMessageMenuEventListeners(messageEl);
             this.loadMessagesButton.after(messageEl);
         }
-        this.chatHistoryCount.textContent = this.chatHistoryLength - this.nbVisibleMessages;
-        if (this.nbVisibleMessages === 10)  {
+        if (message_list.length)    {
+            this.oldestMessageId = message_list[message_list.length - 1]["message_id"];
+        };
+        this.nbVisibleMessages += message_list.length;
+        this.chatHistoryCount.textContent = Math.max(this.chatHistoryLength - this.nbVisibleMessages, 0);
+        if (isFirstPage)  {
             this.chatLog.scrollTo(0, this.chatLog.scrollHeight);
+            if (message_list.length)    {
+                this.setNewestMessageId(message_list[0]["message_id"]);
+                this.markSeen(message_list[0]["message_id"]);
+            };
         };
-        if (this.nbVisibleMessages >= this.chatHistoryLength)   {
+        if (!message_list.length || this.nbVisibleMessages >= this.chatHistoryLength)   {
             this.loadMessagesButton.hidden = true;
         }
     };
 
+    confirmMessages(ids)   {
+        /**
+        * Replace provisional ids of messages sent in write-behind mode with ids given once they are saved
+        */
+        for (const [provisionalId, messageId] of Object.entries(ids))   {
+            const messageContainer = this.chatLog.querySelector(`.message-container[message-id="${provisionalId}"]`);
+            if (messageContainer)   {
+                messageContainer.setAttribute("message-id", messageId);
+            };
+            this.setNewestMessageId(messageId);
+        };
+        this.markSeen(Math.max(...Object.values(ids)));
+    };
+
+    markSeen(messageId)   {
+        /**
+        * Tell websocket the newest message displayed to the user, so it is no longer counted as unread
+        */
+        this.socket.send(JSON.stringify({
+            "action": "mark_seen",
+            "message_id": messageId,
+        }));
+    };
+
+    syncSince() {
+        /**
+        * Ask websocket for messages newer than the newest displayed one and for messages deleted since last sync
+        */
+        this.socket.send(JSON.stringify({
+            "action": "sync_since",
+            "last_message_id": this.newestMessageId,
+            "synced_at": this.syncedAt,
+        }));
+    };
+
+    syncMessages(data)  {
+        /**
+        * Display messages missed while connection was down and remove the ones deleted in the meantime
+        * Whole chat is reloaded when server no longer knows all deletions since last sync
+        */
+        if (data["reload"]) {
+            location.reload();
+            return;
+        };
+        for (const messageId of data["deleted_message_ids"]) {
+            const messageContainer = this.chatLog.querySelector(`.message-container[message-id="${messageId}"]`);
+            if (messageContainer)   {
+                messageContainer.remove();
+            };
+        };
+        for (const message of data["messages"])   {
+            this.displayNewMessage({"message": message});
+        };
+        if (data["has_more"])   {
+            this.syncSince();
+        } else  {
+            this.syncedAt = data["synced_at"];
+        };
+    };
+
     submitMessage()    {
         /**
         * Send user message to websocket and reset input
@@ -132,14 +217,13 @@ class Chat  {
 
     fetchMessages() {
         /**
-        * Send command to websocket to fetch messages from chat history and increase number of visible messages in chat
+        * Send command to websocket to fetch the page of chat history preceding the oldest displayed message
         * Send also timestamp when user connected to chat to avoid retrieving new messages from database
         */
-        this.nbVisibleMessages += 10;
         this.socket.send(JSON.stringify({
             "action": "fetch_messages",
             "chat_connection_timestamp": this.connectionTimestamp,
-            "visible_messages": this.nbVisibleMessages,
+            "last_message_id": this.oldestMessageId,
         }));
     };
 
@@ -238,8 +322,15 @@ class Chat  {
 
     chatClosed(e) {
         /**
-        * Display message on UI and console when chat connection has been terminated
+        * Reconnect with growing delay when chat connection has been terminated, after too many attempts
+        * display message on UI and console
         */
+        if (this.reconnectAttempts < maxReconnectAttempts)    {
+            const delay = 1000 * 2 ** this.reconnectAttempts;
+            this.reconnectAttempts += 1;
+            setTimeout(() => this.reconnect(), delay);
+            return;
+        };
         const warningMessageArray = [
             "Chat connection has been terminated, please close and restart the chat.",
             "If the issue persists, please contact the administrator.",
@@ -249,6 +340,18 @@ class Chat  {
         console.error("Connection has been closed", e);
     };
 
+    reconnect() {
+        /**
+        * Open a new websocket connection and resume chat from the newest displayed message
+        */
+        this.socket = new WebSocket(this.socketUrl);
+        this.initSocketEventListeners();
+        this.socket.onopen = () => {
+            this.reconnectAttempts = 0;
+            this.syncSince();
+        };
+    };
+
     chatError(e)    {
         /**
         * Display message when connection with websocket has encountered an error
@@ -274,22 +377,29 @@ class Chat  {
         };
     };
 
-    initEventListeners() {
+    initSocketEventListeners()  {
         /**
-        * Initialize event listeners for chat
+        * Initialize event listeners for websocket connection
         */
         this.socket.onmessage = (e) => {
             this.socketReceiver(e);
         };
-        this.messageSubmitDom.onclick = () => {
-            this.submitMessage()
-        };
         this.socket.onclose = (e) => {
             this.chatClosed(e);
         };
         this.socket.onerror = (e) => {
             this.chatError(e);
         };
+    };
+
+    initEventListeners() {
+        /**
+        * Initialize event listeners for chat
+        */
+        this.initSocketEventListeners();
+        this.messageSubmitDom.onclick = () => {
+            this.submitMessage()
+        };
         this.messageInputDom.onkeyup = (e) => {
             this.manageMessageInput(e);
         };
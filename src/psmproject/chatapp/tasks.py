@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from celery import shared_task
+from chatapp.models import MessageTombstone
+from django.conf import settings
+from django.utils.timezone import now
+
+
+@shared_task
+def prune_message_tombstones():
+    """
+    Delete tombstones older than CHAT_TOMBSTONE_RETENTION_DAYS, clients last synced before that reload whole chats.
+    Return number of deleted tombstones.
+    """
+    cutoff = now() - timedelta(days=settings.CHAT_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = MessageTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
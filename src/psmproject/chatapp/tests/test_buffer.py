@@ -0,0 +1,213 @@
+from datetime import timedelta
+
+from channels.db import database_sync_to_async
+from chatapp.buffer import (
+    MessageBuffer,
+    ReadCursorBuffer,
+    is_provisional_id,
+    message_buffer,
+    read_cursor_buffer,
+)
+from chatapp.models import Chat, Message, Participant
+from chatapp.tests.test_websockets import TEST_CHANNEL_LAYERS, WebsocketContextManager
+from chatapp.utils.timestamp_to_string import timestamp_to_str
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from factories.factories import (
+    ChatFactory,
+    ChatParticipantFactory,
+    MessageFactory,
+    UserFactory,
+)
+from mock import patch
+
+
+class MessageBufferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        cls.author = UserFactory()
+
+    def setUp(self):
+        super().setUp()
+        self.buffer = MessageBuffer(max_batch=3, flush_interval=60, notify=False)
+
+    def new_message(self, content="buffered message"):
+        return Message(chat=self.chat, author=self.author, content=content)
+
+    async def test_should_keep_messages_in_memory_until_flushed(self):
+        """
+        Test checks that buffered messages are persisted only on flush, with real ids mapped to provisional ones
+        """
+        provisional_ids = [await self.buffer.add(self.new_message()) for _ in range(2)]
+        self.assertEqual(await Message.objects.filter(chat=self.chat).acount(), 0)
+        persisted = await self.buffer.flush()
+        self.assertTrue(all(is_provisional_id(provisional_id) for provisional_id in provisional_ids))
+        self.assertEqual(set(persisted.keys()), set(provisional_ids))
+        self.assertEqual(await Message.objects.filter(pk__in=persisted.values()).acount(), 2)
+        self.assertEqual(len(self.buffer), 0)
+
+    async def test_should_flush_when_batch_size_is_reached(self):
+        """
+        Test checks that buffer is flushed as soon as it holds max batch size messages
+        """
+        for _ in range(3):
+            await self.buffer.add(self.new_message())
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(await Message.objects.filter(chat=self.chat).acount(), 3)
+
+    async def test_should_update_chat_message_count_when_batch_is_persisted(self):
+        """
+        Test checks that chat message counter includes bulk created messages
+        """
+        for _ in range(2):
+            await self.buffer.add(self.new_message())
+        await self.buffer.flush()
+        chat = await Chat.objects.aget(pk=self.chat.pk)
+        self.assertEqual(chat.message_count, 2)
+
+    @override_settings(CHAT_WRITE_BEHIND_MAX_ATTEMPTS=2)
+    async def test_should_save_other_messages_when_one_message_cannot_be_saved(self):
+        """
+        Test checks that a message which cannot be saved does not block the rest of its batch and is dropped after
+        the allowed number of attempts
+        """
+        saved_id = await self.buffer.add(self.new_message("saved"))
+        broken_id = await self.buffer.add(Message(chat=self.chat, author_id=None, content="broken"))
+
+        persisted = await self.buffer.flush()
+
+        self.assertEqual(list(persisted.keys()), [saved_id])
+        self.assertTrue(await Message.objects.filter(pk=persisted[saved_id], content="saved").aexists())
+        self.assertEqual([provisional_id for provisional_id, _ in self.buffer._pending], [broken_id])
+        self.assertEqual(await self.buffer.flush(), {})
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual((await Chat.objects.aget(pk=self.chat.pk)).message_count, 1)
+
+    def test_should_persist_pending_messages_on_shutdown(self):
+        """
+        Test checks that synchronous flush used at process exit persists pending messages
+        """
+        self.buffer._pending.append(("tmp-shutdown", self.new_message("shutdown message")))
+        persisted = self.buffer.flush_sync()
+        self.assertTrue(Message.objects.filter(pk=persisted["tmp-shutdown"], content="shutdown message").exists())
+
+
+class ReadCursorBufferTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.buffer = ReadCursorBuffer(flush_interval=60)
+        self.participant = ChatParticipantFactory()
+        self.other_participant = ChatParticipantFactory(chat=self.participant.chat)
+
+    async def test_should_save_newest_seen_message_of_each_participant_in_one_flush(self):
+        """
+        Test checks that read cursors are kept in memory until flushed and that only the newest id is kept
+        """
+        self.buffer.add(self.participant.pk, 7)
+        self.buffer.add(self.participant.pk, 5)
+        self.buffer.add(self.other_participant.pk, 3)
+        self.assertEqual(len(self.buffer), 2)
+        participant = await Participant.objects.aget(pk=self.participant.pk)
+        self.assertEqual(participant.last_read_message_id, 0)
+        self.assertEqual(await self.buffer.flush(), 2)
+        cursors = {p.pk: p.last_read_message_id async for p in Participant.objects.filter(chat=self.participant.chat)}
+        self.assertEqual(cursors, {self.participant.pk: 7, self.other_participant.pk: 3})
+
+    def test_should_save_other_cursors_when_one_cursor_cannot_be_saved(self):
+        """
+        Test checks that a read cursor which cannot be saved is dropped without blocking cursors of other participants
+        """
+        self.buffer._pending = {self.participant.pk: 2**63, self.other_participant.pk: 3}
+
+        self.assertEqual(self.buffer.flush_sync(), 1)
+
+        self.other_participant.refresh_from_db()
+        self.assertEqual(self.other_participant.last_read_message_id, 3)
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_should_not_move_read_cursor_backwards(self):
+        """
+        Test checks that saving an older seen message keeps the read cursor already saved
+        """
+        Participant.objects.filter(pk=self.participant.pk).update(last_read_message_id=10)
+        self.buffer.persist({self.participant.pk: 4})
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.last_read_message_id, 10)
+
+
+@override_settings(CHANNEL_LAYERS=TEST_CHANNEL_LAYERS, CHAT_WRITE_BEHIND=True)
+class WriteBehindChatWebSocketTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        cls.chat_participant = ChatParticipantFactory(chat=cls.chat)
+
+    async def test_should_broadcast_provisional_id_then_confirm_real_id(self):
+        """
+        Test checks that in write-behind mode the message is broadcast with a provisional id at once and that
+        participants get its real id once it is persisted
+        """
+        username = self.chat_participant.user.username
+        async with WebsocketContextManager(self.chat.id, username) as c1:
+            await c1.send_json_to({"action": "send_new_message", "author": username, "content": "write-behind"})
+            sent = await c1.receive_json_from()
+            self.assertFalse(await Message.objects.filter(content="write-behind").aexists())
+            await message_buffer.flush()
+            confirmed = await c1.receive_json_from()
+        provisional_id = sent["message"]["message_id"]
+        self.assertTrue(is_provisional_id(provisional_id))
+        self.assertEqual(confirmed["action"], "confirm_messages")
+        message = await database_sync_to_async(Message.objects.get)(content="write-behind")
+        self.assertEqual(confirmed["ids"], {provisional_id: message.pk})
+
+    async def test_should_store_timestamp_broadcast_with_message(self):
+        """
+        Test checks that a buffered message is stored with the time it was broadcast with, not the time of the flush
+        """
+        username = self.chat_participant.user.username
+        async with WebsocketContextManager(self.chat.id, username) as c1:
+            await c1.send_json_to({"action": "send_new_message", "author": username, "content": "sent before flush"})
+            sent = await c1.receive_json_from()
+            with patch.object(timezone, "now", return_value=timezone.now() + timedelta(seconds=30)):
+                await message_buffer.flush()
+            await c1.receive_json_from()
+        message = await database_sync_to_async(Message.objects.get)(content="sent before flush")
+        self.assertEqual(timestamp_to_str(message.timestamp), sent["message"]["timestamp"])
+
+
+@override_settings(CHANNEL_LAYERS=TEST_CHANNEL_LAYERS)
+class MarkSeenChatWebSocketTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        cls.chat_participant = ChatParticipantFactory(chat=cls.chat)
+        cls.message = MessageFactory(chat=cls.chat)
+
+    async def test_should_move_read_cursor_when_message_is_seen(self):
+        """
+        Test checks that "seen" action moves read cursor of the participant once read cursors are flushed
+        """
+        async with WebsocketContextManager(self.chat.id, self.chat_participant.user.username) as c1:
+            await c1.send_json_to({"action": "mark_seen", "message_id": self.message.id})
+            await c1.send_json_to({"action": "mark_seen", "message_id": "tmp-not-saved-yet"})
+            await c1.receive_nothing()
+            await read_cursor_buffer.flush()
+        participant = await Participant.objects.aget(pk=self.chat_participant.pk)
+        self.assertEqual(participant.last_read_message_id, self.message.id)
+
+    async def test_should_ignore_invalid_seen_message_id(self):
+        """
+        Test checks that "seen" action with an invalid message id is ignored and does not close the connection
+        """
+        async with WebsocketContextManager(self.chat.id, self.chat_participant.user.username) as c1:
+            for message_id in ("abc", [1], -1, None):
+                await c1.send_json_to({"action": "mark_seen", "message_id": message_id})
+            await c1.send_json_to({"action": "mark_seen", "message_id": self.message.id})
+            await c1.receive_nothing()
+            await read_cursor_buffer.flush()
+        participant = await Participant.objects.aget(pk=self.chat_participant.pk)
+        self.assertEqual(participant.last_read_message_id, self.message.id)
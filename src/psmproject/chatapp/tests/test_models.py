@@ -1,4 +1,15 @@
-from chatapp.models import Chat, Message, Participant
+from datetime import datetime as dt
+from datetime import timezone as tz
+from io import StringIO
+
+from chatapp.models import (
+    MESSAGE_PREVIEW_LENGTH,
+    Chat,
+    Message,
+    MessageTombstone,
+    Participant,
+)
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 from django.test import TestCase
 from factories.factories import (
@@ -184,3 +195,232 @@ class TestMessageModel(TestCase):
             f"{self.test_message1.content}"
         )
         self.assertEqual(str(self.test_message1), expected)
+
+    def test_should_record_tombstone_when_message_is_deleted(self):
+        """
+        Test if deleting a message leaves a tombstone with its id
+        """
+        message = MessageFactory()
+        message_id = message.id
+        message.delete()
+        self.assertTrue(MessageTombstone.objects.filter(chat=message.chat, message_id=message_id).exists())
+
+
+class TestMessageManager(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.test_chat = ChatFactory()
+        cls.same_time_messages = MessageFactory.create_batch(
+            3, chat=cls.test_chat, timestamp=dt(2023, 10, 8, 11, tzinfo=tz.utc)
+        )
+        cls.older_messages = [
+            MessageFactory(chat=cls.test_chat, timestamp=dt(2023, 10, day, 11, tzinfo=tz.utc)) for day in range(1, 6)
+        ]
+        cls.max_datetime = dt(2023, 10, 9, tzinfo=tz.utc)
+
+    def test_should_return_newest_page_when_no_cursor_given(self):
+        """
+        Test if first page of history contains the newest messages in (timestamp, id) descending order
+        """
+        messages = list(
+            Message.objects.get_chat_message_history(
+                chat_id=self.test_chat.id, max_datetime=self.max_datetime, page_size=4
+            )
+        )
+        expected = sorted(self.same_time_messages, key=lambda message: message.id, reverse=True) + [
+            self.older_messages[-1]
+        ]
+        self.assertEqual(messages, expected)
+
+    def test_should_return_messages_older_than_cursor_when_cursor_shares_timestamp(self):
+        """
+        Test if messages sharing the cursor timestamp but with lower id are not skipped
+        """
+        cursor = max(self.same_time_messages, key=lambda message: message.id)
+        messages = list(
+            Message.objects.get_chat_message_history(
+                chat_id=self.test_chat.id, max_datetime=self.max_datetime, last_message_id=cursor.id, page_size=3
+            )
+        )
+        self.assertNotIn(cursor, messages)
+        self.assertEqual(messages[:2], sorted(set(self.same_time_messages) - {cursor}, key=lambda m: -m.id))
+        self.assertEqual(messages[2], self.older_messages[-1])
+
+    def test_should_return_older_messages_when_cursor_message_was_deleted(self):
+        """
+        Test if history paging continues when the message used as cursor no longer exists
+        """
+        message = MessageFactory(chat=self.test_chat)
+        cursor_id = message.id
+        message.delete()
+        messages = Message.objects.get_chat_message_history(
+            chat_id=self.test_chat.id, max_datetime=self.max_datetime, last_message_id=cursor_id, page_size=50
+        )
+        self.assertEqual(len(messages), 8)
+
+
+class TestUnreadCounts(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = ChatParticipantFactory()
+        self.contact = ChatParticipantFactory(chat=self.reader.chat)
+        self.other_reader = ChatParticipantFactory(user=self.reader.user)
+
+    def test_should_count_messages_newer_than_read_cursor_written_by_others(self):
+        """
+        Test if unread counts of all chats of the user skip read messages and messages written by the user
+        """
+        messages = MessageFactory.create_batch(3, chat=self.reader.chat, author=self.contact.user)
+        MessageFactory(chat=self.reader.chat, author=self.reader.user)
+        MessageFactory.create_batch(2, chat=self.other_reader.chat)
+        MessageFactory(chat=ChatFactory())
+        Participant.objects.filter(pk=self.reader.pk).update(last_read_message_id=messages[0].id)
+        self.assertEqual(
+            Message.objects.unread_counts(self.reader.user),
+            {self.reader.chat.id: 2, self.other_reader.chat.id: 2},
+        )
+
+    def test_should_count_only_given_chats(self):
+        """
+        Test if unread counts can be limited to given chats
+        """
+        MessageFactory(chat=self.reader.chat, author=self.contact.user)
+        MessageFactory(chat=self.other_reader.chat)
+        self.assertEqual(
+            Message.objects.unread_counts(self.reader.user, chat_ids=[self.other_reader.chat.id]),
+            {self.other_reader.chat.id: 1},
+        )
+
+
+class TestChatMessageCounter(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.chat = ChatFactory()
+
+    def test_should_increment_message_count_when_message_is_created(self):
+        """
+        Test if chat message counter is increased for each new message
+        """
+        MessageFactory.create_batch(3, chat=self.chat)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.message_count, 3)
+
+    def test_should_not_change_message_count_when_message_is_edited(self):
+        """
+        Test if saving an existing message does not change chat message counter
+        """
+        message = MessageFactory(chat=self.chat)
+        message.content = "edited"
+        message.save()
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.message_count, 1)
+
+    def test_should_decrement_message_count_when_message_is_deleted(self):
+        """
+        Test if chat message counter is decreased when message is deleted
+        """
+        messages = MessageFactory.create_batch(2, chat=self.chat)
+        messages[0].delete()
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.message_count, 1)
+
+    def test_should_update_chat_when_messages_are_deleted_with_queryset(self):
+        """
+        Test if deleting messages with a queryset updates chat counter and last message columns and leaves tombstones
+        """
+        first, second, third = MessageFactory.create_batch(3, chat=self.chat)
+        Message.objects.filter(pk__in=[second.pk, third.pk]).delete()
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.message_count, 1)
+        self.assertEqual(self.chat.last_message_id, first.id)
+        self.assertEqual(
+            set(MessageTombstone.objects.filter(chat=self.chat).values_list("message_id", flat=True)),
+            {second.id, third.id},
+        )
+
+    def test_should_update_chat_when_messages_are_deleted_with_their_author(self):
+        """
+        Test if messages deleted in cascade with their author are subtracted from chat counter
+        """
+        kept = MessageFactory(chat=self.chat)
+        deleted = MessageFactory(chat=self.chat)
+        deleted.author.delete()
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.message_count, 1)
+        self.assertEqual(self.chat.last_message_id, kept.id)
+
+    def test_should_delete_chat_with_messages_without_tombstones(self):
+        """
+        Test if deleting a chat removes its messages without recording tombstones for the deleted chat
+        """
+        MessageFactory.create_batch(2, chat=self.chat)
+        self.chat.delete()
+        self.assertFalse(MessageTombstone.objects.exists())
+
+    def test_should_restore_message_count_when_rebuild_command_is_called(self):
+        """
+        Test if management command recomputes drifted message counters from stored messages
+        """
+        MessageFactory.create_batch(4, chat=self.chat)
+        empty_chat = ChatFactory()
+        Chat.objects.update(message_count=42)
+        call_command("rebuild_message_counts", stdout=StringIO())
+        self.chat.refresh_from_db()
+        empty_chat.refresh_from_db()
+        self.assertEqual(self.chat.message_count, 4)
+        self.assertEqual(empty_chat.message_count, 0)
+
+
+class TestChatLastMessage(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.chat = ChatFactory()
+
+    def test_should_set_last_message_columns_when_message_is_created(self):
+        """
+        Test if chat last message columns point to the newest message
+        """
+        MessageFactory(chat=self.chat)
+        message = MessageFactory(chat=self.chat, content="x" * 300)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_id, message.id)
+        self.assertEqual(self.chat.last_message_at, message.timestamp)
+        self.assertEqual(self.chat.last_message_author_id, message.author_id)
+        self.assertEqual(self.chat.last_message_preview, "x" * MESSAGE_PREVIEW_LENGTH)
+
+    def test_should_update_preview_when_last_message_is_edited(self):
+        """
+        Test if editing the last message refreshes chat last message preview
+        """
+        message = MessageFactory(chat=self.chat)
+        message.content = "edited"
+        message.save()
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_preview, "edited")
+
+    def test_should_fall_back_to_previous_message_when_last_message_is_deleted(self):
+        """
+        Test if deleting the last message sets last message columns from the previous one, or clears them
+        """
+        first, second = MessageFactory.create_batch(2, chat=self.chat)
+        second.delete()
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_id, first.id)
+        self.assertEqual(self.chat.last_message_preview, first.content[:MESSAGE_PREVIEW_LENGTH])
+        first.delete()
+        self.chat.refresh_from_db()
+        self.assertIsNone(self.chat.last_message_id)
+        self.assertIsNone(self.chat.last_message_at)
+        self.assertEqual(self.chat.last_message_preview, "")
+
+    def test_should_restore_last_message_when_rebuild_command_is_called(self):
+        """
+        Test if management command recomputes last message columns from stored messages
+        """
+        message = MessageFactory.create_batch(3, chat=self.chat)[-1]
+        Chat.objects.update(last_message=None, last_message_at=None, last_message_preview="")
+        call_command("rebuild_message_counts", stdout=StringIO())
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_id, message.id)
+        self.assertEqual(self.chat.last_message_preview, message.content[:MESSAGE_PREVIEW_LENGTH])
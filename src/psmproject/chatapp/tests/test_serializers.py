@@ -0,0 +1,46 @@
+from chatapp.models import Message
+from chatapp.serializers import message_to_json, messages_to_json, serialize_messages
+from django.test import TestCase
+from factories.factories import ChatFactory, MessageFactory, UserFactory
+from usersapp.models import UserProfile
+
+
+class MessageSerializerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        cls.author_with_profile = UserFactory()
+        UserProfile.objects.create(
+            user=cls.author_with_profile, description="test", profile_picture="profile_pictures/1/test.png"
+        )
+        cls.author_without_profile = UserFactory()
+        MessageFactory.create_batch(5, chat=cls.chat, author=cls.author_with_profile)
+        MessageFactory.create_batch(5, chat=cls.chat, author=cls.author_without_profile)
+
+    def test_should_serialize_page_of_messages_in_one_query(self):
+        """
+        Test checks that a page of messages is serialized with authors and profile pictures in a single query
+        """
+        messages = Message.objects.filter(chat=self.chat)
+        with self.assertNumQueries(1):
+            result = serialize_messages(messages)
+        self.assertEqual(len(result), 10)
+
+    def test_should_return_picture_url_only_for_authors_with_profile_picture(self):
+        """
+        Test checks that profile picture url is returned for author with profile picture and None otherwise
+        """
+        result = serialize_messages(Message.objects.filter(chat=self.chat))
+        pictures = {message["author"]: message["picture"] for message in result}
+        self.assertTrue(pictures[self.author_with_profile.username].endswith("test.png"))
+        self.assertIsNone(pictures[self.author_without_profile.username])
+
+    async def test_should_return_same_data_for_single_message_and_batch(self):
+        """
+        Test checks that single message serialization is the single-item case of batch serialization
+        """
+        message = await Message.objects.filter(chat=self.chat).afirst()
+        single = await message_to_json(message)
+        batch = await messages_to_json(Message.objects.filter(pk=message.pk))
+        self.assertEqual([single], batch)
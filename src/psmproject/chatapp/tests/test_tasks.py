@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from chatapp.models import MessageTombstone
+from chatapp.tasks import prune_message_tombstones
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from factories.factories import ChatFactory
+
+
+class PruneMessageTombstonesTest(TestCase):
+    @override_settings(CHAT_TOMBSTONE_RETENTION_DAYS=7)
+    def test_should_delete_only_tombstones_older_than_retention(self):
+        """
+        Test checks that tombstones older than the retention are deleted and recent ones are kept
+        """
+        chat = ChatFactory()
+        old, recent = (MessageTombstone.objects.create(chat=chat, message_id=message_id) for message_id in (1, 2))
+        MessageTombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=8))
+        MessageTombstone.objects.filter(pk=recent.pk).update(deleted_at=timezone.now() - timedelta(days=6))
+
+        self.assertEqual(prune_message_tombstones(), 1)
+
+        self.assertEqual(list(MessageTombstone.objects.values_list("message_id", flat=True)), [2])
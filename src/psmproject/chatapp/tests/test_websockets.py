@@ -3,12 +3,19 @@ from datetime import timezone as tz
 
 from channels.db import database_sync_to_async
 from channels.testing import WebsocketCommunicator
-from chatapp.consumers import ChatConsumer
+from chatapp.consumers import ChatConsumer, MultiplexChatConsumer
 from chatapp.models import Message
 from chatapp.serializers import message_to_json
+from django.conf import settings
+from django.contrib.auth.models import Group
 from django.test import TestCase, override_settings
 from django.utils import timezone
-from factories.factories import ChatFactory, ChatParticipantFactory, MessageFactory
+from factories.factories import (
+    ChatFactory,
+    ChatParticipantFactory,
+    MessageFactory,
+    UserFactory,
+)
 from factory.fuzzy import FuzzyText
 from mock import patch
 
@@ -44,8 +51,7 @@ class ChatWebSocketTest(TestCase):
         cls.chat_participant_2 = ChatParticipantFactory(chat=cls.chat)
         cls.other_chat = ChatFactory()
         cls.other_chat_participant = ChatParticipantFactory(chat=cls.other_chat)
-        with patch.object(timezone, "now", return_value=dt(2023, 10, 8, 11, tzinfo=tz.utc)):
-            cls.messages = MessageFactory.create_batch(10, chat=cls.chat)
+        cls.messages = MessageFactory.create_batch(10, chat=cls.chat, timestamp=dt(2023, 10, 8, 11, tzinfo=tz.utc))
 
     async def test_chat_consumer_connection(self):
         """
@@ -116,16 +122,351 @@ class ChatWebSocketTest(TestCase):
         async with WebsocketContextManager(chat_id, participant_1_username) as c1, WebsocketContextManager(
             chat_id, participant_2_username
         ) as c2:
-            with patch.object(timezone, "now", return_value=dt(2023, 10, 10, 11, tzinfo=tz.utc)):
-                new_message = await database_sync_to_async(MessageFactory.create)(chat=self.chat)
+            new_message = await database_sync_to_async(MessageFactory.create)(
+                chat=self.chat, timestamp=dt(2023, 10, 10, 11, tzinfo=tz.utc)
+            )
             with patch.object(timezone, "now", return_value=dt(2023, 10, 10, 10, tzinfo=tz.utc)) as mock_now:
                 fetch_message = {
                     "action": "fetch_messages",
                     "chat_connection_timestamp": str(mock_now.return_value),
-                    "visible_messages": 10,
                 }
                 await c1.send_json_to(fetch_message)
             result = await c1.receive_json_from()
             self.assertEqual(len(result["messages"]), 10)
             self.assertNotIn(await message_to_json(new_message), result["messages"])
             self.assertTrue(await c2.receive_nothing())
+
+    async def test_should_return_next_history_page_older_than_last_seen_message(self):
+        """
+        Test checks when loading next page of message history if:
+         - only messages older than the last seen message are returned
+         - page size sent by the client is respected
+         - pages do not overlap
+        """
+        chat_id = self.chat.id
+        participant_1_username = self.chat_participant_1.user.username
+        chat_connection_timestamp = str(dt(2023, 10, 10, 10, tzinfo=tz.utc))
+        async with WebsocketContextManager(chat_id, participant_1_username) as c1:
+            await c1.send_json_to(
+                {"action": "fetch_messages", "chat_connection_timestamp": chat_connection_timestamp, "page_size": 4}
+            )
+            first_page = await c1.receive_json_from()
+            await c1.send_json_to(
+                {
+                    "action": "fetch_messages",
+                    "chat_connection_timestamp": chat_connection_timestamp,
+                    "last_message_id": first_page["messages"][-1]["message_id"],
+                    "page_size": 4,
+                }
+            )
+            second_page = await c1.receive_json_from()
+        first_page_ids = [message["message_id"] for message in first_page["messages"]]
+        second_page_ids = [message["message_id"] for message in second_page["messages"]]
+        self.assertEqual(len(first_page_ids), 4)
+        self.assertEqual(len(second_page_ids), 4)
+        self.assertTrue(set(first_page_ids).isdisjoint(second_page_ids))
+        self.assertLess(max(second_page_ids), min(first_page_ids))
+
+    @override_settings(CHAT_HISTORY_PAGE_SIZE=3, CHAT_HISTORY_MAX_PAGE_SIZE=5)
+    async def test_should_clamp_invalid_page_size_sent_by_client(self):
+        """
+        Test checks that non-numeric, negative and too large page sizes do not close the connection and are replaced
+        by the default page size or limited to the allowed range
+        """
+        chat_connection_timestamp = str(dt(2023, 10, 10, 10, tzinfo=tz.utc))
+        async with WebsocketContextManager(self.chat.id, self.chat_participant_1.user.username) as c1:
+            page_lengths = []
+            for page_size in ("abc", -5, 0, 1000):
+                await c1.send_json_to(
+                    {
+                        "action": "fetch_messages",
+                        "chat_connection_timestamp": chat_connection_timestamp,
+                        "page_size": page_size,
+                    }
+                )
+                page_lengths.append(len((await c1.receive_json_from())["messages"]))
+        self.assertEqual(page_lengths, [3, 1, 3, 5])
+
+    @override_settings(CHAT_HISTORY_PAGE_SIZE=3)
+    async def test_should_ignore_invalid_last_message_id_sent_by_client(self):
+        """
+        Test checks that non-numeric last message id does not close the connection and the first page is returned
+        """
+        chat_connection_timestamp = str(dt(2023, 10, 10, 10, tzinfo=tz.utc))
+        async with WebsocketContextManager(self.chat.id, self.chat_participant_1.user.username) as c1:
+            pages = []
+            for last_message_id in (None, "abc"):
+                await c1.send_json_to(
+                    {
+                        "action": "fetch_messages",
+                        "chat_connection_timestamp": chat_connection_timestamp,
+                        "last_message_id": last_message_id,
+                    }
+                )
+                pages.append([message["message_id"] for message in (await c1.receive_json_from())["messages"]])
+        self.assertEqual(pages[1], pages[0])
+        self.assertEqual(len(pages[1]), 3)
+
+    async def test_should_return_error_when_author_is_not_connected_user(self):
+        """
+        Test checks that message sent on behalf of another user is rejected and not saved in database
+        """
+        chat_id = self.chat.id
+        participant_1_username = self.chat_participant_1.user.username
+        async with WebsocketContextManager(chat_id, participant_1_username) as c1:
+            message = {
+                "action": "send_new_message",
+                "author": self.chat_participant_2.user.username,
+                "content": "impersonated message",
+            }
+            await c1.send_json_to(message)
+            res1 = await c1.receive_json_from()
+        self.assertEqual(res1["action"], "throw_error")
+        self.assertFalse(await Message.objects.filter(content="impersonated message").aexists())
+
+
+@override_settings(CHANNEL_LAYERS=TEST_CHANNEL_LAYERS)
+class ChatConsumerMembershipCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        ChatParticipantFactory(chat=cls.chat)
+        cls.moderator = UserFactory()
+        cls.moderator.groups.add(Group.objects.get(name=settings.GROUP_NAMES["MODERATOR"]))
+
+    async def send_message(self, communicator, content):
+        await communicator.send_json_to(
+            {"action": "send_new_message", "author": self.moderator.username, "content": content}
+        )
+        return await communicator.receive_json_from()
+
+    async def test_should_allow_sending_messages_once_moderator_joined_chat(self):
+        """
+        Test checks that membership cached on connection is refreshed when moderator joins the chat
+        """
+        async with WebsocketContextManager(self.chat.id, self.moderator.username) as c1:
+            before_join = await self.send_message(c1, "before join")
+            await c1.send_json_to({"action": "join_chat", "user": self.moderator.username})
+            await c1.receive_json_from()
+            after_join = await self.send_message(c1, "after join")
+        self.assertEqual(before_join["action"], "throw_error")
+        self.assertEqual(after_join["action"], "send_new_message")
+
+    async def test_should_refresh_membership_of_other_connections_when_participant_is_removed(self):
+        """
+        Test checks that participant removal done on one connection invalidates membership cached on other connections
+        of the same user
+        """
+        await database_sync_to_async(ChatParticipantFactory)(chat=self.chat, user=self.moderator)
+        async with WebsocketContextManager(self.chat.id, self.moderator.username) as c1, WebsocketContextManager(
+            self.chat.id, self.moderator.username
+        ) as c2:
+            await c1.send_json_to({"action": "leave_chat", "user": self.moderator.username, "fan_out": True})
+            await c1.receive_json_from()
+            await c2.receive_json_from()
+            after_leave = await self.send_message(c2, "after leave")
+        self.assertEqual(after_leave["action"], "throw_error")
+
+
+@override_settings(CHANNEL_LAYERS=TEST_CHANNEL_LAYERS)
+class ChatConsumerSyncSinceTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        cls.chat_participant = ChatParticipantFactory(chat=cls.chat)
+        cls.messages = MessageFactory.create_batch(6, chat=cls.chat)
+        cls.synced_at = timezone.now().isoformat()
+
+    async def sync_since(self, **data):
+        async with WebsocketContextManager(self.chat.id, self.chat_participant.user.username) as c1:
+            await c1.send_json_to({"action": "sync_since"} | data)
+            return await c1.receive_json_from()
+
+    async def test_should_return_only_messages_newer_than_last_held_message(self):
+        """
+        Test checks that reconnecting client gets messages newer than the last one it holds, oldest first
+        """
+        result = await self.sync_since(last_message_id=self.messages[3].id, synced_at=self.synced_at)
+        self.assertEqual(
+            [message["message_id"] for message in result["messages"]], [self.messages[4].id, self.messages[5].id]
+        )
+        self.assertEqual(result["deleted_message_ids"], [])
+        self.assertFalse(result["has_more"])
+        self.assertFalse(result["reload"])
+
+    async def test_should_return_tombstones_of_messages_deleted_since_last_sync(self):
+        """
+        Test checks that ids of held messages deleted after last sync are returned
+        """
+        deleted_message_id = self.messages[1].id
+        last_message_id = self.messages[4].id
+        for message in [
+            message async for message in Message.objects.filter(pk__in=[deleted_message_id, self.messages[5].id])
+        ]:
+            await database_sync_to_async(message.delete)()
+        result = await self.sync_since(last_message_id=last_message_id, synced_at=self.synced_at)
+        self.assertEqual(result["messages"], [])
+        self.assertEqual(result["deleted_message_ids"], [deleted_message_id])
+
+    async def test_should_flag_remaining_messages_when_limit_is_reached(self):
+        """
+        Test checks that client is told to sync again when more messages than requested are missing
+        """
+        result = await self.sync_since(last_message_id=self.messages[0].id, synced_at=self.synced_at, limit=2)
+        self.assertEqual(len(result["messages"]), 2)
+        self.assertTrue(result["has_more"])
+
+    async def test_should_clamp_invalid_limit_sent_by_client(self):
+        """
+        Test checks that non-numeric and negative limits do not close the connection
+        """
+        for limit, length in (("abc", 5), (-1, 1)):
+            result = await self.sync_since(last_message_id=self.messages[0].id, synced_at=self.synced_at, limit=limit)
+            self.assertEqual(len(result["messages"]), length)
+
+    async def test_should_return_error_for_invalid_sync_state_sent_by_client(self):
+        """
+        Test checks that invalid last message id or last sync time does not close the connection and an error is sent
+        """
+        for data in (
+            {"last_message_id": "abc", "synced_at": self.synced_at},
+            {"last_message_id": -1, "synced_at": self.synced_at},
+            {"last_message_id": self.messages[0].id, "synced_at": "yesterday"},
+            {"last_message_id": self.messages[0].id, "synced_at": "2023-13-45T10:00:00"},
+            {"last_message_id": self.messages[0].id, "synced_at": 1700000000},
+        ):
+            result = await self.sync_since(**data)
+            self.assertEqual(result["action"], "throw_error")
+
+    @override_settings(CHAT_TOMBSTONE_RETENTION_DAYS=1)
+    async def test_should_ask_for_reload_when_last_sync_is_older_than_tombstone_retention(self):
+        """
+        Test checks that client is asked to reload the chat when deletions since its last sync may have been pruned
+        """
+        result = await self.sync_since(
+            last_message_id=self.messages[5].id, synced_at=dt(2023, 10, 8, 11, tzinfo=tz.utc).isoformat()
+        )
+        self.assertTrue(result["reload"])
+
+
+@override_settings(CHANNEL_LAYERS=TEST_CHANNEL_LAYERS)
+class MultiplexChatWebSocketTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = UserFactory()
+        cls.chat_1 = ChatFactory()
+        cls.chat_2 = ChatFactory()
+        cls.other_chat = ChatFactory()
+        ChatParticipantFactory(chat=cls.chat_1, user=cls.user)
+        ChatParticipantFactory(chat=cls.chat_2, user=cls.user)
+        cls.contact = ChatParticipantFactory(chat=cls.chat_2)
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(MultiplexChatConsumer.as_asgi(), "/testws/")
+        communicator.scope["url_route"] = {"kwargs": {"username": self.user.username}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def subscribe(self, communicator, chat_id):
+        await communicator.send_json_to({"action": "subscribe", "chat_id": chat_id})
+        return await communicator.receive_json_from()
+
+    async def test_should_follow_many_chats_over_one_connection(self):
+        """
+        Test checks that actions and messages of every subscribed chat go through one connection tagged with chat id
+        """
+        communicator = await self.connect()
+        for chat in [self.chat_1, self.chat_2]:
+            self.assertEqual(await self.subscribe(communicator, chat.id), {"chat_id": chat.id, "action": "subscribe"})
+        await communicator.send_json_to(
+            {"action": "send_new_message", "chat_id": self.chat_1.id, "author": self.user.username, "content": "one"}
+        )
+        sent = await communicator.receive_json_from()
+        async with WebsocketContextManager(self.chat_2.id, self.contact.user.username) as c2:
+            await c2.send_json_to(
+                {"action": "send_new_message", "author": self.contact.user.username, "content": "two"}
+            )
+            await c2.receive_json_from()
+            received = await communicator.receive_json_from()
+        await communicator.disconnect()
+        self.assertEqual((sent["chat_id"], sent["message"]["content"]), (self.chat_1.id, "one"))
+        self.assertEqual((received["chat_id"], received["message"]["content"]), (self.chat_2.id, "two"))
+
+    async def test_should_stop_receiving_frames_of_unsubscribed_chat(self):
+        """
+        Test checks that after unsubscribing, chat frames are no longer delivered and chat actions are refused
+        """
+        communicator = await self.connect()
+        await self.subscribe(communicator, self.chat_2.id)
+        await communicator.send_json_to({"action": "unsubscribe", "chat_id": self.chat_2.id})
+        await communicator.receive_json_from()
+        async with WebsocketContextManager(self.chat_2.id, self.contact.user.username) as c2:
+            await c2.send_json_to(
+                {"action": "send_new_message", "author": self.contact.user.username, "content": "unseen"}
+            )
+            await c2.receive_json_from()
+            self.assertTrue(await communicator.receive_nothing())
+        await communicator.send_json_to(
+            {"action": "send_new_message", "chat_id": self.chat_2.id, "author": self.user.username, "content": "no"}
+        )
+        refused = await communicator.receive_json_from()
+        await communicator.disconnect()
+        self.assertEqual((refused["chat_id"], refused["action"]), (self.chat_2.id, "throw_error"))
+
+    async def test_should_refuse_subscription_to_chat_of_other_users(self):
+        """
+        Test checks that a user can subscribe only to chats they participate in
+        """
+        communicator = await self.connect()
+        response = await self.subscribe(communicator, self.other_chat.id)
+        await communicator.disconnect()
+        self.assertEqual(response["action"], "throw_error")
+
+
+@override_settings(CHANNEL_LAYERS=TEST_CHANNEL_LAYERS)
+class ChatConsumerDirectReplyTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.chat = ChatFactory()
+        cls.chat_participant = ChatParticipantFactory(chat=cls.chat)
+        MessageFactory.create_batch(2, chat=cls.chat)
+        cls.fetch_messages = {"action": "fetch_messages", "chat_connection_timestamp": timezone.now().isoformat()}
+
+    async def fetch_from_first_tab(self, **data):
+        username = self.chat_participant.user.username
+        async with WebsocketContextManager(self.chat.id, username) as c1, WebsocketContextManager(
+            self.chat.id, username
+        ) as c2:
+            await c1.send_json_to(self.fetch_messages | data)
+            response = await c1.receive_json_from()
+            other_tab_got_nothing = await c2.receive_nothing()
+        return response, other_tab_got_nothing
+
+    async def test_should_reply_to_requesting_socket_only(self):
+        """
+        Test checks that in direct-reply mode other tabs of the same user do not get the response
+        """
+        response, other_tab_got_nothing = await self.fetch_from_first_tab()
+        self.assertEqual(len(response["messages"]), 2)
+        self.assertTrue(other_tab_got_nothing)
+
+    async def test_should_fan_out_reply_to_all_tabs_when_requested(self):
+        """
+        Test checks that response goes through the channel layer to all tabs of the user when client asks for it
+        """
+        response, other_tab_got_nothing = await self.fetch_from_first_tab(fan_out=True)
+        self.assertEqual(len(response["messages"]), 2)
+        self.assertFalse(other_tab_got_nothing)
+
+    @override_settings(CHAT_DIRECT_REPLY=False)
+    async def test_should_fan_out_every_reply_when_direct_reply_is_disabled(self):
+        """
+        Test checks that with direct-reply mode disabled responses go to all tabs of the user
+        """
+        response, other_tab_got_nothing = await self.fetch_from_first_tab()
+        self.assertFalse(other_tab_got_nothing)
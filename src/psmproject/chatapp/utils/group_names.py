@@ -0,0 +1,6 @@
+def chat_group_name(chat_id):
+    return f"chat_{chat_id}"
+
+
+def user_group_name(chat_id, user_id):
+    return f"{chat_group_name(chat_id)}_username_{user_id}"
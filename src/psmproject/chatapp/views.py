@@ -89,13 +89,19 @@ class ChatListView(LoginRequiredMixin, FormMixin, ListView):
         context = super().get_context_data(**kwargs)
         context["list_title"] = self.list_title
         context["form"] = self.get_form_class()(self.request.GET)
+        self.add_unread_counts(context[self.context_object_name])
         return context
 
+    def add_unread_counts(self, chats):
+        unread_counts = Message.objects.unread_counts(self.request.user, chat_ids=[chat.pk for chat in chats])
+        for chat in chats:
+            chat.unread_count = unread_counts.get(chat.pk, 0)
+
     def search_condition(self, participant):
         return Q(
-            participants__in=Participant.objects.filter(
+            pk__in=Participant.objects.filter(
                 Q(user__username__icontains=participant) & ~Q(user=self.request.user)
-            )
+            ).values("chat")
         )
 
     def get_queryset(self):
@@ -104,15 +110,7 @@ class ChatListView(LoginRequiredMixin, FormMixin, ListView):
         if form.is_valid() and form.cleaned_data["contact_name"]:
             participant = form.cleaned_data["contact_name"]
             queryset = queryset.filter(self.search_condition(participant))
-        return queryset
-
-    @property
-    def _last_message_subquery(self):
-        return (
-            Message.objects.filter(chat=OuterRef("pk"))
-            .order_by("-timestamp")
-            .values("timestamp", "author__username", "content")
-        )
+        return queryset.select_related("last_message_author")
 
     @property
     def _contact_subquery(self):
@@ -120,21 +118,11 @@ class ChatListView(LoginRequiredMixin, FormMixin, ListView):
             Q(chat=OuterRef("pk")) & ~(Q(user=self.request.user) | Q(role__in=RoleChoices.values[2:]))
         )
 
-    @property
-    def _last_message_annotation(self):
-        return {
-            "last_message_at": Subquery(self._last_message_subquery.values("timestamp")[:1]),
-            "last_message_author": Subquery(self._last_message_subquery.values("author__username")[:1]),
-            "last_message_content": Subquery(self._last_message_subquery.values("content")[:1]),
-        }
-
     def build_queryset_for_list_view(self, queryset):
         return (
-            queryset.filter(participants__user=self.request.user, messages__isnull=False)
-            .annotate(**self._last_message_annotation)
+            queryset.filter(participants__user=self.request.user, last_message__isnull=False)
             .annotate(contact=Subquery(self._contact_subquery.values("user__username")[:1]))
-            .order_by("-last_message_at")
-            .distinct()
+            .order_by("-last_message_at", "-id")
         )
 
 
@@ -157,26 +145,18 @@ class ChatListModeratorView(UserPassesTestMixin, ChatListView):
     paginate_by = 10
 
     def build_queryset_for_list_view(self, queryset):
-        return (
-            queryset.filter(messages__isnull=False)
-            .annotate(**self._last_message_annotation)
-            .order_by("-last_message_at")
-            .distinct()
-        )
+        return queryset.filter(last_message__isnull=False).order_by("-last_message_at", "-id")
 
     def test_func(self):
-        return self.request.user.groups.filter(name=settings.GROUP_NAMES.get("MODERATOR")).exists()
+        return has_group(self.request.user, settings.GROUP_NAMES.get("MODERATOR"))
 
 
 class WaitingForModerationChatListModeratorView(ChatListModeratorView):
     list_title = _("Chats waiting for moderation")
 
     def build_queryset_for_list_view(self, queryset):
-        return (
-            queryset.filter(~Q(participants__role=RoleChoices.MODERATOR) & Q(messages__isnull=False))
-            .annotate(**self._last_message_annotation)
-            .order_by("pk")
-            .distinct()
+        return queryset.filter(~Q(participants__role=RoleChoices.MODERATOR) & Q(last_message__isnull=False)).order_by(
+            "pk"
         )
 
 
@@ -184,9 +164,4 @@ class ModeratedChatListModeratorView(ChatListModeratorView):
     list_title = _("My moderated chats")
 
     def build_queryset_for_list_view(self, queryset):
-        return (
-            queryset.filter(Q(participants__user=self.request.user) & Q(messages__isnull=False))
-            .annotate(**self._last_message_annotation)
-            .order_by("pk")
-            .distinct()
-        )
+        return queryset.filter(Q(participants__user=self.request.user) & Q(last_message__isnull=False)).order_by("pk")
@@ -4,6 +4,7 @@ from typing import List, Tuple
 from chatapp.models import Chat, Participant, RoleChoices, TaskChat
 from django.conf import settings
 from django.contrib.auth.models import Group, User
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -11,13 +12,15 @@ from factories.factories import (
     ComplaintFactory,
     MessageFactory,
     OfferFactory,
+    SkillFactory,
     SolutionFactory,
     TaskFactory,
     UserFactory,
 )
 from mock import patch
 from tasksapp.models import Complaint, Offer, Task
-from usersapp.models import BlockedUser
+from tasksapp.tasks import refresh_recommendations_task
+from usersapp.models import BlockedUser, UserProfile
 
 client = Client()
 
@@ -141,24 +144,24 @@ class TestBaseDashboardView(TestCase):
             cls.test_solution2 = SolutionFactory(offer=cls.test_offer2)
 
         cls.chat1 = TaskChat.objects.get(object_id=cls.test_task1.id)
-        chat2 = TaskChat.objects.get(object_id=cls.test_task2.id)
-        chat3 = TaskChat.objects.get(object_id=cls.test_task3.id)
+        cls.chat2 = TaskChat.objects.get(object_id=cls.test_task2.id)
+        cls.chat3 = TaskChat.objects.get(object_id=cls.test_task3.id)
 
         messages_definition = [
             (cls.chat1, cls.user2),
             (cls.chat1, cls.user1),
-            (chat2, cls.user2),
-            (chat2, cls.user1),
-            (chat3, cls.user3),
-            (chat3, cls.user1),
+            (cls.chat2, cls.user2),
+            (cls.chat2, cls.user1),
+            (cls.chat3, cls.user3),
+            (cls.chat3, cls.user1),
             (cls.chat1, cls.user2),
             (cls.chat1, cls.user1),
             (cls.chat1, cls.user2),
             (cls.chat1, cls.user1),
-            (chat2, cls.user2),
-            (chat2, cls.user1),
-            (chat3, cls.user3),
-            (chat3, cls.user1),
+            (cls.chat2, cls.user2),
+            (cls.chat2, cls.user1),
+            (cls.chat3, cls.user3),
+            (cls.chat3, cls.user1),
             (cls.chat1, cls.user2),
             (cls.chat1, cls.user1),
         ]
@@ -271,14 +274,8 @@ class TestDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
 
         self.assertEqual(
-            list([message.id for message in self.response.context["new_messages"]]),
-            [
-                self.messages[14].id,
-                self.messages[12].id,
-                self.messages[10].id,
-                self.messages[8].id,
-                self.messages[6].id,
-            ],
+            [(chat.id, chat.unread_count) for chat in self.response.context["new_messages"]],
+            [(self.chat1.id, 4), (self.chat3.id, 2), (self.chat2.id, 2)],
         )
 
         self.client.login(username=self.user2.username, password="secret")
@@ -286,8 +283,8 @@ class TestDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
 
         self.assertEqual(
-            list([message.id for message in self.response.context["new_messages"]]),
-            [self.messages[15].id, self.messages[11].id, self.messages[9].id, self.messages[7].id, self.messages[3].id],
+            [(chat.id, chat.unread_count) for chat in self.response.context["new_messages"]],
+            [(self.chat1.id, 4), (self.chat2.id, 2)],
         )
 
         self.client.login(username=self.user3.username, password="secret")
@@ -295,8 +292,23 @@ class TestDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
 
         self.assertEqual(
-            list([message.id for message in self.response.context["new_messages"]]),
-            [self.messages[13].id, self.messages[5].id],
+            [(chat.id, chat.unread_count) for chat in self.response.context["new_messages"]],
+            [(self.chat3.id, 2)],
+        )
+
+    def test_should_not_return_chats_read_up_to_last_message(self):
+        """
+        Test that chats are left out of latest messages once participant read cursor reaches their last message
+        """
+        Participant.objects.filter(chat=self.chat1, user=self.user1).update(last_read_message_id=self.messages[14].id)
+        Participant.objects.filter(chat=self.chat2, user=self.user1).update(last_read_message_id=self.messages[2].id)
+        self.client.login(username=self.user1.username, password="secret")
+        self.response = self.client.get(self.url)
+        self.assertEqual(self.response.status_code, 200)
+
+        self.assertEqual(
+            [(chat.id, chat.unread_count) for chat in self.response.context["new_messages"]],
+            [(self.chat3.id, 2), (self.chat2.id, 1)],
         )
 
     def test_should_not_return_objects_that_not_belong_to_the_user(self):
@@ -358,6 +370,23 @@ class TestDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
         self.assertEqual(list(self.response.context["lost_offers"]), [self.test_offer21, self.test_offer11])
 
+    def test_should_return_recommended_tasks(self):
+        """
+        Test whether open tasks matching contractor skills are returned as recommendations.
+        """
+        cache.clear()
+        skill = SkillFactory.create()
+        UserProfile.objects.create(user=self.contractor_user, description="Developer").skills.add(skill)
+        task = TaskFactory.create(client=self.client_user, skills=[skill])
+        self.client.login(username=self.contractor_user.username, password="secret")
+        with patch.object(refresh_recommendations_task, "delay", side_effect=refresh_recommendations_task):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.response = self.client.get(self.url)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(list(self.response.context["recommended_tasks"]), [])
+        self.response = self.client.get(self.url)
+        self.assertEqual(self.response.context["recommended_tasks"][0], task)
+
     def test_should_return_no_context_if_not_logged_in(self):
         """
         Test whether the view correctly redirects to the login page if a not-logged-in user attempts to access it.
@@ -448,19 +477,8 @@ class TestModeratorDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
 
         self.assertEqual(
-            list([message.id for message in self.response.context["new_messages"]]),
-            [
-                self.messages[15].id,
-                self.messages[14].id,
-                self.messages[13].id,
-                self.messages[12].id,
-                self.messages[11].id,
-                self.messages[10].id,
-                self.messages[9].id,
-                self.messages[8].id,
-                self.messages[7].id,
-                self.messages[6].id,
-            ],
+            list(self.response.context["new_messages"]),
+            [self.chat1, self.chat3, self.chat2],
         )
 
     def test_should_return_new_offers(self):
@@ -545,17 +563,8 @@ class TestArbiterDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
 
         self.assertEqual(
-            list([message.id for message in self.response.context["arbiter_messages"]]),
-            [
-                self.messages[15].id,
-                self.messages[14].id,
-                self.messages[9].id,
-                self.messages[8].id,
-                self.messages[7].id,
-                self.messages[6].id,
-                self.messages[1].id,
-                self.messages[0].id,
-            ],
+            [(chat.id, chat.unread_count) for chat in self.response.context["arbiter_messages"]],
+            [(self.chat1.id, 8)],
         )
 
     def test_should_return_no_context_if_not_logged_in(self):
@@ -595,17 +604,8 @@ class TestAdminDashboardView(TestBaseDashboardView):
         self.assertEqual(self.response.status_code, 200)
 
         self.assertEqual(
-            list([message.id for message in self.response.context["new_messages"]]),
-            [
-                self.messages[15].id,
-                self.messages[14].id,
-                self.messages[9].id,
-                self.messages[8].id,
-                self.messages[7].id,
-                self.messages[6].id,
-                self.messages[1].id,
-                self.messages[0].id,
-            ],
+            [(chat.id, chat.unread_count) for chat in self.response.context["new_messages"]],
+            [(self.chat1.id, 8)],
         )
 
     def test_should_return_blocked_users(self):
@@ -1,6 +1,6 @@
 from typing import Any, List
 
-from chatapp.models import Message
+from chatapp.models import Chat, Message
 from django.conf import settings
 from django.db.models import Q
 from django.http import HttpRequest
@@ -8,11 +8,30 @@ from django.http.response import HttpResponse, HttpResponseRedirect
 from django.urls import reverse
 from django.views.generic.base import TemplateView
 from tasksapp.models import Complaint, Offer, Solution, Task
-from usersapp.helpers import SpecialUserMixin
+from tasksapp.recommendations import recommended_tasks
+from usersapp.helpers import SpecialUserMixin, group_names
 from usersapp.models import BlockedUser
 
 
-class DashboardView(TemplateView):
+class UnreadChatsMixin:
+    """
+    Mixin listing chats of the user with unread messages, most recently active first.
+    Unread message counts of all chats come from a single grouped query on participant read cursors.
+    """
+
+    def get_unread_chats(self, limit: int) -> List[Chat]:
+        unread_counts = Message.objects.unread_counts(self.request.user)
+        chats = list(
+            Chat.objects.filter(pk__in=unread_counts.keys())
+            .select_related("last_message_author")
+            .order_by("-last_message_at", "-id")[:limit]
+        )
+        for chat in chats:
+            chat.unread_count = unread_counts[chat.pk]
+        return chats
+
+
+class DashboardView(UnreadChatsMixin, TemplateView):
     """
     Class based view with dashboard for user. It shows task, offers, etc.
     It has dispatch method to redirect administrator, moderator and arbiter to their dashboard.
@@ -40,8 +59,9 @@ class DashboardView(TemplateView):
             settings.GROUP_NAMES.get("MODERATOR"),
         ]
 
-        if self.request.user.groups.filter(name__in=groups).exists():
-            user_group = self.request.user.groups.first().name
+        user_groups = group_names(self.request.user)
+        user_group = next((group for group in groups if group in user_groups), None)
+        if user_group:
             url = self.get_url_for_group()[user_group]["url"]
             return HttpResponseRedirect(url)
         else:
@@ -69,11 +89,10 @@ class DashboardView(TemplateView):
         return offers.filter(task__selected_offer__isnull=False).order_by("-task__updated")[:5]
 
     def get_new_messages(self):
-        return (
-            Message.objects.filter(chat__participants__user=self.request.user)
-            .exclude(author=self.request.user)
-            .order_by("-timestamp")[:5]
-        )
+        return self.get_unread_chats(5)
+
+    def get_recommended_tasks(self):
+        return recommended_tasks(self.request.user, 5)
 
     @staticmethod
     def last_tasks_filtered_by_status(tasks, statuses: List[int]):
@@ -98,13 +117,14 @@ class DashboardView(TemplateView):
                 "new_offers": self.get_new_offers(),
                 "lost_offers": self.get_lost_offers(),
                 "new_messages": self.get_new_messages(),
+                "recommended_tasks": self.get_recommended_tasks(),
             }
         )
 
         return context
 
 
-class DashboardModeratorView(SpecialUserMixin, TemplateView):
+class DashboardModeratorView(UnreadChatsMixin, SpecialUserMixin, TemplateView):
     """
     Class based view for Moderator dashboard. It shows new tasks, offers, solutions and new messages.
     """
@@ -124,15 +144,15 @@ class DashboardModeratorView(SpecialUserMixin, TemplateView):
         return Offer.objects.filter(Q(accepted=False)).order_by("-created")[:10]
 
     def get_new_messages(self):
-        return Message.objects.all()[:10]
-
-    def get_moderator_messages(self):
         return (
-            Message.objects.filter(chat__participants__user=self.request.user)
-            .exclude(author=self.request.user)
-            .order_by("-timestamp")[:5]
+            Chat.objects.filter(last_message__isnull=False)
+            .select_related("last_message_author")
+            .order_by("-last_message_at", "-id")[:10]
         )
 
+    def get_moderator_messages(self):
+        return self.get_unread_chats(5)
+
     @staticmethod
     def last_tasks_filtered_by_status(tasks, statuses: List[int]):
         return tasks.filter(status__in=statuses).order_by("-updated")[:10]
@@ -160,7 +180,7 @@ class DashboardModeratorView(SpecialUserMixin, TemplateView):
         return context
 
 
-class DashboardArbiterView(SpecialUserMixin, TemplateView):
+class DashboardArbiterView(UnreadChatsMixin, SpecialUserMixin, TemplateView):
     """
     Class based view for Arbiter dashboard. It shows new complaints, complaints taken by Arbiter and new messages.
     """
@@ -171,11 +191,7 @@ class DashboardArbiterView(SpecialUserMixin, TemplateView):
     template_name = "dashboardapp/dashboard_arbiter.html"
 
     def get_arbiter_messages(self):
-        return (
-            Message.objects.filter(chat__participants__user=self.request.user)
-            .exclude(author=self.request.user)
-            .order_by("-timestamp")[:10]
-        )
+        return self.get_unread_chats(10)
 
     def get_new_complaints(self):
         return Complaint.objects.filter(Q(arbiter=None)).order_by("-created_at")[:10]
@@ -200,7 +216,7 @@ class DashboardArbiterView(SpecialUserMixin, TemplateView):
         return context
 
 
-class DashboardAdminView(SpecialUserMixin, TemplateView):
+class DashboardAdminView(UnreadChatsMixin, SpecialUserMixin, TemplateView):
     """
     Class based View for Administrator Dashboard. It contains messages, blocked users, complaints, new tasks and offers.
     """
@@ -212,11 +228,7 @@ class DashboardAdminView(SpecialUserMixin, TemplateView):
     template_name = "dashboardapp/dashboard_admin.html"
 
     def get_new_messages(self):
-        return (
-            Message.objects.filter(chat__participants__user=self.request.user)
-            .exclude(author=self.request.user)
-            .order_by("-timestamp")[:10]
-        )
+        return self.get_unread_chats(10)
 
     def get_blocked_users(self):
         return BlockedUser.objects.all().order_by("-blocking_start_date")[:10]
@@ -253,4 +253,90 @@ CHANNEL_LAYERS = {
 
 REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
 
+# skills
+# number of suggestions returned by skill autocomplete, see usersapp.skill_autocomplete
+SKILL_AUTOCOMPLETE_LIMIT = env.int("SKILL_AUTOCOMPLETE_LIMIT", 10)
+# seconds after which the autocomplete index is rebuilt to pick up skills added by other processes
+SKILL_AUTOCOMPLETE_MAX_AGE = env.int("SKILL_AUTOCOMPLETE_MAX_AGE", 300)
+
+# blocked users
+# seconds for which a user is remembered as not blocked, see usersapp.blocking
+BLOCKED_USERS_CACHE_TIMEOUT = env.int("BLOCKED_USERS_CACHE_TIMEOUT", 300)
+# usersapp.tasks.unblock_users removing users with ended bans from the blocked users group runs at the end of
+# each ban, and also every UNBLOCK_USERS_INTERVAL seconds in case a scheduled run was lost
+UNBLOCK_USERS_INTERVAL = env.int("UNBLOCK_USERS_INTERVAL", 3600)
+
+# chat
+CHAT_HISTORY_PAGE_SIZE = env.int("CHAT_HISTORY_PAGE_SIZE", 10)
+CHAT_HISTORY_MAX_PAGE_SIZE = 50
+# write-behind mode: messages are broadcast at once and persisted in batches, see chatapp.buffer.MessageBuffer
+CHAT_WRITE_BEHIND = env.bool("CHAT_WRITE_BEHIND", False)
+CHAT_WRITE_BEHIND_MAX_BATCH = env.int("CHAT_WRITE_BEHIND_MAX_BATCH", 100)
+CHAT_WRITE_BEHIND_FLUSH_INTERVAL = env.float("CHAT_WRITE_BEHIND_FLUSH_INTERVAL", 0.5)
+CHAT_WRITE_BEHIND_DURABILITY = env.str("CHAT_WRITE_BEHIND_DURABILITY", "shutdown")
+# flushes after which a message which cannot be saved is dropped from the write-behind buffer
+CHAT_WRITE_BEHIND_MAX_ATTEMPTS = env.int("CHAT_WRITE_BEHIND_MAX_ATTEMPTS", 3)
+# responses meant for the requesting socket skip the channel layer unless client asks for fan out to all its tabs
+CHAT_DIRECT_REPLY = env.bool("CHAT_DIRECT_REPLY", True)
+# seconds during which "seen" notifications are collected before read cursors are saved, see chatapp.buffer
+CHAT_READ_CURSOR_FLUSH_INTERVAL = env.float("CHAT_READ_CURSOR_FLUSH_INTERVAL", 2.0)
+# days during which deleted messages are reported to reconnecting clients, older clients reload the whole chat
+CHAT_TOMBSTONE_RETENTION_DAYS = env.int("CHAT_TOMBSTONE_RETENTION_DAYS", 7)
+# seconds between runs of chatapp.tasks.prune_message_tombstones deleting tombstones older than the retention
+CHAT_TOMBSTONE_PRUNE_INTERVAL = env.int("CHAT_TOMBSTONE_PRUNE_INTERVAL", 24 * 3600)
+
+# periodic tasks, run by celery beat (worker started with -B)
+CELERY_BEAT_SCHEDULE = {
+    "unblock-users": {"task": "usersapp.tasks.unblock_users", "schedule": UNBLOCK_USERS_INTERVAL},
+    "prune-message-tombstones": {
+        "task": "chatapp.tasks.prune_message_tombstones",
+        "schedule": CHAT_TOMBSTONE_PRUNE_INTERVAL,
+    },
+}
+
+# tasks search
+# dotted path of tasksapp.search backend class, by default chosen from the database vendor
+TASK_SEARCH_BACKEND = env.str("TASK_SEARCH_BACKEND", "")
+# PostgreSQL text search configurations used for stemming, per language
+TASK_SEARCH_CONFIGS = {"en": "english", "pl": env.str("TASK_SEARCH_POLISH_CONFIG", "simple")}
+# age in days after which relevance of a task is halved
+TASK_SEARCH_RECENCY_DAYS = env.float("TASK_SEARCH_RECENCY_DAYS", 30.0)
+# cache of search result pages, see tasksapp.search_cache
+TASK_SEARCH_CACHE = env.bool("TASK_SEARCH_CACHE", False)
+# seconds after which cached pages expire, also bounds staleness after changes made without model signals
+TASK_SEARCH_CACHE_TIMEOUT = env.int("TASK_SEARCH_CACHE_TIMEOUT", 5 * 60)
+# number of matching task ids cached per search, deeper pages are read from the database
+TASK_SEARCH_CACHE_MAX_IDS = env.int("TASK_SEARCH_CACHE_MAX_IDS", 1000)
+# bounds of budget and days to complete ranges counted in search facets, see tasksapp.facets
+TASK_SEARCH_FACET_BUDGETS = [100, 500, 1000, 5000]
+TASK_SEARCH_FACET_DAYS = [4, 8, 15, 31]
+# skill filtering served from the in-process bitmap index instead of task-skill joins, see tasksapp.skill_index
+TASK_SKILL_INDEX = env.bool("TASK_SKILL_INDEX", False)
+# seconds after which the index is rebuilt to pick up changes made by other processes
+TASK_SKILL_INDEX_MAX_AGE = env.int("TASK_SKILL_INDEX_MAX_AGE", 60)
+# above this number of matching tasks, filtering by a list of ids is slower than the joins
+TASK_SKILL_INDEX_MAX_IDS = env.int("TASK_SKILL_INDEX_MAX_IDS", 1000)
+# "tasks for you" recommendations, see tasksapp.recommendations
+TASK_RECOMMENDATIONS_WEIGHTS = {"skills": 0.5, "text": 0.3, "budget": 0.2}
+# number of best matching tasks taken from the skill query and from the full-text query
+TASK_RECOMMENDATIONS_CANDIDATES = env.int("TASK_RECOMMENDATIONS_CANDIDATES", 500)
+TASK_RECOMMENDATIONS_CACHED = env.int("TASK_RECOMMENDATIONS_CACHED", 30)
+# seconds after which cached recommendations are refreshed by a celery task, outdated ones are shown meanwhile
+TASK_RECOMMENDATIONS_CACHE_TIMEOUT = env.int("TASK_RECOMMENDATIONS_CACHE_TIMEOUT", 15 * 60)
+# seconds after which cached recommendations are dropped, when not refreshed before
+TASK_RECOMMENDATIONS_STALE_TIMEOUT = env.int("TASK_RECOMMENDATIONS_STALE_TIMEOUT", 24 * 3600)
+
+# lists
+# counting rows of keyset paginated lists: "exact", "approximate" or "" for none, see tasksapp.pagination
+LIST_PAGINATION_COUNT = env.str("LIST_PAGINATION_COUNT", "approximate")
+# approximate count stops counting at this number of rows when database has no row estimate
+LIST_PAGINATION_COUNT_LIMIT = env.int("LIST_PAGINATION_COUNT_LIMIT", 1000)
+
+# attachments
+# files of downloaded attachments sent by the front proxy: "x-accel-redirect", "x-sendfile" or "" for streaming
+# by Django, see tasksapp.downloads
+ATTACHMENTS_SENDFILE = env.str("ATTACHMENTS_SENDFILE", "")
+# internal location of the proxy serving MEDIA_ROOT, for X-Accel-Redirect
+ATTACHMENTS_ACCEL_REDIRECT_PREFIX = env.str("ATTACHMENTS_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
 HOST_NAME = env.str("HOST_NAME")
@@ -8,6 +8,13 @@ CSRF_TRUSTED_ORIGINS = [env.str("HOST_NAME"), TEST_HOST]
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/1",
+    }
+}
+
 MEDIA_URL = f"{env.str('HOST_NAME')}/media/"
 
 EMAIL_BACKEND = "sendgrid_backend.SendgridBackend"
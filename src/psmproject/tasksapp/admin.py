@@ -1,5 +1,5 @@
 from django.contrib import admin  # noqa
 
-from .models import Offer, Payment, Task, TaskAttachment
+from .models import Offer, Payment, SavedSearch, Task, TaskAttachment
 
-admin.site.register([Offer, Task, TaskAttachment, Payment])
+admin.site.register([Offer, Task, TaskAttachment, Payment, SavedSearch])
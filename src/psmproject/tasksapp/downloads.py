@@ -0,0 +1,119 @@
+"""
+Responses of attachment download views, see tasksapp.views.attachment.DownloadAttachmentView.
+
+Files are streamed from storage in blocks of FileResponse.block_size, so memory used by a download does not depend on
+the size of the file. Responses have ETag and Last-Modified taken from the updated date of the attachment, conditional
+requests are answered with 304 and a single byte range ("Range: bytes=start-end") with 206. Other ranges, like
+multiple ones, are ignored and the whole file is sent.
+
+With ATTACHMENTS_SENDFILE set, Django only checks permissions and sets headers. The front proxy sends the file named
+in the X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd) header and handles ranges itself.
+"""
+
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """File-like object reading length bytes of file from start."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) of the single byte range in Range header, with end included, or None when there is no such
+    range and the whole file is sent. Raise ValueError for ranges outside the file.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        # suffix range, last bytes of the file
+        length = int(end)
+        if not length or not size:
+            raise ValueError("range not satisfiable")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+def attachment_content_type(attachment):
+    content_type, _ = mimetypes.guess_type(attachment.attachment.name)
+    return content_type or "application/octet-stream"
+
+
+def stream_response(request, attachment, etag, last_modified):
+    size = attachment.attachment.size
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if if_range is None or if_range in (etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    start, end = byte_range or (0, size - 1)
+    response = FileResponse(
+        FileRange(attachment.attachment.open("rb"), start, end - start + 1),
+        content_type=attachment_content_type(attachment),
+        status=206 if byte_range else 200,
+    )
+    response["Content-Length"] = end - start + 1
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def sendfile_response(attachment):
+    response = HttpResponse(content_type=attachment_content_type(attachment))
+    if settings.ATTACHMENTS_SENDFILE == "x-accel-redirect":
+        response["X-Accel-Redirect"] = quote(
+            f"{settings.ATTACHMENTS_ACCEL_REDIRECT_PREFIX}{attachment.attachment.name}"
+        )
+    else:
+        response["X-Sendfile"] = attachment.attachment.path
+    return response
+
+
+def attachment_response(request, attachment):
+    """Response sending the file of attachment, or 304 when the client has it already."""
+    etag = quote_etag(f"{attachment.pk}-{attachment.updated.timestamp()}")
+    last_modified = http_date(attachment.updated.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=int(attachment.updated.timestamp()))
+    if response is None:
+        if settings.ATTACHMENTS_SENDFILE:
+            response = sendfile_response(attachment)
+        else:
+            response = stream_response(request, attachment, etag, last_modified)
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    return response
@@ -0,0 +1,78 @@
+"""
+Facet counts of task search results: number of matching tasks per skill, per minimal budget and per days to complete
+range, so the search page can tell how many tasks a refinement would return.
+All counts come from a single UNION ALL of two grouped queries over the current result set.
+"""
+
+from typing import Dict, List
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from .models import Task
+
+
+class TaskFacets:
+    """Counts of tasks per skill id and per budget and days to complete bucket."""
+
+    def __init__(self, skills: Dict[int, int], budget: List[int], days: List[int]):
+        self.skills = skills
+        self.budget = budget
+        self.days = days
+
+    def budget_choices(self):
+        """Minimal budgets with number of tasks having at least that budget, for the budget filter."""
+        bounds = settings.TASK_SEARCH_FACET_BUDGETS
+        counts = [sum(self.budget[index + 1 :]) for index in range(len(bounds))]
+        return [{"budget": bound, "count": count} for bound, count in zip(bounds, counts)]
+
+    def days_choices(self):
+        """Days to complete ranges with number of tasks in them, for min and max days filters."""
+        bounds = [None] + settings.TASK_SEARCH_FACET_DAYS + [None]
+        return [
+            {"min": low, "max": high - 1 if high else None, "count": count}
+            for low, high, count in zip(bounds, bounds[1:], self.days)
+        ]
+
+    def without(self, other):
+        """Counts with tasks counted in other facets left out."""
+        skills = {skill_id: count - other.skills.get(skill_id, 0) for skill_id, count in self.skills.items()}
+        return TaskFacets(
+            {skill_id: count for skill_id, count in skills.items() if count > 0},
+            [count - other_count for count, other_count in zip(self.budget, other.budget)],
+            [count - other_count for count, other_count in zip(self.days, other.days)],
+        )
+
+    def as_dict(self):
+        return {"skills": self.skills, "budget": self.budget, "days": self.days}
+
+
+def bucket(field, bounds):
+    """Index of the range between bounds the field value falls into, 0 for values below the first bound."""
+    whens = [When(**{f"{field}__lt": bound}, then=Value(index)) for index, bound in enumerate(bounds)]
+    return Case(*whens, default=Value(len(bounds)), output_field=IntegerField())
+
+
+def facet_rows(queryset, facet, value):
+    return queryset.annotate(facet=Value(facet), value=value).values("facet", "value").annotate(count=Count("id"))
+
+
+def task_facets(queryset) -> TaskFacets:
+    budget_bounds = settings.TASK_SEARCH_FACET_BUDGETS
+    days_bounds = settings.TASK_SEARCH_FACET_DAYS
+    days_buckets = len(days_bounds) + 1
+    facets = TaskFacets({}, [0] * (len(budget_bounds) + 1), [0] * days_buckets)
+    tasks = Task.objects.filter(id__in=queryset.order_by().values("id"))
+    # budget and days buckets are counted together in one pass, as pairs encoded into a single number
+    buckets = bucket("budget", budget_bounds) * Value(days_buckets) + bucket("days_to_complete", days_bounds)
+    rows = facet_rows(tasks, "buckets", buckets).union(
+        facet_rows(tasks.filter(skills__isnull=False), "skills", F("skills")), all=True
+    )
+    for row in rows:
+        if row["facet"] == "buckets":
+            budget, days = divmod(row["value"], days_buckets)
+            facets.budget[budget] += row["count"]
+            facets.days[days] += row["count"]
+        else:
+            facets.skills[row["value"]] = row["count"]
+    return facets
@@ -0,0 +1,120 @@
+"""
+Django command comparing ways of excluding tasks a contractor already made an offer for from task search: previous
+OR-ed exclude through the offers relation, NOT IN subquery used by TasksSearchView and correlated NOT EXISTS, each
+without and with the (contractor, task) index of offers
+"""
+
+import random
+import time
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from tasksapp.models import Offer, Task
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure search latency for contractors with generated offers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100000, help="number of generated open tasks")
+        parser.add_argument("--contractors", type=int, default=10000, help="number of generated contractors")
+        parser.add_argument("--offers", type=int, default=1000000, help="number of generated offers")
+        parser.add_argument("--sample", type=int, default=50, help="number of contractors searches are timed for")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            contractors = self.generate_data(options["tasks"], options["contractors"], options["offers"])
+            self.stdout.write(f"data generated in {time.perf_counter() - start:.1f} s")
+            sample = random.sample(contractors, min(options["sample"], len(contractors)))
+            for indexed in (False, True):
+                self.set_index(indexed)
+                for label, exclude in self.strategies():
+                    page = self.measure(self.first_page, exclude, sample)
+                    count = self.measure(self.count_all, exclude, sample)
+                    self.stdout.write(
+                        f"{'with' if indexed else 'without'} index, {label:10}: "
+                        f"first page {page * 1000:8.2f} ms, all results count {count * 1000:8.2f} ms"
+                    )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark data rolled back."))
+
+    @staticmethod
+    def generate_data(nb_tasks, nb_contractors, nb_offers):
+        prefix = uuid4().hex[:8]
+        client = User.objects.create(username=f"bench_{prefix}")
+        contractors = User.objects.bulk_create(
+            User(username=f"bench_{prefix}_{index}") for index in range(nb_contractors)
+        )
+        Task.objects.bulk_create(
+            (
+                Task(title=f"task {index}", description="benchmark", days_to_complete=1, budget=1, client=client)
+                for index in range(nb_tasks)
+            ),
+            batch_size=10000,
+        )
+        task_ids = list(Task.objects.filter(client=client).values_list("id", flat=True))
+        contractor_ids = [contractor.id for contractor in contractors]
+        Offer.objects.bulk_create(
+            (
+                Offer(
+                    description="benchmark",
+                    days_to_complete=1,
+                    budget=1,
+                    task_id=random.choice(task_ids),
+                    contractor_id=random.choice(contractor_ids),
+                )
+                for _ in range(nb_offers)
+            ),
+            batch_size=10000,
+        )
+        return contractors
+
+    @staticmethod
+    def set_index(indexed):
+        # plain SQL, as SQLite schema editor cannot be used inside the benchmark transaction
+        quote_name = connection.ops.quote_name
+        index = quote_name(Offer._meta.indexes[0].name)
+        with connection.cursor() as cursor:
+            if indexed:
+                columns = ", ".join(quote_name(Offer._meta.get_field(field).column) for field in ("contractor", "task"))
+                cursor.execute(f"CREATE INDEX {index} ON {quote_name(Offer._meta.db_table)} ({columns})")
+            else:
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+    @staticmethod
+    def strategies():
+        return (
+            ("or exclude", lambda queryset, user: queryset.exclude(Q(client=user) | Q(offers__contractor=user))),
+            ("not in", lambda queryset, user: queryset.exclude(client=user).exclude(Offer.task_bid_by(user))),
+            (
+                "not exists",
+                lambda queryset, user: queryset.exclude(client=user).exclude(
+                    Exists(Offer.objects.filter(contractor=user, task=OuterRef("pk")))
+                ),
+            ),
+        )
+
+    @staticmethod
+    def first_page(exclude, user):
+        # page and capped count, as paginated by TasksSearchView
+        queryset = exclude(Task.objects.filter(status=Task.TaskStatus.OPEN), user).order_by("-id")
+        return list(queryset[:11]), queryset[:1001].count()
+
+    @staticmethod
+    def count_all(exclude, user):
+        # every open task is checked, as for exact counts and facets
+        return exclude(Task.objects.filter(status=Task.TaskStatus.OPEN), user).count()
+
+    @staticmethod
+    def measure(search, exclude, contractors):
+        search(exclude, contractors[0])
+        start = time.perf_counter()
+        for contractor in contractors:
+            search(exclude, contractor)
+        return (time.perf_counter() - start) / len(contractors)
@@ -0,0 +1,139 @@
+"""
+Django command measuring computation, cached reads and per-task updates of task recommendations on generated data
+"""
+
+import random
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tasksapp.models import Offer, Task
+from tasksapp.recommendations import (
+    CACHE_KEY,
+    compute_recommendations,
+    recommended_tasks,
+    store_recommendations,
+    update_task_recommendations,
+)
+from tasksapp.search import get_search_backend
+from usersapp.models import Skill, UserProfile
+
+User = get_user_model()
+
+WORDS = (
+    "python django api rest backend frontend react mobile android shop payments integration database migration "
+    "scraper dashboard report analytics game unity cloud docker deployment testing automation security login"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Measure recommendation time per contractor for generated tasks and contractors."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100000, help="number of generated open tasks")
+        parser.add_argument("--contractors", type=int, default=10000, help="number of generated contractors")
+        parser.add_argument("--skills", type=int, default=200, help="number of generated skills")
+        parser.add_argument(
+            "--sample", type=int, default=100, help="number of contractors recommendations are timed for"
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            contractors, tasks = self.generate_data(options["tasks"], options["contractors"], options["skills"])
+            self.stdout.write(f"data generated in {time.perf_counter() - start:.1f} s")
+
+            sample = random.sample(contractors, min(options["sample"], len(contractors)))
+            start = time.perf_counter()
+            for contractor in sample:
+                compute_recommendations(contractor)
+            computed = (time.perf_counter() - start) / len(sample)
+
+            cache.delete_many([CACHE_KEY.format(user_id=contractor.pk) for contractor in sample])
+            for contractor in sample:
+                store_recommendations(contractor)
+            start = time.perf_counter()
+            for contractor in sample:
+                recommended_tasks(contractor, 5)
+            cached = (time.perf_counter() - start) / len(sample)
+
+            # every task is merged into cached recommendations of the sampled contractors having its skills
+            updated_tasks = random.sample(tasks, min(options["sample"], len(tasks)))
+            start = time.perf_counter()
+            for task in updated_tasks:
+                update_task_recommendations(task.id)
+            updated = (time.perf_counter() - start) / len(updated_tasks)
+            cache.delete_many([CACHE_KEY.format(user_id=contractor.pk) for contractor in sample])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"computed: {computed * 1000:8.2f} ms per contractor")
+        self.stdout.write(f"cached:   {cached * 1000:8.2f} ms per contractor")
+        self.stdout.write(f"updated:  {updated * 1000:8.2f} ms per changed task")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"All {len(contractors)} contractors computed in {computed * len(contractors):.0f} s, "
+                "data rolled back."
+            )
+        )
+
+    @staticmethod
+    def text(words):
+        return " ".join(random.sample(WORDS, words))
+
+    def generate_data(self, nb_tasks, nb_contractors, nb_skills):
+        prefix = uuid4().hex[:8]
+        skills = Skill.objects.bulk_create(Skill(skill=f"{prefix}-{index}") for index in range(nb_skills))
+        users = User.objects.bulk_create(
+            User(username=f"bench_{prefix}_{index}") for index in range(nb_contractors + 1)
+        )
+        client, contractors = users[0], users[1:]
+        profiles = UserProfile.objects.bulk_create(
+            UserProfile(user=contractor, description=self.text(6)) for contractor in contractors
+        )
+        UserProfile.skills.through.objects.bulk_create(
+            UserProfile.skills.through(userprofile_id=profile.id, skill_id=skill.id)
+            for profile in profiles
+            for skill in random.sample(skills, 5)
+        )
+        tasks = Task.objects.bulk_create(
+            (
+                Task(
+                    title=self.text(3),
+                    description=self.text(10),
+                    days_to_complete=random.randint(1, 60),
+                    budget=Decimal(random.randint(100, 10000)),
+                    client=client,
+                )
+                for _ in range(nb_tasks)
+            ),
+            batch_size=5000,
+        )
+        Task.skills.through.objects.bulk_create(
+            (
+                Task.skills.through(task_id=task.id, skill_id=skill.id)
+                for task in tasks
+                for skill in random.sample(skills, 3)
+            ),
+            batch_size=5000,
+        )
+        Offer.objects.bulk_create(
+            (
+                Offer(
+                    task=random.choice(tasks),
+                    contractor=contractor,
+                    description=self.text(8),
+                    days_to_complete=7,
+                    budget=Decimal(1000),
+                )
+                for contractor in contractors
+                for _ in range(2)
+            ),
+            batch_size=5000,
+        )
+        # bulk_create sends no signals, so the full-text index is rebuilt at once
+        get_search_backend().rebuild()
+        return contractors, tasks
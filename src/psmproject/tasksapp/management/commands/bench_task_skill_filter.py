@@ -0,0 +1,121 @@
+"""
+Django command comparing task search skill filtering strategies: previous join with DISTINCT per skill, grouped
+subquery with HAVING COUNT, the index-backed joins used by TasksSearchView and the in-process skill bitmap index
+"""
+
+import random
+import time
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from tasksapp.models import Task
+from tasksapp.skill_index import bitmap_ids, skill_index
+from tasksapp.views.contractor import TasksSearchView
+from usersapp.helpers import skills_from_text
+from usersapp.models import Skill
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure queries and latency of task search skill filtering for 1, 5 and 20 selected skills."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=5000, help="number of generated tasks")
+        parser.add_argument("--skills", type=int, default=40, help="number of generated skills")
+        parser.add_argument("--skills-per-task", type=int, default=8, help="number of skills assigned to each task")
+        parser.add_argument("--repeat", type=int, default=20, help="measured runs per case")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            names = self.generate_data(options["tasks"], options["skills"], options["skills_per_task"])
+            self.skill_ids = dict(Skill.objects.filter(skill__in=names).values_list("skill", "id"))
+            skill_index.build()
+            for selected in (1, 5, 20):
+                selected_names = names[:selected]
+                for label, search in self.strategies():
+                    queries, elapsed = self.measure(search, selected_names, options["repeat"])
+                    self.stdout.write(
+                        f"{selected:2} skills, {label:16}: {queries:3} queries, {elapsed * 1000000:8.0f} us per search"
+                    )
+            transaction.set_rollback(True)
+        skill_index.clear()
+        self.stdout.write(self.style.SUCCESS("Benchmark data rolled back."))
+
+    @staticmethod
+    def generate_data(nb_tasks, nb_skills, skills_per_task):
+        prefix = uuid4().hex[:8]
+        skills = Skill.objects.bulk_create(Skill(skill=f"{prefix}-{index}") for index in range(nb_skills))
+        client = User.objects.create(username=f"bench_{prefix}")
+        tasks = Task.objects.bulk_create(
+            Task(title=f"task {index}", description="benchmark", days_to_complete=1, budget=1, client=client)
+            for index in range(nb_tasks)
+        )
+        Task.skills.through.objects.bulk_create(
+            Task.skills.through(task_id=task.id, skill_id=skill.id)
+            for task in tasks
+            for skill in random.sample(skills, skills_per_task)
+        )
+        return [skill.skill for skill in skills]
+
+    def strategies(self):
+        return (
+            ("distinct joins", self.distinct_joins),
+            ("grouped having", self.grouped_having),
+            ("indexed joins", self.indexed_joins),
+            ("bitmap index", self.bitmap_index),
+            ("bitmap lookup", self.bitmap_lookup),
+        )
+
+    @staticmethod
+    def distinct_joins(names):
+        skills = [Skill.objects.filter(skill__iexact=name).first() for name in names]
+        queryset = Task.objects.filter(status=Task.TaskStatus.OPEN)
+        for skill in skills:
+            queryset = queryset.filter(skills=skill).distinct()
+        return Command.paginate(queryset)
+
+    @staticmethod
+    def grouped_having(names):
+        skill_ids = {skill.id for skill in skills_from_text(names)}
+        matching = (
+            Task.skills.through.objects.filter(skill_id__in=skill_ids)
+            .values("task_id")
+            .annotate(matched=Count("skill_id", distinct=True))
+            .filter(matched=len(skill_ids))
+            .values("task_id")
+        )
+        return Command.paginate(Task.objects.filter(status=Task.TaskStatus.OPEN, id__in=matching))
+
+    @staticmethod
+    def indexed_joins(names):
+        queryset = Task.objects.filter(status=Task.TaskStatus.OPEN)
+        return Command.paginate(TasksSearchView.filter_by_skills(queryset, skills_from_text(names)))
+
+    def bitmap_index(self, names):
+        skills = skills_from_text(names)
+        with override_settings(TASK_SKILL_INDEX=True):
+            queryset = TasksSearchView.filter_by_skills(Task.objects.filter(status=Task.TaskStatus.OPEN), skills)
+            return self.paginate(queryset)
+
+    def bitmap_lookup(self, names):
+        # index lookup alone, without resolving skill names and fetching tasks
+        return bitmap_ids(skill_index.all_of(self.skill_ids[name] for name in names))
+
+    @staticmethod
+    def paginate(queryset):
+        # search view paginates results, so the count is part of every search
+        return queryset.count(), list(queryset.order_by("-id")[:10])
+
+    @staticmethod
+    def measure(search, names, repeat):
+        with CaptureQueriesContext(connection) as context:
+            search(names)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            search(names)
+        return len(context.captured_queries), (time.perf_counter() - start) / repeat
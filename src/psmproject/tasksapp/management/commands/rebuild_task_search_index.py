@@ -0,0 +1,17 @@
+"""
+Django command to recreate the full-text search index of tasks
+"""
+
+from django.core.management.base import BaseCommand
+from tasksapp.models import Task
+from tasksapp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Recreate the full-text search index of task titles and descriptions from the tasks stored in database."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(f"Rebuilding task search index with {type(backend).__name__}...")
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt for {Task.objects.count()} tasks."))
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE tasksapp_task_fts USING fts5("
+            "title, description, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO tasksapp_task_fts (rowid, title, description) SELECT id, title, description FROM tasksapp_task"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE tasksapp_task_search ("
+            "task_id bigint PRIMARY KEY REFERENCES tasksapp_task (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX tasksapp_task_search_document_idx ON tasksapp_task_search USING GIN (document)"
+        )
+        configs = list(dict.fromkeys(settings.TASK_SEARCH_CONFIGS.values()))
+        document = " || ".join(
+            ["setweight(to_tsvector(%s::regconfig, title), 'A') || setweight(to_tsvector(%s::regconfig, description), 'B')"]
+            * len(configs)
+        )
+        schema_editor.execute(
+            f"INSERT INTO tasksapp_task_search (task_id, document) SELECT id, {document} FROM tasksapp_task",
+            [config for config in configs for _ in range(2)],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS tasksapp_task_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS tasksapp_task_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasksapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
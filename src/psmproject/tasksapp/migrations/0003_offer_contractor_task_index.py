@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasksapp", "0002_task_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(fields=["contractor", "task"], name="tasksapp_offer_contractor_task"),
+        ),
+    ]
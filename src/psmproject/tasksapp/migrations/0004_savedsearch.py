@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("usersapp", "0001_initial"),
+        ("tasksapp", "0003_offer_contractor_task_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedSearch",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("query", models.CharField(blank=True, max_length=100, verbose_name="search phrase")),
+                (
+                    "budget",
+                    models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name="budget"),
+                ),
+                (
+                    "min_days_to_complete",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="min days to complete"),
+                ),
+                (
+                    "max_days_to_complete",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="max days to complete"),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True, verbose_name="created")),
+                (
+                    "contractor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_searches",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="contractor",
+                    ),
+                ),
+                ("skills", models.ManyToManyField(blank=True, to="usersapp.skill", verbose_name="skills")),
+            ],
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from usersapp.models import Skill
 
@@ -179,6 +180,9 @@ class Offer(models.Model):
     )
     created = models.DateTimeField(auto_now_add=True, verbose_name=_("created"))
 
+    class Meta:
+        indexes = [models.Index(fields=["contractor", "task"], name="tasksapp_offer_contractor_task")]
+
     def __str__(self) -> str:
         prefix = _("Offer by")
         return f"{prefix} {self.contractor}"
@@ -186,6 +190,15 @@ class Offer(models.Model):
     def __repr__(self) -> str:
         return f"<Offer id={self.id} for Task id={self.task.id}, contractor={self.contractor}>"
 
+    @staticmethod
+    def task_bid_by(contractor) -> Q:
+        """
+        Condition on Task querysets, true for tasks the contractor made an offer for. The subquery reads task ids of
+        the contractor's offers from the (contractor, task) index once, instead of probing offers for every task,
+        see bench_task_bid_exclusion command.
+        """
+        return Q(id__in=Offer.objects.filter(contractor=contractor, task__isnull=False).values("task_id"))
+
     def clean(self) -> None:
         super().clean()
         if self.budget <= 0:
@@ -195,6 +208,32 @@ class Offer(models.Model):
 ATTACHMENTS_PATH = "attachments/"  # TODO przenieść do settings??
 
 
+class SavedSearch(models.Model):
+    """
+    This model represents task search filters saved by a contractor: search phrase, skills, minimal budget and days to
+    complete bounds. Contractor is notified about tasks becoming open which match them (see tasksapp.saved_searches).
+    """
+
+    contractor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="saved_searches",
+        on_delete=models.CASCADE,
+        verbose_name=_("contractor"),
+    )
+    query = models.CharField(max_length=100, blank=True, verbose_name=_("search phrase"))
+    skills = models.ManyToManyField(Skill, blank=True, verbose_name=_("skills"))
+    budget = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name=_("budget"))
+    min_days_to_complete = models.PositiveIntegerField(null=True, blank=True, verbose_name=_("min days to complete"))
+    max_days_to_complete = models.PositiveIntegerField(null=True, blank=True, verbose_name=_("max days to complete"))
+    created = models.DateTimeField(auto_now_add=True, verbose_name=_("created"))
+
+    def __str__(self):
+        return f"Saved search: {self.query}"
+
+    def __repr__(self):
+        return f"<SavedSearch id={self.id}, contractor_id={self.contractor_id}, query={self.query}>"
+
+
 def get_upload_path(instance, filename):
     """
     Generates the file path for the Attachment.
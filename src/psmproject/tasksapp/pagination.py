@@ -0,0 +1,134 @@
+import json
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404
+from django.utils.translation import gettext as _
+
+
+class KeysetPage:
+    """
+    Page of a list ordered by descending id, starting after (or ending before) a given id. Provides the attributes of
+    django.core.paginator.Page used in templates and cursors for links to neighbouring pages.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous, count=None, count_is_exact=True):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.count = count
+        self.count_is_exact = count_is_exact
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        return self.object_list[-1].pk if self.object_list else None
+
+    @property
+    def previous_cursor(self):
+        return self.object_list[0].pk if self.object_list else None
+
+
+def estimate_count(queryset, limit):
+    """
+    Number of rows of the queryset, without scanning all of them. PostgreSQL planner estimate is used when available,
+    otherwise rows are counted up to the limit. Returns count and whether it is exact.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return int(plan[0]["Plan"]["Plan Rows"]), False
+    count = queryset[: limit + 1].count()
+    return min(count, limit), count <= limit
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin paginating lists ordered by descending id with ?after=<id> and ?before=<id> cursors instead of page
+    numbers. Every page is a range scan of paginate_by + 1 rows on the primary key, so it costs the same no matter how
+    deep it is. Lists ordered in other way and requests with ?page= use the standard paginator.
+    count_mode: "exact" counts all rows, "approximate" uses estimate_count, None skips counting.
+    """
+
+    after_kwarg = "after"
+    before_kwarg = "before"
+    count_mode = None
+
+    def get_count_mode(self):
+        return self.count_mode if self.count_mode is not None else settings.LIST_PAGINATION_COUNT
+
+    def use_keyset(self, queryset):
+        return queryset.query.order_by == ("-id",) and not self.request.GET.get(self.page_kwarg)
+
+    def get_cursor(self, name):
+        value = self.request.GET.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise Http404(_("Invalid cursor."))
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset(queryset):
+            return super().paginate_queryset(queryset, page_size)
+        after, before = self.get_cursor(self.after_kwarg), self.get_cursor(self.before_kwarg)
+        if before is not None:
+            rows = list(queryset.filter(id__gt=before).order_by("id")[: page_size + 1])
+            has_previous, has_next = len(rows) > page_size, True
+            object_list = rows[:page_size][::-1]
+        else:
+            rows = list((queryset.filter(id__lt=after) if after is not None else queryset)[: page_size + 1])
+            has_previous, has_next = after is not None, len(rows) > page_size
+            object_list = rows[:page_size]
+        count, count_is_exact = self.count_rows(queryset)
+        page = KeysetPage(object_list, has_next, has_previous, count, count_is_exact)
+        return None, page, object_list, page.has_other_pages()
+
+    def paginate_ids(self, ids, page_size, keyset, count_is_exact=True):
+        """
+        Paginate a list of ids in memory, the same way paginate_queryset paginates rows. With keyset, ids must be in
+        descending order. The returned page holds ids, callers replace them with objects.
+        """
+        if not keyset:
+            return super().paginate_queryset(ids, page_size)
+        after, before = self.get_cursor(self.after_kwarg), self.get_cursor(self.before_kwarg)
+        if before is not None:
+            newer = [pk for pk in ids if pk > before]
+            has_previous, has_next = len(newer) > page_size, True
+            object_list = newer[-page_size:]
+        else:
+            older = [pk for pk in ids if pk < after] if after is not None else ids
+            has_previous, has_next = after is not None, len(older) > page_size
+            object_list = older[:page_size]
+        count = len(ids) if self.get_count_mode() else None
+        page = KeysetPage(object_list, has_next, has_previous, count, count_is_exact)
+        return None, page, object_list, page.has_other_pages()
+
+    def count_rows(self, queryset):
+        count_mode = self.get_count_mode()
+        if count_mode == "exact":
+            return queryset.count(), True
+        if count_mode == "approximate":
+            return estimate_count(queryset, settings.LIST_PAGINATION_COUNT_LIMIT)
+        return None, True
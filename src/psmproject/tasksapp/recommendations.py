@@ -0,0 +1,272 @@
+"""
+Task recommendations for contractors ("tasks for you").
+
+Open tasks are scored against a contractor profile built from UserProfile skills, profile description and past offers:
+- skills: Jaccard similarity of task skills and contractor skills,
+- text: full-text relevance (bm25 / ts_rank, see tasksapp.search) of the task to the most frequent profile words,
+- budget: closeness of task budget to the budgets of tasks the contractor made offers for.
+Skill overlap of all candidate tasks comes from one grouped query and text relevance from one full-text query, so
+scoring a contractor costs a fixed number of queries whatever the number of open tasks.
+The best TASK_RECOMMENDATIONS_CACHED tasks are cached per contractor with the profile features they were scored with,
+and computed only by celery tasks, never on the request path. A full refresh is queued on read when recommendations
+are missing, older than TASK_RECOMMENDATIONS_CACHE_TIMEOUT or mostly closed. Until it is done the cached list, or an
+empty one, is shown. When a task is created, closed, reopened or its skills change, only that task is scored against
+the cached profiles of contractors having any of its skills and merged into their lists, or removed from them when
+it is no longer open. Closed tasks and tasks already offered for are also skipped on read.
+"""
+
+import math
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from usersapp.models import UserProfile
+
+from .models import Offer, Task
+from .search import SEARCH_MAX_TERMS, get_search_backend, search_terms
+from .tasks import refresh_recommendations_task, update_task_recommendations_task
+
+CACHE_KEY = "task-recommendations:ranking:{user_id}"
+REFRESH_KEY = "task-recommendations:refresh:{user_id}"
+UPDATE_KEY = "task-recommendations:update:{task_id}"
+REFRESH_LOCK_TIMEOUT = 5 * 60
+PROFILE_OFFERS = 20
+PROFILE_TERM_MIN_LENGTH = 4
+
+
+class ContractorProfile:
+    """Features of a contractor used for scoring tasks."""
+
+    def __init__(self, user):
+        self.user = user
+        profile_skills = UserProfile.skills.through.objects.filter(userprofile__user=user)
+        self.skill_ids = set(profile_skills.values_list("skill_id", flat=True))
+        offers = Offer.objects.filter(contractor=user).order_by("-created")
+        texts = list(UserProfile.objects.filter(user=user).values_list("description", flat=True))
+        texts += [
+            f"{title} {text}" for title, text in offers.values_list("task__title", "description")[:PROFILE_OFFERS]
+        ]
+        words = Counter(
+            term for text in texts for term in search_terms(text, limit=None) if len(term) >= PROFILE_TERM_MIN_LENGTH
+        )
+        self.terms = [term for term, _ in words.most_common(SEARCH_MAX_TERMS)]
+        budget = offers.aggregate(budget=Avg("task__budget"))["budget"]
+        self.budget = float(budget) if budget else None
+
+    def features(self):
+        """Profile features kept with cached recommendations, to score single tasks without reading the profile."""
+        return {"skill_ids": sorted(self.skill_ids), "terms": self.terms, "budget": self.budget}
+
+
+def budget_fit(budget, reference):
+    """1 for the budget equal to the reference, going down with the ratio of both."""
+    if not reference or not budget:
+        return 0.0
+    return 1.0 / (1.0 + abs(math.log(float(budget) / reference)))
+
+
+def open_tasks_for(user):
+    return Task.objects.filter(status=Task.TaskStatus.OPEN).exclude(client=user).exclude(Offer.task_bid_by(user))
+
+
+def best_first(ranking) -> List[Tuple[int, float]]:
+    return sorted(ranking, key=lambda item: (-item[1], -item[0]))[: settings.TASK_RECOMMENDATIONS_CACHED]
+
+
+def compute_recommendations(user) -> List[Tuple[int, float]]:
+    """Score open tasks for the contractor, returns best (task id, score) pairs, best first."""
+    return score_tasks(ContractorProfile(user))[0]
+
+
+def score_tasks(profile) -> Tuple[List[Tuple[int, float]], Tuple[int, float]]:
+    """
+    Best (task id, score) pairs for the profile, and id and text rank of the best text match, which text ranks were
+    divided by.
+    """
+    weights = settings.TASK_RECOMMENDATIONS_WEIGHTS
+    candidates = settings.TASK_RECOMMENDATIONS_CANDIDATES
+    tasks = open_tasks_for(profile.user)
+    best_text = (None, 1.0)
+    budgets: Dict[int, float] = {}
+    scores: Dict[int, float] = {}
+
+    if profile.skill_ids:
+        task_skills = (
+            Task.skills.through.objects.filter(task_id=OuterRef("pk"))
+            .values("task_id")
+            .annotate(total=Count("skill_id"))
+            .values("total")
+        )
+        matching = (
+            tasks.filter(skills__in=profile.skill_ids)
+            .values("id", "budget")
+            .annotate(matched=Count("skills"), total=Subquery(task_skills))
+            .order_by("-matched", "-id")[:candidates]
+        )
+        for row in matching:
+            union = row["total"] + len(profile.skill_ids) - row["matched"]
+            scores[row["id"]] = weights["skills"] * row["matched"] / union
+            budgets[row["id"]] = row["budget"]
+
+    if profile.terms:
+        relevant = (
+            get_search_backend()
+            .search(tasks, " ".join(profile.terms), match_any=True)
+            .order_by("-search_rank", "-id")
+            .values_list("id", "budget", "search_rank")[:candidates]
+        )
+        relevant = list(relevant)
+        best_rank = max((rank for _, _, rank in relevant), default=0) or 1
+        best_text = (relevant[0][0] if relevant else None, best_rank)
+        for task_id, budget, rank in relevant:
+            scores[task_id] = scores.get(task_id, 0.0) + weights["text"] * max(rank, 0) / best_rank
+            budgets[task_id] = budget
+
+    for task_id, budget in budgets.items():
+        scores[task_id] += weights["budget"] * budget_fit(budget, profile.budget)
+
+    return best_first(scores.items()), best_text
+
+
+def recommended_tasks(user, limit) -> List[Task]:
+    """
+    Best open tasks for the contractor, served from cache. Cached tasks which got closed or offered for in
+    the meantime are skipped. A refresh is queued when recommendations are missing, outdated or too few of them
+    remain, the cached ones are returned meanwhile.
+    """
+    cached = cache.get(CACHE_KEY.format(user_id=user.pk))
+    computed, ranking = (cached["computed"], cached["ranking"]) if cached else (0.0, [])
+    tasks = ranked_open_tasks(user, ranking)
+    outdated = time.time() - computed > settings.TASK_RECOMMENDATIONS_CACHE_TIMEOUT
+    if cached is None or outdated or len(tasks) < min(limit, len(ranking)):
+        user_id = user.pk
+        transaction.on_commit(lambda: queue_refresh([user_id]))
+    return tasks[:limit]
+
+
+def store_recommendations(user) -> List[Tuple[int, float]]:
+    profile = ContractorProfile(user)
+    ranking, best_text = score_tasks(profile)
+    entry = {"computed": time.time(), "ranking": ranking, "profile": profile.features(), "best_text": best_text}
+    cache.set(CACHE_KEY.format(user_id=user.pk), entry, settings.TASK_RECOMMENDATIONS_STALE_TIMEOUT)
+    return ranking
+
+
+def refresh_recommendations(user_ids):
+    """Compute and cache recommendations of contractors, run by tasksapp.tasks.refresh_recommendations_task."""
+    # changes made from now on queue another refresh
+    cache.delete_many([REFRESH_KEY.format(user_id=user_id) for user_id in user_ids])
+    for user in get_user_model().objects.filter(pk__in=user_ids):
+        store_recommendations(user)
+
+
+def queue_refresh(user_ids):
+    """Queue refresh of recommendations of contractors, leaving out the ones already waiting for it."""
+    user_ids = [
+        user_id for user_id in user_ids if cache.add(REFRESH_KEY.format(user_id=user_id), True, REFRESH_LOCK_TIMEOUT)
+    ]
+    if user_ids:
+        refresh_recommendations_task.delay(user_ids)
+
+
+def ranked_open_tasks(user, ranking) -> List[Task]:
+    tasks = open_tasks_for(user).in_bulk([task_id for task_id, _ in ranking])
+    return [tasks[task_id] for task_id, _ in ranking if task_id in tasks]
+
+
+def contractors_with_skills(task_id, skill_ids=()):
+    """Contractors having any skill of the task or any of skill_ids."""
+    task_skills = Task.skills.through.objects.filter(task_id=task_id).values("skill_id")
+    return UserProfile.skills.through.objects.filter(Q(skill_id__in=task_skills) | Q(skill_id__in=skill_ids))
+
+
+def text_relevance(task_id, words, profile, best_text):
+    """
+    Text score of the task for profile terms, as in score_tasks. Ranks are read from the search index only when
+    a profile term starts any word of the task, together with the current rank of the best text match, as index
+    statistics change with every task. The rank cached with it is used when that task is no longer open.
+    """
+    terms = profile["terms"]
+    if not any(word.startswith(term) for term in terms for word in words):
+        return 0.0
+    best_id, best_rank = best_text
+    tasks = Task.objects.filter(pk__in=[task_id, best_id], status=Task.TaskStatus.OPEN)
+    ranks = dict(get_search_backend().search(tasks, " ".join(terms), match_any=True).values_list("id", "search_rank"))
+    rank = ranks.get(task_id, 0)
+    best_rank = max(ranks.get(best_id, best_rank), rank) or 1
+    return max(rank, 0) / best_rank
+
+
+def score_task(task, entries) -> Dict[int, float]:
+    """
+    Scores of a single open task for contractors of cached entries, computed from the profile features kept with
+    them, like score_tasks does for all tasks. Contractors the task does not match, owns or got an offer from are
+    left out.
+    """
+    weights = settings.TASK_RECOMMENDATIONS_WEIGHTS
+    task_skills = set(Task.skills.through.objects.filter(task_id=task["id"]).values_list("skill_id", flat=True))
+    offered = set(
+        Offer.objects.filter(task_id=task["id"], contractor__in=list(entries)).values_list("contractor_id", flat=True)
+    )
+    words = search_terms(f"{task['title']} {task['description']}", limit=None)
+    scores = {}
+    for user_id, entry in entries.items():
+        if user_id == task["client_id"] or user_id in offered:
+            continue
+        profile = entry["profile"]
+        skill_ids = set(profile["skill_ids"])
+        matched = len(task_skills & skill_ids)
+        text = text_relevance(task["id"], words, profile, entry["best_text"])
+        if not matched and not text:
+            continue
+        scores[user_id] = (
+            weights["skills"] * matched / len(task_skills | skill_ids)
+            + weights["text"] * text
+            + weights["budget"] * budget_fit(task["budget"], profile["budget"])
+        )
+    return scores
+
+
+def update_task_recommendations(task_id, skill_ids=()):
+    """
+    Merge the task into cached recommendations of contractors having any of its skills or any of skill_ids (skills
+    removed from it), or remove it from them when it is not open or does not match anymore. Only this task is scored,
+    run by tasksapp.tasks.update_task_recommendations_task.
+    """
+    # changes made from now on queue another update
+    cache.delete(UPDATE_KEY.format(task_id=task_id))
+    user_ids = contractors_with_skills(task_id, skill_ids).values_list("userprofile__user_id", flat=True).distinct()
+    keys = {CACHE_KEY.format(user_id=user_id): user_id for user_id in user_ids}
+    entries = {keys[key]: entry for key, entry in cache.get_many(list(keys)).items()}
+    if not entries:
+        return
+    task = (
+        Task.objects.filter(pk=task_id, status=Task.TaskStatus.OPEN)
+        .values("id", "title", "description", "budget", "client_id")
+        .first()
+    )
+    scores = score_task(task, entries) if task else {}
+    updated = {}
+    for user_id, entry in entries.items():
+        ranking = [(cached_id, score) for cached_id, score in entry["ranking"] if cached_id != task_id]
+        if user_id in scores:
+            ranking = best_first(ranking + [(task_id, scores[user_id])])
+        if ranking != entry["ranking"]:
+            updated[CACHE_KEY.format(user_id=user_id)] = entry | {"ranking": ranking}
+    cache.set_many(updated, settings.TASK_RECOMMENDATIONS_STALE_TIMEOUT)
+
+
+def queue_task_update(task_id, skill_ids=()):
+    """
+    Queue merging of the task into cached recommendations when any contractor has its skills, unless an update is
+    already waiting. Updates for removed skills are always queued, as the waiting one does not know them.
+    """
+    if not contractors_with_skills(task_id, skill_ids).exists():
+        return
+    if cache.add(UPDATE_KEY.format(task_id=task_id), True, REFRESH_LOCK_TIMEOUT) or skill_ids:
+        update_task_recommendations_task.delay(task_id, list(skill_ids))
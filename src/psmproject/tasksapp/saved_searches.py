@@ -0,0 +1,138 @@
+"""
+Matching of tasks becoming open against task searches saved by contractors.
+
+Instead of contractors re-running their searches to catch new work, every task is matched once, when it becomes open,
+against all saved searches, and contractors of matching ones are notified. Saved searches are kept in a process-local
+inverted index: each search is listed under one of the keys a task must have to match it, a skill id when the search
+has skills, its longest phrase term otherwise, and searches with neither are candidates for every task.
+A task collects candidates for its skills and every prefix of its title and description words (phrase terms match
+word prefixes, as in task search), candidates are then checked against all their filters.
+The index is rebuilt when the generation counter in cache, bumped on every saved search change, differs from the one
+it was built at, so changes made by other processes are seen by the next match.
+"""
+
+import threading
+from decimal import Decimal
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set
+
+from django.core.cache import cache
+from django.utils.text import Truncator
+from django.utils.translation import gettext as _
+from usersapp.models import Notification
+
+from .models import SavedSearch, Task
+from .search import search_terms
+from .search_cache import bump_generation, new_generation
+
+GENERATION_KEY = "saved-searches:generation"
+
+
+class SavedQuery(NamedTuple):
+    id: int
+    contractor_id: int
+    terms: FrozenSet[str]
+    skill_ids: FrozenSet[int]
+    budget: Optional[Decimal]
+    min_days: Optional[int]
+    max_days: Optional[int]
+
+    def matches(self, task, prefixes, skill_ids):
+        return (
+            self.contractor_id != task.client_id
+            and self.terms <= prefixes
+            and self.skill_ids <= skill_ids
+            and (self.budget is None or task.budget >= self.budget)
+            and (self.min_days is None or task.days_to_complete >= self.min_days)
+            and (self.max_days is None or task.days_to_complete <= self.max_days)
+        )
+
+
+def word_prefixes(text) -> Set[str]:
+    """All prefixes of words of the text, a phrase term matches the text when it is one of them."""
+    return {word[:length] for word in search_terms(text, limit=None) for length in range(1, len(word) + 1)}
+
+
+def bump_saved_search_generation():
+    bump_generation(GENERATION_KEY)
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, new_generation(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+class SavedSearchIndex:
+    """Inverted index of saved searches by skill id and phrase term, see module description."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_skill: Dict[int, List[SavedQuery]] = {}
+        self._by_term: Dict[str, List[SavedQuery]] = {}
+        self._unkeyed: List[SavedQuery] = []
+        self.generation = None
+
+    def build(self, generation=None):
+        skills: Dict[int, Set[int]] = {}
+        for search_id, skill_id in SavedSearch.skills.through.objects.values_list("savedsearch_id", "skill_id"):
+            skills.setdefault(search_id, set()).add(skill_id)
+        by_skill: Dict[int, List[SavedQuery]] = {}
+        by_term: Dict[str, List[SavedQuery]] = {}
+        unkeyed: List[SavedQuery] = []
+        for search in SavedSearch.objects.all().iterator():
+            query = SavedQuery(
+                id=search.id,
+                contractor_id=search.contractor_id,
+                terms=frozenset(search_terms(search.query)),
+                skill_ids=frozenset(skills.get(search.id, ())),
+                budget=search.budget,
+                min_days=search.min_days_to_complete,
+                max_days=search.max_days_to_complete,
+            )
+            if query.skill_ids:
+                by_skill.setdefault(min(query.skill_ids), []).append(query)
+            elif query.terms:
+                # the longest term is the most selective one
+                by_term.setdefault(max(query.terms, key=len), []).append(query)
+            else:
+                unkeyed.append(query)
+        with self._lock:
+            self._by_skill, self._by_term, self._unkeyed = by_skill, by_term, unkeyed
+            self.generation = generation
+
+    def ensure_fresh(self):
+        generation = get_generation()
+        if generation != self.generation:
+            self.build(generation)
+
+    def match(self, task, skill_ids) -> List[SavedQuery]:
+        """Saved searches the task matches, except searches of the task client."""
+        self.ensure_fresh()
+        skill_ids = frozenset(skill_ids)
+        prefixes = word_prefixes(f"{task.title} {task.description}")
+        with self._lock:
+            candidates = list(self._unkeyed)
+            for skill_id in skill_ids:
+                candidates.extend(self._by_skill.get(skill_id, ()))
+            for prefix in prefixes:
+                candidates.extend(self._by_term.get(prefix, ()))
+        return [query for query in candidates if query.matches(task, prefixes, skill_ids)]
+
+
+saved_search_index = SavedSearchIndex()
+
+
+def notify_saved_searches(task_id):
+    """
+    Notify contractors whose saved searches match the task, once per contractor. Return ids of notified contractors.
+    """
+    task = Task.objects.filter(id=task_id, status=Task.TaskStatus.OPEN).first()
+    if not task:
+        return set()
+    skill_ids = task.skills.values_list("id", flat=True)
+    contractor_ids = {query.contractor_id for query in saved_search_index.match(task, skill_ids)}
+    content = Truncator(_("New task matching your saved search: %(title)s") % {"title": task.title}).chars(150)
+    Notification.objects.bulk_create(Notification(user_id=user_id, content=content) for user_id in contractor_ids)
+    return contractor_ids
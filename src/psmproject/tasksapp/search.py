@@ -0,0 +1,226 @@
+"""
+Full-text search over task titles and descriptions.
+
+Each database vendor keeps its own inverted index next to the tasksapp_task table (FTS5 virtual table on SQLite,
+GIN-indexed tsvector table on PostgreSQL). The index is kept in sync by Task post_save/post_delete signals and can
+be recreated with the rebuild_task_search_index command. Results are ranked by text relevance divided by a recency
+decay, so fresh tasks win over old ones of similar relevance.
+"""
+
+import operator
+import re
+from functools import lru_cache, reduce
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+SEARCH_TERM_RE = re.compile(r"\w+", re.UNICODE)
+SEARCH_MAX_TERMS = 10
+
+
+def search_terms(phrase, limit=SEARCH_MAX_TERMS):
+    """Split phrase into lowercase word terms, punctuation and query syntax characters are dropped."""
+    return [term.lower() for term in SEARCH_TERM_RE.findall(phrase or "")][:limit]
+
+
+class BaseTaskSearchBackend:
+    """
+    Interface of task search backends. Every backend filters a Task queryset by phrase and annotates it with
+    a "search_rank" value (the higher, the better match), and maintains its index for single tasks.
+    Tasks must contain every term of the phrase, or any of them when match_any is set.
+    filter() only narrows the queryset down to matching tasks, without ranking, so its result can be used
+    in subqueries (e.g. id__in).
+    """
+
+    def search(self, queryset, phrase, match_any=False):
+        raise NotImplementedError
+
+    def filter(self, queryset, phrase, match_any=False):
+        raise NotImplementedError
+
+    def index_task(self, task):
+        pass
+
+    def remove_task(self, task_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    @staticmethod
+    def recency_days():
+        return settings.TASK_SEARCH_RECENCY_DAYS
+
+
+class BasicTaskSearchBackend(BaseTaskSearchBackend):
+    """
+    Fallback backend without an index, tasks containing all terms are ranked by creation date only.
+    """
+
+    def search(self, queryset, phrase, match_any=False):
+        return self.filter(queryset, phrase, match_any).annotate(search_rank=F("id"))
+
+    def filter(self, queryset, phrase, match_any=False):
+        conditions = [Q(title__icontains=term) | Q(description__icontains=term) for term in search_terms(phrase)]
+        if match_any and conditions:
+            return queryset.filter(reduce(operator.or_, conditions))
+        for condition in conditions:
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class SqliteTaskSearchBackend(BaseTaskSearchBackend):
+    """
+    SQLite FTS5 backend. Porter tokenizer gives English stemming, other languages (e.g. Polish) are matched by
+    word prefixes. Rank is bm25 with title matches weighted above description matches.
+    """
+
+    table = "tasksapp_task_fts"
+    title_weight = 2.0
+    description_weight = 1.0
+
+    @staticmethod
+    def match_expression(terms, match_any=False):
+        return (" OR " if match_any else " ").join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, phrase, match_any=False):
+        terms = search_terms(phrase)
+        if not terms:
+            return queryset.annotate(search_rank=F("id"))
+        match = self.match_expression(terms, match_any)
+        # joined instead of a correlated subquery, so MATCH is evaluated once and not for every task
+        return queryset.extra(
+            tables=[self.table],
+            where=[f"{self.table}.rowid = tasksapp_task.id", f"{self.table} MATCH %s"],
+            params=[match],
+            select={
+                "search_rank": f"-bm25({self.table}, %s, %s) "
+                "/ (1.0 + (julianday('now') - julianday(tasksapp_task.created)) / %s)"
+            },
+            select_params=[self.title_weight, self.description_weight, float(self.recency_days())],
+        )
+
+    def filter(self, queryset, phrase, match_any=False):
+        terms = search_terms(phrase)
+        if not terms:
+            return queryset
+        match = self.match_expression(terms, match_any)
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]))
+
+    def index_task(self, task):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", (task.pk,))
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description) VALUES (%s, %s, %s)",
+                (task.pk, task.title, task.description),
+            )
+
+    def remove_task(self, task_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", (task_id,))
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description) SELECT id, title, description FROM tasksapp_task"
+            )
+
+
+class PostgresTaskSearchBackend(BaseTaskSearchBackend):
+    """
+    PostgreSQL backend storing a weighted tsvector per task in a GIN-indexed table. The document and query are
+    built for every text search configuration from TASK_SEARCH_CONFIGS, so stemming works for each listed language.
+    """
+
+    table = "tasksapp_task_search"
+
+    @staticmethod
+    def configs():
+        return list(dict.fromkeys(settings.TASK_SEARCH_CONFIGS.values()))
+
+    def document_sql(self, title, description):
+        parts, params = [], []
+        for config in self.configs():
+            parts.append(
+                f"setweight(to_tsvector(%s::regconfig, coalesce({title}, '')), 'A') || "
+                f"setweight(to_tsvector(%s::regconfig, coalesce({description}, '')), 'B')"
+            )
+            params += [config, config]
+        return " || ".join(parts), params
+
+    def query_sql(self, terms, match_any=False):
+        query = (" | " if match_any else " & ").join(f"{term}:*" for term in terms)
+        configs = self.configs()
+        return " || ".join(["to_tsquery(%s::regconfig, %s)"] * len(configs)), [
+            param for config in configs for param in (config, query)
+        ]
+
+    def search(self, queryset, phrase, match_any=False):
+        terms = search_terms(phrase)
+        if not terms:
+            return queryset.annotate(search_rank=F("id"))
+        query, params = self.query_sql(terms, match_any)
+        rank = RawSQL(
+            f"SELECT ts_rank_cd(document, {query}) FROM {self.table} WHERE task_id = tasksapp_task.id",
+            params,
+            output_field=FloatField(),
+        )
+        recency = RawSQL(
+            "1.0 + EXTRACT(EPOCH FROM (now() - tasksapp_task.created)) / 86400.0 / %s",
+            (float(self.recency_days()),),
+            output_field=FloatField(),
+        )
+        return self.filter(queryset, phrase, match_any).annotate(search_rank=rank / recency)
+
+    def filter(self, queryset, phrase, match_any=False):
+        terms = search_terms(phrase)
+        if not terms:
+            return queryset
+        query, params = self.query_sql(terms, match_any)
+        return queryset.filter(id__in=RawSQL(f"SELECT task_id FROM {self.table} WHERE document @@ ({query})", params))
+
+    def index_task(self, task):
+        document, _ = self.document_sql("%s", "%s")
+        document_params = [
+            param for config in self.configs() for param in (config, task.title, config, task.description)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (task_id, document) VALUES (%s, {document}) "
+                "ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document",
+                [task.pk, *document_params],
+            )
+
+    def remove_task(self, task_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE task_id = %s", (task_id,))
+
+    def rebuild(self):
+        document, params = self.document_sql("title", "description")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (task_id, document) SELECT id, {document} FROM tasksapp_task", params
+            )
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SqliteTaskSearchBackend,
+    "postgresql": PostgresTaskSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path, vendor):
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(vendor, BasicTaskSearchBackend)()
+
+
+def get_search_backend():
+    """Return backend from TASK_SEARCH_BACKEND setting or the one matching the database vendor."""
+    return _load_backend(settings.TASK_SEARCH_BACKEND, connection.vendor)
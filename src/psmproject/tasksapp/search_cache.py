@@ -0,0 +1,150 @@
+"""
+Cache of task search results and facet counts, shared by all contractors.
+
+TasksSearchView results are stored as the ordered list of matching task ids, at most TASK_SEARCH_CACHE_MAX_IDS of
+them, under a key made of the normalized search form (phrase, budget, days bounds, sorted skill ids). Facet counts
+(see tasksapp.facets) are stored the same way. Neither depends on the contractor: own tasks and tasks the contractor
+already made an offer for are left out of the cached ids and subtracted from the cached counts on every request, so
+a popular search is computed once for everybody and every page of it is served from a single entry.
+Keys also contain a generation counter bumped when any task or its skills change (see tasksapp.signals). Bumping it
+makes all keys built with its old value unreachable, stale entries expire after TASK_SEARCH_CACHE_TIMEOUT.
+Every lookup is recorded in the process-local stats and sent as search_cache_lookup signal for monitoring.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+
+from .facets import TaskFacets
+
+GENERATION_KEY = "task-search:generation"
+RESULTS_KEY = "task-search:{generation}:{digest}"
+FACETS_KEY = "task-facets:{generation}:{digest}"
+PAGE_PARAMS = ("page", "after", "before")
+
+# sent after every lookup with hit (bool) and seconds spent reading or computing the results
+search_cache_lookup = Signal()
+
+
+class SearchCacheStats:
+    """Hit ratio and latency of search cache lookups made in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.hit_seconds = 0.0
+            self.miss_seconds = 0.0
+
+    def record(self, hit, seconds):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_seconds += seconds
+            else:
+                self.misses += 1
+                self.miss_seconds += seconds
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hit_ratio,
+                "hit_latency": self.hit_seconds / self.hits if self.hits else 0.0,
+                "miss_latency": self.miss_seconds / self.misses if self.misses else 0.0,
+            }
+
+
+stats = SearchCacheStats()
+
+
+def normalize_search(phrase="", budget=None, min_days=None, max_days=None, skill_ids=()):
+    """Search filters in canonical form, equal for searches returning the same tasks."""
+    return {
+        "query": " ".join(phrase.lower().split()),
+        "budget": str(budget.normalize()) if budget else None,
+        "min_days": min_days or None,
+        "max_days": max_days or None,
+        "skills": sorted(set(skill_ids)),
+    }
+
+
+def new_generation():
+    return time.time_ns()
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_generation(), None)
+
+
+def bump_search_generation():
+    bump_generation(GENERATION_KEY)
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # a counter evicted from cache starts from a new value, so old entries are not reused
+        cache.add(GENERATION_KEY, new_generation(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def filters_key(template, search):
+    digest = hashlib.sha1(json.dumps(search, sort_keys=True).encode()).hexdigest()
+    return template.format(generation=get_generation(), digest=digest)
+
+
+def results_key(search):
+    return filters_key(RESULTS_KEY, search)
+
+
+def facets_key(search):
+    return filters_key(FACETS_KEY, search)
+
+
+def cached_ids(key, compute):
+    """
+    Return ids of tasks of compute() queryset, in its order, and whether they were cut at TASK_SEARCH_CACHE_MAX_IDS,
+    computing and storing them when missing.
+    """
+    start = time.perf_counter()
+    entry = cache.get(key)
+    hit = entry is not None
+    if not hit:
+        limit = settings.TASK_SEARCH_CACHE_MAX_IDS
+        ids = list(compute().values_list("id", flat=True)[: limit + 1])
+        entry = {"ids": ids[:limit], "truncated": len(ids) > limit}
+        cache.set(key, entry, settings.TASK_SEARCH_CACHE_TIMEOUT)
+    seconds = time.perf_counter() - start
+    stats.record(hit, seconds)
+    search_cache_lookup.send(sender=cached_ids, hit=hit, seconds=seconds)
+    return entry["ids"], entry["truncated"]
+
+
+def cached_facets(key, compute):
+    """Return compute() TaskFacets for the key, computing and storing them when missing."""
+    counts = cache.get(key)
+    if counts is not None:
+        return TaskFacets(**counts)
+    facets = compute()
+    cache.set(key, facets.as_dict(), settings.TASK_SEARCH_CACHE_TIMEOUT)
+    return facets
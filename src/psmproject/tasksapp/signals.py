@@ -1,10 +1,17 @@
 from django.conf import settings
 from django.contrib.auth.models import Group
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
 from fieldsignals import post_save_changed
-from tasksapp.models import Offer, Task
+from tasksapp.models import Offer, SavedSearch, Task
 
+from .recommendations import queue_task_update
+from .saved_searches import bump_saved_search_generation, notify_saved_searches
+from .search import get_search_backend
+from .search_cache import bump_search_generation
+from .skill_index import skill_index
 from .tasks import send_mail_task
 from .utils import receiver_not_in_test
 
@@ -47,3 +54,105 @@ def send_mail_offer_submitted(sender, instance, created, **kwargs):
         )
         client = instance.task.client
         send_mail_task.delay(subject="Offer submitted", message=message, recipient=client.email)
+
+
+@receiver(post_save, sender=Task)
+def update_task_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index_task(instance)
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_task(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+def update_task_skill_index(sender, instance, raw=False, **kwargs):
+    if not raw and skill_index.is_built:
+        transaction.on_commit(lambda: skill_index.refresh_tasks([instance.pk]))
+
+
+@receiver(m2m_changed, sender=Task.skills.through)
+def update_task_skill_index_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear") or not skill_index.is_built:
+        return
+    if not reverse:
+        transaction.on_commit(lambda: skill_index.refresh_tasks([instance.pk]))
+    elif pk_set:
+        transaction.on_commit(lambda: skill_index.refresh_tasks(pk_set))
+    else:
+        # skill cleared from all its tasks, affected tasks are not known any more
+        transaction.on_commit(skill_index.build)
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_from_skill_index(sender, instance, **kwargs):
+    if skill_index.is_built:
+        task_id = instance.pk
+        transaction.on_commit(lambda: skill_index.remove_task(task_id))
+
+
+@receiver(post_save, sender=Task)
+def update_recommendations_on_task_create(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.status == Task.TaskStatus.OPEN:
+        task_id = instance.pk
+        transaction.on_commit(lambda: queue_task_update(task_id))
+
+
+@receiver(post_save_changed, sender=Task, fields=["status"])
+def update_recommendations_on_status_change(sender, instance, changed_fields, **kwargs):
+    # opened tasks are merged into recommendations, closed ones removed from them
+    if Task.TaskStatus.OPEN in changed_fields["status"]:
+        task_id = instance.pk
+        transaction.on_commit(lambda: queue_task_update(task_id))
+
+
+@receiver(m2m_changed, sender=Task.skills.through)
+def update_recommendations_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove") and not reverse and instance.status == Task.TaskStatus.OPEN:
+        task_id = instance.pk
+        # contractors having only removed skills are updated too
+        removed = sorted(pk_set) if action == "post_remove" else []
+        transaction.on_commit(lambda: queue_task_update(task_id, removed))
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_search_cache_on_task_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(bump_search_generation)
+
+
+@receiver(m2m_changed, sender=Task.skills.through)
+def invalidate_search_cache_on_skills_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(bump_search_generation)
+
+
+@receiver(post_save, sender=Task)
+def notify_saved_searches_on_task_create(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.status == Task.TaskStatus.OPEN:
+        # after commit, so skills added to the new task in the same transaction are matched too
+        task_id = instance.pk
+        transaction.on_commit(lambda: notify_saved_searches(task_id))
+
+
+@receiver(post_save_changed, sender=Task, fields=["status"])
+def notify_saved_searches_on_task_open(sender, instance, changed_fields, **kwargs):
+    if instance.status == Task.TaskStatus.OPEN:
+        task_id = instance.pk
+        transaction.on_commit(lambda: notify_saved_searches(task_id))
+
+
+@receiver(post_save, sender=SavedSearch)
+@receiver(post_delete, sender=SavedSearch)
+def invalidate_saved_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(bump_saved_search_generation)
+
+
+@receiver(m2m_changed, sender=SavedSearch.skills.through)
+def invalidate_saved_search_index_on_skills_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(bump_saved_search_generation)
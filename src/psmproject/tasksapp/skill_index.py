@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List
+
+from django.conf import settings
+
+from .models import Task
+
+# positions of bits set in every byte value
+BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def bitmap_ids(bitmap: int) -> List[int]:
+    """Return ids of bits set in bitmap, in ascending order."""
+    ids = []
+    for index, value in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+        if value:
+            offset = index * 8
+            ids.extend(offset + bit for bit in BYTE_BITS[value])
+    return ids
+
+
+class SkillIndex:
+    """
+    Process-local index mapping each skill id to a bitmap of open tasks requiring it, bit n being the task with id n.
+    Python integers are used as bitmaps, so "any of" and "all of" skill queries are a few big-int OR/AND operations
+    instead of M2M joins.
+    The index is built on first use and kept up to date by tasksapp.signals for changes made in this process.
+    Changes made by other processes are picked up when the index is rebuilt after max_age seconds.
+    """
+
+    def __init__(self, max_age=None):
+        self._max_age = max_age
+        self._bitmaps: Dict[int, int] = {}
+        self._task_skills: Dict[int, FrozenSet[int]] = {}
+        self._lock = threading.Lock()
+        self.built_at = None
+
+    @property
+    def max_age(self):
+        return self._max_age if self._max_age is not None else settings.TASK_SKILL_INDEX_MAX_AGE
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def build(self):
+        rows = Task.skills.through.objects.filter(task__status=Task.TaskStatus.OPEN).values_list("task_id", "skill_id")
+        task_skills: Dict[int, set] = {}
+        skill_bits: Dict[int, bytearray] = {}
+        for task_id, skill_id in rows.iterator():
+            task_skills.setdefault(task_id, set()).add(skill_id)
+            bits = skill_bits.setdefault(skill_id, bytearray())
+            if len(bits) <= task_id >> 3:
+                bits.extend(bytes((task_id >> 3) + 1 - len(bits)))
+            bits[task_id >> 3] |= 1 << (task_id & 7)
+        bitmaps = {skill_id: int.from_bytes(bits, "little") for skill_id, bits in skill_bits.items()}
+        with self._lock:
+            self._bitmaps = bitmaps
+            self._task_skills = {task_id: frozenset(skill_ids) for task_id, skill_ids in task_skills.items()}
+            self.built_at = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._bitmaps = {}
+            self._task_skills = {}
+            self.built_at = None
+
+    def ensure_fresh(self):
+        if not self.is_built or time.monotonic() - self.built_at > self.max_age:
+            self.build()
+
+    def refresh_tasks(self, task_ids: Iterable[int]):
+        """Reload skills of given tasks from database, tasks which are not open are dropped from the index."""
+        if not self.is_built:
+            return
+        task_ids = set(task_ids)
+        task_skills: Dict[int, set] = {}
+        open_tasks = Task.objects.filter(id__in=task_ids, status=Task.TaskStatus.OPEN)
+        for task_id, skill_id in open_tasks.values_list("id", "skills"):
+            skills = task_skills.setdefault(task_id, set())
+            if skill_id is not None:
+                skills.add(skill_id)
+        with self._lock:
+            for task_id in task_ids:
+                self._remove(task_id)
+                if task_id in task_skills:
+                    self._add(task_id, frozenset(task_skills[task_id]))
+
+    def remove_task(self, task_id: int):
+        with self._lock:
+            self._remove(task_id)
+
+    def all_of(self, skill_ids: Iterable[int]) -> int:
+        """Bitmap of open tasks requiring every given skill."""
+        skill_ids = set(skill_ids)
+        if not skill_ids:
+            return 0
+        bitmaps = self._bitmaps
+        result = -1
+        for skill_id in skill_ids:
+            result &= bitmaps.get(skill_id, 0)
+            if not result:
+                break
+        return result
+
+    def any_of(self, skill_ids: Iterable[int]) -> int:
+        """Bitmap of open tasks requiring at least one of given skills."""
+        bitmaps = self._bitmaps
+        result = 0
+        for skill_id in set(skill_ids):
+            result |= bitmaps.get(skill_id, 0)
+        return result
+
+    def _add(self, task_id, skill_ids):
+        self._task_skills[task_id] = skill_ids
+        bit = 1 << task_id
+        for skill_id in skill_ids:
+            self._bitmaps[skill_id] = self._bitmaps.get(skill_id, 0) | bit
+
+    def _remove(self, task_id):
+        skill_ids = self._task_skills.pop(task_id, ())
+        mask = ~(1 << task_id)
+        for skill_id in skill_ids:
+            bitmap = self._bitmaps[skill_id] & mask
+            if bitmap:
+                self._bitmaps[skill_id] = bitmap
+            else:
+                del self._bitmaps[skill_id]
+
+
+skill_index = SkillIndex()
@@ -4,7 +4,11 @@ export default class SkillManager {
      * Create skill manager, init internal variables and link variables with document elements
      */
     constructor() {
-        this.skills = JSON.parse(document.getElementById('skills').textContent);
+        this.autocompleteUrl = JSON.parse(document.getElementById('skillAutocompleteUrl').textContent);
+        const skillCounts = document.getElementById('skillCounts');
+        this.skillCounts = skillCounts ? JSON.parse(skillCounts.textContent) : null;
+        this.selectedIDs = new Set();
+        this.lastRequest = 0;
         this.skillSelIDPrefix = JSON.parse(document.getElementById('skillIDPrefix').textContent);
         this.skillPosIDPrefix = "pos-skill-";
         this.filterInput = document.getElementById('filter-skills');
@@ -35,13 +39,18 @@ export default class SkillManager {
 
     /**
      * Prepare and append document element for single skill on selection list. Creates html tags, adds classes
-     * and contents
+     * and contents. Number of found tasks having the skill is shown when provided (task search)
      */
     renderSkill(skill, idPrefix, onClick, parent) {
         const skillSpan = document.createElement("span");
         skillSpan.id = idPrefix + skill.id;
-        skillSpan.classList.add("badge", "text-bg-primary", "ms-1");
-        skillSpan.innerHTML = skill.skill;
+        if (skill.count === undefined) {
+            skillSpan.classList.add("badge", "text-bg-primary", "ms-1");
+            skillSpan.innerHTML = skill.skill;
+        } else {
+            skillSpan.classList.add("badge", skill.count ? "text-bg-primary" : "text-bg-light", "ms-1");
+            skillSpan.innerHTML = `${skill.skill} (${skill.count})`;
+        }
         skillSpan.onclick = onClick;
         parent.appendChild(skillSpan);
     }
@@ -60,8 +69,7 @@ export default class SkillManager {
     selectSkill(skill) {
         this.renderSkillForm(skill, this.skillSelIDPrefix, () => this.deselectSkill(skill), this.selectedSkillList);
         this.removeSkill(skill, this.skillPosIDPrefix, this.skillList);
-        const index = this.skills.findIndex(item => item.id === skill.id);
-        this.skills.splice(index, 1);
+        this.selectedIDs.add(String(skill.id));
     }
 
     /**
@@ -69,23 +77,34 @@ export default class SkillManager {
      */
     deselectSkill(skill) {
         this.removeSkill(skill, this.skillSelIDPrefix, this.selectedSkillList);
-        this.skills.push(skill);
-        this.displayList(this.skills, this.filterInput.value);
+        this.selectedIDs.delete(String(skill.id));
+        this.displayList(this.filterInput.value);
     }
 
     /**
-     * Display list of all skills matching filter criteria.
+     * Display list of not selected skills matching filter, suggested by the skill autocomplete endpoint.
+     * Responses to older requests are ignored, so the list always matches current filter.
      */
-    displayList(skills, filter) {
+    async displayList(filter) {
+        const request = ++this.lastRequest;
+        if (filter.length === 0) {
+            this.skillList.innerHTML = '';
+            return;
+        }
+        const response = await fetch(`${this.autocompleteUrl}?q=${encodeURIComponent(filter)}`);
+        const data = await response.json();
+        if (request !== this.lastRequest) {
+            return;
+        }
         this.skillList.innerHTML = '';
-        if (filter.length > 0) {
-            const results = skills.filter(obj => {
-                return obj.skill.toLowerCase().includes(filter.toLowerCase());
-            });
-
-            for (const skill of results) {
-                this.renderSkill(skill, this.skillPosIDPrefix, () => this.selectSkill(skill), this.skillList);
+        for (const skill of data.skills) {
+            if (this.selectedIDs.has(String(skill.id))) {
+                continue;
+            }
+            if (this.skillCounts) {
+                skill.count = this.skillCounts[skill.id] || 0;
             }
+            this.renderSkill(skill, this.skillPosIDPrefix, () => this.selectSkill(skill), this.skillList);
         }
     }
 
@@ -98,6 +117,7 @@ export default class SkillManager {
         for (const button of buttons_el_arr) {
             const input = button.getElementsByTagName("input")[0];
             const skill_obj = { "id": button.id.replace(this.skillSelIDPrefix, ""), "skill": input.value }
+            this.selectedIDs.add(skill_obj.id);
             button.onclick = () => this.deselectSkill(skill_obj);
         }
     }
@@ -107,11 +127,6 @@ export default class SkillManager {
      */
     initEventListeners() {
         this.addOnClickToExistingSkills(this.selectedSkillList);
-        this.filterInput.addEventListener('input', (e) => {
-            if (e.target.value.length >= 3)
-                this.displayList(this.skills, e.target.value);
-            else
-                this.skillList.innerHTML = '';
-        });
+        this.filterInput.addEventListener('input', (e) => this.displayList(e.target.value.trim()));
     }
 }
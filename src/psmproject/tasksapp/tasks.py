@@ -10,3 +10,19 @@ def send_mail_task(subject, message, recipient):
         send_mail(subject=subject, message=message, from_email=settings.DEFAULT_FROM_EMAIL, recipient_list=[recipient])
     except SoftTimeLimitExceeded:
         pass
+
+
+@shared_task
+def refresh_recommendations_task(user_ids):
+    # imported here, tasksapp.recommendations queues this task
+    from .recommendations import refresh_recommendations
+
+    refresh_recommendations(user_ids)
+
+
+@shared_task
+def update_task_recommendations_task(task_id, skill_ids):
+    # imported here, tasksapp.recommendations queues this task
+    from .recommendations import update_task_recommendations
+
+    update_task_recommendations(task_id, skill_ids)
@@ -21,6 +21,7 @@ from tasksapp.models import (
     Offer,
     Solution,
     SolutionAttachment,
+    Task,
 )
 
 
@@ -72,6 +73,17 @@ class TestOfferModel(TestCase):
 
         self.assertIsInstance(self.offer.budget, decimal.Decimal)
 
+    def test_should_exclude_tasks_contractor_made_offer_for(self):
+        """
+        Test check that task_bid_by condition excludes only tasks with an offer of the given contractor.
+        """
+        other_task = TaskFactory()
+        OfferFactory(task=other_task)
+        tasks = Task.objects.filter(id__in=[self.offer.task_id, other_task.id])
+
+        self.assertQuerysetEqual(tasks.exclude(Offer.task_bid_by(self.test_user)), [other_task])
+        self.assertQuerysetEqual(tasks.filter(Offer.task_bid_by(self.test_user)), [self.offer.task])
+
     def test_should_raise_exception_when_there_is_no_contractor_to_offer(self):
         """
         Test check that is raised exception when offer has no contractor.
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from factories.factories import TaskFactory, UserFactory
+from tasksapp.facets import task_facets
+from tasksapp.models import Task
+from tasksapp.search import get_search_backend
+from usersapp.helpers import skills_from_text
+
+
+@override_settings(TASK_SEARCH_FACET_BUDGETS=[100, 500], TASK_SEARCH_FACET_DAYS=[4, 8])
+class TestTaskFacets(TestCase):
+    def setUp(self):
+        self.client_user = UserFactory.create(username="facets_client")
+        self.python, self.django, self.react = skills_from_text(["Python", "Django", "React"], create=True)
+        self.shop = self.create_task("Sklep internetowy", 50, 2, [self.python, self.django])
+        self.blog = self.create_task("Blog firmowy", 300, 5, [self.python])
+        self.app = self.create_task("Aplikacja sklepu", 800, 10, [self.react])
+
+    def create_task(self, title, budget, days, skills):
+        task = TaskFactory.create(client=self.client_user, title=title, budget=budget, days_to_complete=days)
+        task.skills.set(skills)
+        return task
+
+    def test_should_count_tasks_per_skill_budget_and_days(self):
+        """
+        Test checks that facets count matching tasks per skill, budget range and days to complete range.
+        """
+        facets = task_facets(Task.objects.all())
+
+        self.assertEqual(facets.skills, {self.python.id: 2, self.django.id: 1, self.react.id: 1})
+        self.assertEqual(facets.budget, [1, 1, 1])
+        self.assertEqual(facets.days, [1, 1, 1])
+        self.assertEqual(facets.budget_choices(), [{"budget": 100, "count": 2}, {"budget": 500, "count": 1}])
+        self.assertEqual(
+            facets.days_choices(),
+            [
+                {"min": None, "max": 3, "count": 1},
+                {"min": 4, "max": 7, "count": 1},
+                {"min": 8, "max": None, "count": 1},
+            ],
+        )
+
+    def test_should_compute_facets_in_one_query(self):
+        """
+        Test checks that all facets come from a single query.
+        """
+        with self.assertNumQueries(1):
+            task_facets(Task.objects.filter(skills=self.python))
+
+    def test_should_count_only_tasks_matching_phrase_and_skills(self):
+        """
+        Test checks that facets are limited to tasks matching the search phrase and selected skills.
+        """
+        queryset = get_search_backend().filter(Task.objects.all(), "sklep").filter(skills=self.python)
+
+        facets = task_facets(queryset)
+
+        self.assertEqual(facets.skills, {self.python.id: 1, self.django.id: 1})
+        self.assertEqual(facets.budget, [1, 0, 0])
+
+    def test_should_add_counts_to_search_page(self):
+        """
+        Test checks that the search page lists skills with their counts and budget facets for current filters.
+        """
+        contractor = UserFactory.create(username="facets_contractor")
+        self.client.login(username=contractor.username, password="secret")
+
+        response = self.client.get(reverse("offer-task-search"), {"query": "sklep"})
+
+        self.assertEqual(response.context["skill_counts"], {self.python.id: 1, self.django.id: 1, self.react.id: 1})
+        self.assertEqual(response.context["budget_facets"][0], {"budget": 100, "count": 1})
+        self.assertContains(response, 'href="?query=sklep&amp;budget=100"')
+
+    @override_settings(TASK_SEARCH_CACHE=True)
+    def test_should_serve_facets_from_cache(self):
+        """
+        Test checks that facets of a repeated search are not computed again until tasks change.
+        """
+        cache.clear()
+        contractor = UserFactory.create(username="facets_contractor")
+        self.client.login(username=contractor.username, password="secret")
+        url = reverse("offer-task-search")
+
+        with patch("tasksapp.views.contractor.task_facets", wraps=task_facets) as compute:
+            self.client.get(url, {"query": "sklep"})
+            response = self.client.get(url, {"query": "sklep"})
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(response.context["budget_facets"][0]["count"], 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_task("Sklep z grami", 200, 3, [self.python])
+            response = self.client.get(url, {"query": "sklep"})
+
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(response.context["budget_facets"][0]["count"], 2)
@@ -0,0 +1,100 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from factories.factories import TaskFactory, UserFactory
+from tasksapp.models import Task
+
+
+@override_settings(LIST_PAGINATION_COUNT="exact")
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        self.user = UserFactory.create(username="keyset_client")
+        self.tasks = sorted(TaskFactory.create_batch(25, client=self.user), key=lambda task: -task.id)
+        self.client.login(username=self.user.username, password="secret")
+
+    def get_page(self, **params):
+        return self.client.get(reverse("tasks-client-list"), params)
+
+    def test_should_return_next_page_after_cursor(self):
+        """
+        Test checks that ?after= returns the tasks following the cursor and links to both neighbouring pages.
+        """
+        first = self.get_page()
+        page = first.context["page_obj"]
+        self.assertTrue(page.is_keyset)
+        self.assertEqual(list(first.context["object_list"]), self.tasks[:10])
+
+        second = self.get_page(after=page.next_cursor)
+
+        self.assertEqual(list(second.context["object_list"]), self.tasks[10:20])
+        self.assertContains(second, f'href="?before={self.tasks[10].id}"')
+        self.assertContains(second, f'href="?after={self.tasks[19].id}"')
+
+    def test_should_return_previous_page_before_cursor(self):
+        """
+        Test checks that ?before= returns the tasks preceding the cursor in the same order.
+        """
+        response = self.get_page(before=self.tasks[20].id)
+        page = response.context["page_obj"]
+
+        self.assertEqual(list(response.context["object_list"]), self.tasks[10:20])
+        self.assertTrue(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_should_not_link_past_last_page(self):
+        """
+        Test checks that the last page has no link to the next one.
+        """
+        response = self.get_page(after=self.tasks[19].id)
+
+        self.assertEqual(list(response.context["object_list"]), self.tasks[20:])
+        self.assertFalse(response.context["page_obj"].has_next())
+        self.assertNotContains(response, 'href="?after=')
+
+    def test_should_run_same_queries_for_deep_page(self):
+        """
+        Test checks that a page deep in the list costs the same number of queries as the first one.
+        """
+        with CaptureQueriesContext(connection) as first:
+            self.get_page()
+        with self.assertNumQueries(len(first.captured_queries)):
+            self.get_page(after=self.tasks[-2].id)
+
+    def test_should_keep_page_numbers_when_page_requested(self):
+        """
+        Test checks that ?page= is still served by the standard paginator.
+        """
+        response = self.get_page(page=2)
+
+        self.assertFalse(hasattr(response.context["page_obj"], "is_keyset"))
+        self.assertEqual(list(response.context["object_list"]), self.tasks[10:20])
+
+    def test_should_return_404_for_invalid_cursor(self):
+        """
+        Test checks that non numeric cursor is rejected.
+        """
+        self.assertEqual(self.get_page(after="abc").status_code, 404)
+
+    @override_settings(LIST_PAGINATION_COUNT="approximate", LIST_PAGINATION_COUNT_LIMIT=20)
+    def test_should_show_approximate_count_of_large_list(self):
+        """
+        Test checks that counting stops at the limit and the count is shown as approximate.
+        """
+        response = self.get_page()
+        page = response.context["page_obj"]
+
+        self.assertEqual(page.count, 20)
+        self.assertFalse(page.count_is_exact)
+        self.assertContains(response, "About 20 results")
+
+    def test_should_show_exact_count(self):
+        """
+        Test checks that exact count of all listed tasks is shown.
+        """
+        Task.objects.filter(pk=self.tasks[0].pk).delete()
+
+        response = self.get_page()
+
+        self.assertEqual(response.context["page_obj"].count, 24)
+        self.assertContains(response, "24 results")
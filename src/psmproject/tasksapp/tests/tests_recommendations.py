@@ -0,0 +1,214 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from factories.factories import OfferFactory, TaskFactory, UserFactory
+from tasksapp.models import Task
+from tasksapp.recommendations import (
+    CACHE_KEY,
+    ContractorProfile,
+    budget_fit,
+    compute_recommendations,
+    recommended_tasks,
+    store_recommendations,
+)
+from tasksapp.tasks import (
+    refresh_recommendations_task,
+    update_task_recommendations_task,
+)
+from usersapp.models import Skill, UserProfile
+
+
+class TestTaskRecommendations(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python, self.django, self.java, self.rust = (
+            Skill.objects.create(skill=name) for name in ("python", "django", "java", "rust")
+        )
+        self.contractor = UserFactory.create(username="contractor")
+        profile = UserProfile.objects.create(user=self.contractor, description="Backend developer building REST APIs")
+        profile.skills.add(self.python, self.django)
+        self.client_user = UserFactory.create(username="client")
+        self.full_match = self.create_task("Shop backend", [self.python, self.django])
+        self.partial_match = self.create_task("Scripts", [self.python, self.java, self.rust])
+        self.text_match = self.create_task("Payments REST APIs", [self.java], description="Expose payments over REST")
+        self.no_match = self.create_task("Mobile game", [self.rust], description="Unity game")
+        # celery worker is simulated by running queued refreshes at once
+        delay = patch.object(refresh_recommendations_task, "delay", side_effect=refresh_recommendations_task)
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+        update_delay = patch.object(
+            update_task_recommendations_task, "delay", side_effect=update_task_recommendations_task
+        )
+        self.update_delay = update_delay.start()
+        self.addCleanup(update_delay.stop)
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def create_task(self, title, skills, description="Task", budget=Decimal("1000"), client=None):
+        return TaskFactory.create(
+            title=title, description=description, skills=skills, budget=budget, client=client or self.client_user
+        )
+
+    def recommended_ids(self):
+        return [task_id for task_id, _ in compute_recommendations(self.contractor)]
+
+    def cached_ids(self):
+        return [task_id for task_id, _ in cache.get(CACHE_KEY.format(user_id=self.contractor.pk))["ranking"]]
+
+    def test_should_build_contractor_profile_from_skills_description_and_offers(self):
+        """
+        Test checks that profile contains skills, frequent words and average budget of offered tasks.
+        """
+        OfferFactory.create(contractor=self.contractor, task=self.no_match, description="Unity developer")
+
+        profile = ContractorProfile(self.contractor)
+
+        self.assertEqual(profile.skill_ids, {self.python.id, self.django.id})
+        self.assertEqual(profile.terms[0], "developer")
+        self.assertIn("unity", profile.terms)
+        self.assertEqual(profile.budget, 1000.0)
+
+    def test_should_rank_tasks_by_skill_overlap_and_text_similarity(self):
+        """
+        Test checks that tasks sharing more skills or profile words rank higher and unrelated tasks are skipped.
+        """
+        self.assertEqual(self.recommended_ids(), [self.full_match.id, self.text_match.id, self.partial_match.id])
+
+    def test_should_rank_task_with_budget_close_to_offered_budgets_higher(self):
+        """
+        Test checks that from equally matching tasks the one with budget closer to offered ones ranks higher.
+        """
+        OfferFactory.create(contractor=self.contractor, task=self.no_match)
+        cheap = self.create_task("Shop backend", [self.python, self.django], budget=Decimal("10"))
+
+        ids = self.recommended_ids()
+
+        self.assertLess(ids.index(self.full_match.id), ids.index(cheap.id))
+        self.assertEqual(budget_fit(1000, 1000.0), 1.0)
+        self.assertEqual(budget_fit(1000, None), 0.0)
+
+    def test_should_skip_own_offered_and_closed_tasks(self):
+        """
+        Test checks that tasks of the contractor, tasks already offered for and not open tasks are not recommended.
+        """
+        self.create_task("Own backend", [self.python, self.django], client=self.contractor)
+        OfferFactory.create(contractor=self.contractor, task=self.partial_match)
+        Task.objects.filter(pk=self.text_match.pk).update(status=Task.TaskStatus.ON_GOING)
+
+        self.assertEqual(self.recommended_ids(), [self.full_match.id])
+
+    def test_should_serve_recommendations_from_cache(self):
+        """
+        Test checks that cached recommendations are read with a single query.
+        """
+        store_recommendations(self.contractor)
+
+        with self.assertNumQueries(1):
+            tasks = recommended_tasks(self.contractor, 2)
+
+        self.assertEqual(tasks, [self.full_match, self.text_match])
+
+    def test_should_skip_cached_tasks_closed_in_the_meantime(self):
+        """
+        Test checks that a cached task which is no longer open is not returned.
+        """
+        store_recommendations(self.contractor)
+        Task.objects.filter(pk=self.full_match.pk).update(status=Task.TaskStatus.ON_GOING)
+
+        self.assertEqual(recommended_tasks(self.contractor, 5), [self.text_match, self.partial_match])
+
+    def test_should_merge_new_task_into_cached_recommendations(self):
+        """
+        Test checks that a new task with contractor skills is scored alone and merged into cached recommendations
+        where a full computation would rank it, without refreshing them.
+        """
+        store_recommendations(self.contractor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_task = self.create_task("Mobile shop", [self.python, self.django])
+
+        self.update_delay.assert_called_with(new_task.pk, [])
+        self.delay.assert_not_called()
+        self.assertIn(new_task.id, self.cached_ids())
+        self.assertEqual(self.cached_ids(), self.recommended_ids())
+
+    def test_should_merge_new_task_matching_profile_words(self):
+        """
+        Test checks that a new task sharing a skill and profile words with the contractor is merged with its text
+        score added, where a full computation would rank it.
+        """
+        store_recommendations(self.contractor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_task = self.create_task("Backend for REST APIs", [self.python, self.rust])
+
+        cached = dict(cache.get(CACHE_KEY.format(user_id=self.contractor.pk))["ranking"])
+        self.assertAlmostEqual(cached[new_task.id], dict(compute_recommendations(self.contractor))[new_task.id], 2)
+        self.assertGreater(cached[new_task.id], 0.5 / 3)
+        self.assertEqual(self.cached_ids(), self.recommended_ids())
+
+    def test_should_remove_closed_task_from_cached_recommendations(self):
+        """
+        Test checks that a task closed after recommendations were cached is removed from them.
+        """
+        store_recommendations(self.contractor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.full_match.status = Task.TaskStatus.ON_GOING
+            self.full_match.save()
+
+        self.assertEqual(self.cached_ids(), [self.text_match.id, self.partial_match.id])
+
+    def test_should_remove_task_which_lost_contractor_skills_from_cached_recommendations(self):
+        """
+        Test checks that a task no longer matching the contractor after its skills were removed is dropped.
+        """
+        store_recommendations(self.contractor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.partial_match.skills.remove(self.python)
+
+        self.update_delay.assert_called_once_with(self.partial_match.pk, [self.python.id])
+        self.assertEqual(self.cached_ids(), [self.full_match.id, self.text_match.id])
+
+    def test_should_not_update_recommendations_when_task_edited_without_skill_or_status_change(self):
+        """
+        Test checks that editing other fields of an open task queues no recommendation update.
+        """
+        store_recommendations(self.contractor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.full_match.title = "Shop backend in Django"
+            self.full_match.save()
+
+        self.update_delay.assert_not_called()
+
+    def test_should_return_cached_recommendations_while_refresh_is_queued(self):
+        """
+        Test checks that recommendations are not computed on read, the cached list or an empty one is returned
+        and a single refresh is queued for the contractor.
+        """
+        self.delay.side_effect = None
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(recommended_tasks(self.contractor, 5), [])
+            self.assertEqual(recommended_tasks(self.contractor, 5), [])
+
+        self.delay.assert_called_once_with([self.contractor.pk])
+
+    def test_should_queue_refresh_of_outdated_recommendations(self):
+        """
+        Test checks that outdated recommendations are returned and refreshed in the background.
+        """
+        store_recommendations(self.contractor)
+
+        with self.settings(TASK_RECOMMENDATIONS_CACHE_TIMEOUT=-1):
+            with self.captureOnCommitCallbacks(execute=True):
+                tasks = recommended_tasks(self.contractor, 1)
+
+        self.assertEqual(tasks, [self.full_match])
+        self.delay.assert_called_once_with([self.contractor.pk])
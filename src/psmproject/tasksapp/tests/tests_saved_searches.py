@@ -0,0 +1,176 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from factories.factories import TaskFactory, UserFactory
+from tasksapp.models import SavedSearch, Task
+from tasksapp.saved_searches import notify_saved_searches, saved_search_index
+from tasksapp.views.client import SKILL_PREFIX as TASK_SKILL_PREFIX
+from tasksapp.views.contractor import SKILL_PREFIX
+from usersapp.models import Notification, Skill
+
+
+class TestSavedSearches(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python, self.django = (Skill.objects.create(skill=name) for name in ("python", "django"))
+        self.client_user = UserFactory.create(username="saved_client")
+        self.contractor = UserFactory.create(username="saved_contractor")
+        self.other_contractor = UserFactory.create(username="saved_other_contractor")
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def save_search(self, contractor, query="", skills=(), **filters):
+        with self.captureOnCommitCallbacks(execute=True):
+            saved_search = SavedSearch.objects.create(contractor=contractor, query=query, **filters)
+            saved_search.skills.set(skills)
+        return saved_search
+
+    def create_task(self, title, description="Task", skills=(), budget=Decimal("1000"), days=10, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TaskFactory.create(
+                title=title,
+                description=description,
+                skills=list(skills),
+                budget=budget,
+                days_to_complete=days,
+                client=self.client_user,
+                **kwargs,
+            )
+
+    def matched_searches(self, task):
+        return {query.id for query in saved_search_index.match(task, task.skills.values_list("id", flat=True))}
+
+    def test_should_match_task_against_all_filters_of_saved_search(self):
+        """
+        Test checks that task matches saved searches whose phrase terms prefix its words and whose skills, budget
+        and days bounds it satisfies.
+        """
+        matching = self.save_search(self.contractor, "shop backend", [self.python], budget=Decimal("500"))
+        by_days = self.save_search(self.other_contractor, min_days_to_complete=5, max_days_to_complete=15)
+        self.save_search(self.contractor, "shop mobile", [self.python])
+        self.save_search(self.contractor, skills=[self.python, self.django])
+        self.save_search(self.contractor, "backend", budget=Decimal("5000"))
+
+        task = self.create_task("Shopping platform", "Backend in Python", [self.python])
+
+        self.assertEqual(self.matched_searches(task), {matching.id, by_days.id})
+
+    def test_should_not_match_searches_of_task_client(self):
+        """
+        Test checks that saved searches of the task client are not matched against own tasks.
+        """
+        self.save_search(self.client_user, "shop")
+
+        task = self.create_task("Shop")
+
+        self.assertEqual(self.matched_searches(task), set())
+
+    def test_should_rebuild_index_after_saved_search_change(self):
+        """
+        Test checks that searches saved or deleted after the index was built are taken into account.
+        """
+        saved_search = self.save_search(self.contractor, "shop")
+        task = self.create_task("Shop")
+        self.assertEqual(self.matched_searches(task), {saved_search.id})
+
+        other = self.save_search(self.other_contractor, "shop")
+        with self.captureOnCommitCallbacks(execute=True):
+            saved_search.delete()
+
+        self.assertEqual(self.matched_searches(task), {other.id})
+
+    def test_should_notify_each_matching_contractor_once_when_task_is_created(self):
+        """
+        Test checks that creating an open task notifies every contractor with a matching saved search once.
+        """
+        self.save_search(self.contractor, "shop")
+        self.save_search(self.contractor, skills=[self.python])
+        self.save_search(self.other_contractor, "blog")
+
+        self.create_task("Shop", skills=[self.python])
+
+        self.assertEqual(Notification.objects.filter(user=self.contractor).count(), 1)
+        self.assertIn("Shop", Notification.objects.get(user=self.contractor).content)
+        self.assertFalse(Notification.objects.filter(user=self.other_contractor).exists())
+
+    def test_should_notify_when_task_becomes_open(self):
+        """
+        Test checks that a task is matched when its status changes to open, and not while it is on hold.
+        """
+        self.save_search(self.contractor, "shop")
+        task = self.create_task("Shop", status=Task.TaskStatus.ON_HOLD)
+        self.assertFalse(Notification.objects.exists())
+
+        task.status = Task.TaskStatus.OPEN
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+
+        self.assertEqual(Notification.objects.filter(user=self.contractor).count(), 1)
+
+    def test_should_match_skills_added_in_task_create_view(self):
+        """
+        Test checks that saved searches with skills match tasks created with these skills in the task form.
+        """
+        self.save_search(self.contractor, skills=[self.django])
+        self.client.force_login(self.client_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("task-create"),
+                {
+                    "title": "Shop",
+                    "description": "Task",
+                    "days_to_complete": 5,
+                    "budget": 100,
+                    f"{TASK_SKILL_PREFIX}{self.django.id}": "django",
+                },
+            )
+
+        self.assertEqual(Notification.objects.filter(user=self.contractor).count(), 1)
+        self.assertEqual(notify_saved_searches(Task.objects.get(title="Shop").id), {self.contractor.id})
+
+    def test_should_save_search_filters_from_search_page(self):
+        """
+        Test checks that contractor can save current search filters and then sees them on the saved searches list.
+        """
+        self.client.force_login(self.contractor)
+
+        response = self.client.post(
+            reverse("saved-search-create"),
+            {"query": "  Shop  Backend ", "budget": "100", f"{SKILL_PREFIX}{self.python.id}": "python"},
+            follow=True,
+        )
+
+        saved_search = SavedSearch.objects.get(contractor=self.contractor)
+        self.assertEqual(saved_search.query, "shop backend")
+        self.assertEqual(saved_search.budget, Decimal("100"))
+        self.assertEqual(list(saved_search.skills.all()), [self.python])
+        self.assertContains(response, f"query=shop+backend&amp;budget=100.00&amp;{SKILL_PREFIX}{self.python.id}=python")
+
+    def test_should_not_save_search_without_filters(self):
+        """
+        Test checks that a search without any filter, matching every task, is not saved.
+        """
+        self.client.force_login(self.contractor)
+
+        self.client.post(reverse("saved-search-create"), {"query": ""})
+
+        self.assertFalse(SavedSearch.objects.exists())
+
+    def test_should_delete_only_own_saved_search(self):
+        """
+        Test checks that contractor can delete own saved search and gets 404 for searches of others.
+        """
+        own = self.save_search(self.contractor, "shop")
+        other = self.save_search(self.other_contractor, "shop")
+        self.client.force_login(self.contractor)
+
+        self.client.post(reverse("saved-search-delete", kwargs={"pk": own.id}))
+        response = self.client.post(reverse("saved-search-delete", kwargs={"pk": other.id}))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(list(SavedSearch.objects.all()), [other])
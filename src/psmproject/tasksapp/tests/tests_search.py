@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from factories.factories import TaskFactory
+from tasksapp.models import Task
+from tasksapp.search import BasicTaskSearchBackend, get_search_backend, search_terms
+
+
+class TestTaskSearch(TestCase):
+    def setUp(self):
+        self.task = TaskFactory.create(title="Naprawa sklepu", description="Zadanie dotyczące integracji płatności")
+
+    def search(self, phrase):
+        return list(get_search_backend().search(Task.objects.all(), phrase).order_by("-search_rank", "-id"))
+
+    def test_should_split_phrase_into_word_terms(self):
+        """
+        Test checks that query syntax characters are dropped from the phrase.
+        """
+        self.assertEqual(search_terms('Django "REST" * api-v2'), ["django", "rest", "api", "v2"])
+
+    def test_should_find_task_by_polish_word_prefix_and_without_diacritics(self):
+        """
+        Test checks that Polish inflected words are matched by their prefix, also when typed without diacritics.
+        """
+        self.assertEqual(self.search("płatnośc"), [self.task])
+        self.assertEqual(self.search("dotyczace"), [self.task])
+
+    def test_should_update_index_when_task_saved(self):
+        """
+        Test checks that changed title is searchable right after task is saved.
+        """
+        self.task.title = "Landing page"
+        self.task.save()
+
+        self.assertEqual(self.search("landing"), [self.task])
+        self.assertEqual(self.search("sklepu"), [])
+
+    def test_should_remove_task_from_index_when_task_deleted(self):
+        """
+        Test checks that deleted task is no longer returned by the backend.
+        """
+        self.task.delete()
+
+        self.assertEqual(self.search("sklepu"), [])
+
+    def test_should_rank_recent_task_higher_than_old_task_of_same_relevance(self):
+        """
+        Test checks that from two equally relevant tasks the more recent one is returned first.
+        """
+        old_task = TaskFactory.create(title="Naprawa sklepu", description=self.task.description)
+        Task.objects.filter(pk=old_task.pk).update(created=timezone.now() - timedelta(days=90))
+
+        self.assertEqual(self.search("sklep"), [self.task, old_task])
+
+    def test_should_find_tasks_after_index_rebuild(self):
+        """
+        Test checks that rebuild_task_search_index command indexes tasks saved without signals.
+        """
+        Task.objects.filter(pk=self.task.pk).update(title="Aplikacja mobilna")
+        call_command("rebuild_task_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search("mobilna"), [self.task])
+
+    @override_settings(TASK_SEARCH_BACKEND="tasksapp.search.BasicTaskSearchBackend")
+    def test_should_use_backend_from_settings(self):
+        """
+        Test checks that backend configured in settings is used instead of the vendor default.
+        """
+        self.assertIsInstance(get_search_backend(), BasicTaskSearchBackend)
+        self.assertEqual(self.search("sklepu"), [self.task])
+
+    def test_should_filter_tasks_in_subquery(self):
+        """
+        Test checks that tasks matched by filter() can be used in an id__in subquery.
+        """
+        TaskFactory.create(title="Aplikacja mobilna", description="Aplikacja dla sklepu")
+        matching = get_search_backend().filter(Task.objects.all(), "naprawa")
+
+        self.assertEqual(list(Task.objects.filter(id__in=matching.values("id"))), [self.task])
@@ -0,0 +1,152 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from factories.factories import OfferFactory, TaskFactory, UserFactory
+from tasksapp.search_cache import normalize_search, search_cache_lookup, stats
+from usersapp.helpers import skills_from_text
+
+
+@override_settings(TASK_SEARCH_CACHE=True)
+class TestTaskSearchCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+        self.client_user = UserFactory.create(username="search_cache_client")
+        self.contractor = UserFactory.create(username="search_cache_contractor")
+        self.tasks = [
+            TaskFactory.create(client=self.client_user, title=f"Sklep internetowy {number}", budget=100 + number)
+            for number in range(12)
+        ]
+        self.client.login(username=self.contractor.username, password="secret")
+
+    def search(self, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(reverse("offer-task-search"), params)
+
+    def test_should_serve_repeated_search_from_cache(self):
+        """
+        Test checks that the same search made again returns the same page from cache.
+        """
+        first = self.search(query="sklep", budget="105")
+        second = self.search(query="sklep", budget="105")
+
+        self.assertEqual(list(second.context["object_list"]), list(first.context["object_list"]))
+        self.assertEqual(stats.snapshot()["hits"], 1)
+        self.assertEqual(stats.snapshot()["misses"], 1)
+
+    def test_should_use_same_entry_for_equivalent_filters(self):
+        """
+        Test checks that searches differing only in letter case, spaces and skill order share a cache entry.
+        """
+        skills = skills_from_text(["Python", "Django"], create=True)
+
+        self.assertEqual(
+            normalize_search("Sklep  Internetowy", skill_ids=[skill.id for skill in skills]),
+            normalize_search("sklep internetowy", skill_ids=[skill.id for skill in reversed(skills)]),
+        )
+        self.search(query="Sklep  internetowy")
+        self.search(query="sklep internetowy")
+
+        self.assertEqual(stats.hits, 1)
+
+    def test_should_restore_keyset_page_from_cache(self):
+        """
+        Test checks that pages of a search are served from one cache entry, with cursors and links to neighbouring
+        pages.
+        """
+        next_cursor = self.search().context["page_obj"].next_cursor
+        self.search(after=next_cursor)
+        response = self.search(after=next_cursor)
+
+        self.assertEqual(stats.hits, 2)
+        self.assertEqual(list(response.context["object_list"]), self.tasks[1::-1])
+        self.assertTrue(response.context["page_obj"].has_previous())
+        self.assertContains(response, f'href="?before={self.tasks[1].id}"')
+
+    def test_should_invalidate_cache_when_task_created(self):
+        """
+        Test checks that a new task is returned by a search cached before it was created.
+        """
+        self.search(query="sklep", budget="110")
+        with self.captureOnCommitCallbacks(execute=True):
+            new_task = TaskFactory.create(client=self.client_user, title="Sklep z grami", budget=500)
+
+        response = self.search(query="sklep", budget="110")
+
+        self.assertIn(new_task, response.context["object_list"])
+        self.assertEqual(stats.hits, 0)
+
+    def test_should_hide_task_from_cached_results_when_offer_made(self):
+        """
+        Test checks that a task disappears from cached contractor results after the contractor makes an offer for it.
+        """
+        self.search(query="sklep")
+        task = self.tasks[-1]
+        with self.captureOnCommitCallbacks(execute=True):
+            OfferFactory.create(task=task, contractor=self.contractor)
+
+        response = self.search(query="sklep")
+
+        self.assertNotIn(task, response.context["object_list"])
+        self.assertEqual(stats.hits, 1)
+
+    def test_should_share_cached_results_between_contractors(self):
+        """
+        Test checks that the same search of another contractor is served from cache, without tasks that contractor
+        made an offer for, also in facet counts.
+        """
+        other_contractor = UserFactory.create(username="search_cache_other")
+        with self.captureOnCommitCallbacks(execute=True):
+            OfferFactory.create(task=self.tasks[-1], contractor=other_contractor)
+        # ten matching tasks fit on the first page whatever their ranking
+        first = self.search(query="sklep", budget="102")
+        self.client.login(username=other_contractor.username, password="secret")
+
+        second = self.search(query="sklep", budget="102")
+
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(set(first.context["object_list"]), set(self.tasks[2:]))
+        self.assertEqual(set(second.context["object_list"]), set(self.tasks[2:-1]))
+        self.assertEqual(sum(facet["count"] for facet in first.context["days_facets"]), 10)
+        self.assertEqual(sum(facet["count"] for facet in second.context["days_facets"]), 9)
+
+    def test_should_hide_own_tasks_from_cached_results(self):
+        """
+        Test checks that a client searching tasks does not get own tasks from results cached for others.
+        """
+        self.search(query="sklep")
+        self.client.login(username=self.client_user.username, password="secret")
+
+        response = self.search(query="sklep")
+
+        self.assertEqual(list(response.context["object_list"]), [])
+        self.assertEqual(sum(facet["count"] for facet in response.context["days_facets"]), 0)
+        self.assertEqual(stats.hits, 1)
+
+    @override_settings(TASK_SEARCH_CACHE_MAX_IDS=5)
+    def test_should_read_page_past_cached_ids_from_database(self):
+        """
+        Test checks that a page reaching past the ids kept in cache is read from the database in full.
+        """
+        response = self.search()
+
+        self.assertEqual(list(response.context["object_list"]), self.tasks[:1:-1])
+        self.assertTrue(response.context["page_obj"].has_next())
+
+    def test_should_report_lookups_to_stats_hook(self):
+        """
+        Test checks that every lookup is sent to search_cache_lookup receivers with its latency.
+        """
+        lookups = []
+
+        def receiver(sender, hit, seconds, **kwargs):
+            lookups.append((hit, seconds))
+
+        search_cache_lookup.connect(receiver)
+        self.addCleanup(search_cache_lookup.disconnect, receiver)
+        self.search(query="sklep")
+        self.search(query="sklep")
+
+        self.assertEqual([hit for hit, _ in lookups], [False, True])
+        self.assertTrue(all(seconds >= 0 for _, seconds in lookups))
+        self.assertEqual(stats.snapshot()["hit_ratio"], 0.5)
@@ -0,0 +1,126 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from factories.factories import TaskFactory, UserFactory
+from tasksapp.models import Task
+from tasksapp.skill_index import SkillIndex, bitmap_ids, skill_index
+from tasksapp.views.contractor import SKILL_PREFIX
+from usersapp.models import Skill
+
+
+class TestSkillIndex(TestCase):
+    def setUp(self):
+        self.python, self.django, self.java = (
+            Skill.objects.create(skill=name) for name in ("python", "django", "java")
+        )
+        self.client_user = UserFactory.create()
+        self.task1 = TaskFactory.create(client=self.client_user, skills=[self.python, self.django])
+        self.task2 = TaskFactory.create(client=self.client_user, skills=[self.python])
+        self.task3 = TaskFactory.create(client=self.client_user, skills=[self.java])
+        self.closed_task = TaskFactory.create(
+            client=self.client_user, skills=[self.python], status=Task.TaskStatus.COMPLETED
+        )
+        skill_index.build()
+
+    def tearDown(self):
+        skill_index.clear()
+        super().tearDown()
+
+    def test_should_return_ids_of_bits_set_in_bitmap(self):
+        """
+        Test checks that bitmap is converted to sorted list of ids.
+        """
+        self.assertEqual(bitmap_ids(0b100101), [0, 2, 5])
+        self.assertEqual(bitmap_ids(0), [])
+
+    def test_should_return_open_tasks_requiring_all_skills(self):
+        """
+        Test checks that only open tasks having every given skill are returned.
+        """
+        self.assertEqual(bitmap_ids(skill_index.all_of([self.python.id])), [self.task1.id, self.task2.id])
+        self.assertEqual(bitmap_ids(skill_index.all_of([self.python.id, self.django.id])), [self.task1.id])
+        self.assertEqual(bitmap_ids(skill_index.all_of([self.django.id, self.java.id])), [])
+        self.assertEqual(bitmap_ids(skill_index.all_of([])), [])
+
+    def test_should_return_open_tasks_requiring_any_skill(self):
+        """
+        Test checks that open tasks having at least one of given skills are returned.
+        """
+        self.assertEqual(bitmap_ids(skill_index.any_of([self.django.id, self.java.id])), [self.task1.id, self.task3.id])
+
+    def test_should_update_index_when_task_skills_change(self):
+        """
+        Test checks that skills added to or removed from a task are reflected after commit.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task3.skills.add(self.python)
+            self.task1.skills.remove(self.python)
+
+        self.assertEqual(bitmap_ids(skill_index.all_of([self.python.id])), [self.task2.id, self.task3.id])
+
+    def test_should_update_index_when_skill_cleared_from_tasks(self):
+        """
+        Test checks that clearing tasks of a skill from the skill side removes it from all tasks.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.task_set.clear()
+
+        self.assertEqual(skill_index.any_of([self.python.id]), 0)
+
+    def test_should_update_index_when_task_status_changes_or_task_is_deleted(self):
+        """
+        Test checks that tasks leave the index when closed or deleted and return when reopened.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task1.status = Task.TaskStatus.ON_HOLD
+            self.task1.save()
+            self.task2.delete()
+            self.closed_task.status = Task.TaskStatus.OPEN
+            self.closed_task.save()
+
+        self.assertEqual(bitmap_ids(skill_index.all_of([self.python.id])), [self.closed_task.id])
+
+    def test_should_not_change_index_before_transaction_commits(self):
+        """
+        Test checks that changes are applied to the index only once they are committed.
+        """
+        with self.captureOnCommitCallbacks(execute=False):
+            self.task3.skills.add(self.python)
+
+        self.assertNotIn(self.task3.id, bitmap_ids(skill_index.all_of([self.python.id])))
+
+    def test_should_rebuild_index_older_than_max_age(self):
+        """
+        Test checks that index is rebuilt on use when it is older than its max age.
+        """
+        index = SkillIndex(max_age=0)
+        index.ensure_fresh()
+        Task.skills.through.objects.create(task=self.task3, skill=self.django)
+
+        index.ensure_fresh()
+
+        self.assertEqual(bitmap_ids(index.all_of([self.django.id])), [self.task1.id, self.task3.id])
+
+    @override_settings(TASK_SKILL_INDEX=True)
+    def test_should_filter_task_search_by_skills_from_index(self):
+        """
+        Test checks that task search uses the index to filter tasks by selected skills.
+        """
+        self.client.force_login(UserFactory.create(username="contractor"))
+
+        response = self.client.get(
+            reverse("offer-task-search"),
+            {f"{SKILL_PREFIX}1": self.python.skill, f"{SKILL_PREFIX}2": self.django.skill},
+        )
+
+        self.assertQuerysetEqual(response.context["object_list"], [self.task1])
+
+    @override_settings(TASK_SKILL_INDEX=True, TASK_SKILL_INDEX_MAX_IDS=0)
+    def test_should_filter_task_search_by_joins_when_index_matches_too_many_tasks(self):
+        """
+        Test checks that task search falls back to joins when too many task ids match in the index.
+        """
+        self.client.force_login(UserFactory.create(username="contractor"))
+
+        response = self.client.get(reverse("offer-task-search"), {f"{SKILL_PREFIX}1": self.python.skill})
+
+        self.assertQuerysetEqual(response.context["object_list"], [self.task2, self.task1])
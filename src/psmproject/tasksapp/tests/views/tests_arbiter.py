@@ -111,7 +111,7 @@ class TestComplaintListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
         for task in temp_tasks:
@@ -361,7 +361,7 @@ class TestComplaintNewListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
         for task in temp_tasks:
@@ -513,7 +513,7 @@ class TestComplaintActiveListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
         for task in temp_tasks:
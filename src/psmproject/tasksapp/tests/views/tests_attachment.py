@@ -4,7 +4,7 @@ from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from factories.factories import (
     ComplaintAttachmentFactory,
@@ -874,7 +874,7 @@ class TestTaskAttachmentDownloadView(TestAttachmentDownloadView):
         Test checks that downloaded file has correct content.
         """
         response = self.client.get(reverse("task-attachment-download", kwargs={"pk": self.test_task_attachment.id}))
-        self.assertEqual(response.content, b"content of test file")
+        self.assertEqual(response.getvalue(), b"content of test file")
 
     def test_should_handle_attempt_to_download_nonexistent_task_attachment(self):
         """
@@ -937,7 +937,7 @@ class TestComplaintAttachmentDownloadView(TestAttachmentDownloadView):
         response = self.client.get(
             reverse("complaint-attachment-download", kwargs={"pk": self.test_complaint_attachment.id})
         )
-        self.assertEqual(response.content, b"content of test file")
+        self.assertEqual(response.getvalue(), b"content of test file")
 
     def test_should_handle_attempt_to_download_nonexistent_complaint_attachment(self):
         """
@@ -1020,7 +1020,7 @@ class TestSolutionAttachmentDownloadView(TestAttachmentDownloadView):
         response = self.client.get(
             reverse("solution-attachment-download", kwargs={"pk": self.test_solution_attachment.id})
         )
-        self.assertEqual(response.content, b"content of test file")
+        self.assertEqual(response.getvalue(), b"content of test file")
 
     def test_should_handle_attempt_to_download_nonexistent_solution_attachment(self):
         """
@@ -1075,3 +1075,93 @@ class TestSolutionAttachmentDownloadView(TestAttachmentDownloadView):
             response.get("Content-Disposition"),
             f'attachment; filename="{self.test_solution_attachment.attachment}"',
         )
+
+
+class TestAttachmentDownloadResponse(TestAttachmentDownloadView):
+    """
+    Test case for responses of download attachment views, see tasksapp.downloads.
+    """
+
+    def download(self, attachment=None, **headers):
+        attachment = attachment or self.test_task_attachment
+        return self.client.get(reverse("task-attachment-download", kwargs={"pk": attachment.id}), headers=headers)
+
+    def test_should_stream_attachment_with_content_type_and_validators(self):
+        """
+        Test checks that attachment is streamed with content type of its file, ETag and Last-Modified.
+        """
+        pdf_attachment = TaskAttachment.objects.create(
+            task=self.test_task, attachment=SimpleUploadedFile("test_file.pdf", b"%PDF-1.4")
+        )
+
+        response = self.download(pdf_attachment)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], "8")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response.has_header("ETag"))
+        self.assertTrue(response.has_header("Last-Modified"))
+        self.assertEqual(response.getvalue(), b"%PDF-1.4")
+        self.assertEqual(self.download()["Content-Type"], "text/plain")
+
+    def test_should_return_not_modified_for_matching_etag(self):
+        """
+        Test checks that a client having the current version of attachment gets 304 without the file.
+        """
+        etag = self.download()["ETag"]
+
+        response = self.download(if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_should_return_requested_byte_range(self):
+        """
+        Test checks that a single byte range, also given by its length from the end of file, is returned with 206.
+        """
+        for requested_range, content in (
+            ("bytes=11-14", b"test"),
+            ("bytes=11-100", b"test file"),
+            ("bytes=-4", b"file"),
+        ):
+            response = self.download(range=requested_range)
+
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.getvalue(), content)
+            self.assertEqual(response["Content-Length"], str(len(content)))
+
+        self.assertEqual(self.download(range="bytes=11-14")["Content-Range"], "bytes 11-14/20")
+
+    def test_should_reject_range_outside_file(self):
+        """
+        Test checks that a range starting after the end of file is answered with 416.
+        """
+        response = self.download(range="bytes=20-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */20")
+
+    def test_should_return_whole_file_for_outdated_if_range_or_multiple_ranges(self):
+        """
+        Test checks that the whole file is returned when If-Range does not match or many ranges are requested.
+        """
+        for headers in ({"range": "bytes=0-3", "if_range": '"outdated"'}, {"range": "bytes=0-3,8-9"}):
+            response = self.download(**headers)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.getvalue(), b"content of test file")
+
+    @override_settings(ATTACHMENTS_SENDFILE="x-accel-redirect", ATTACHMENTS_ACCEL_REDIRECT_PREFIX="/protected-media/")
+    def test_should_leave_sending_file_to_proxy(self):
+        """
+        Test checks that in X-Accel-Redirect mode the response points the proxy to the file instead of sending it.
+        """
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.test_task_attachment.attachment.name}")
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["Content-Disposition"], f'attachment; filename="{self.test_task_attachment.attachment}"'
+        )
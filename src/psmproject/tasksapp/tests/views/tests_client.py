@@ -70,7 +70,7 @@ class TestClientTaskListBaseView(TestCase):
 
         response = self.client.get(reverse("tasks-client-list"))
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
@@ -596,7 +596,7 @@ class TestTaskOfferClientListView(TestCase):
 
         new_response = self.client.get(reverse("task-offers-list", kwargs={"pk": self.test_task1.id}))
         self.assertEqual(new_response.status_code, 200)
-        self.assertContains(new_response, 'href="?page=2"')
+        self.assertContains(new_response, 'href="?after=')
         self.assertEqual(len(new_response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
@@ -97,7 +97,7 @@ class TestContractorOfferListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
@@ -172,6 +172,7 @@ class TestContractorTaskSearchView(TestCase):
         self.test_task1 = TaskFactory.create(
             client=self.client_user,
             title="UniqueTitle1",
+            description="Migrate legacy reporting module to Django",
             skills=[self.skills[0], self.skills[1]],
             budget=100.0,
             days_to_complete=9,
@@ -245,7 +246,7 @@ class TestContractorTaskSearchView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
@@ -263,8 +264,8 @@ class TestContractorTaskSearchView(TestCase):
         self.assertEqual(list(self.response.context["object_list"])[0], self.test_task3)
 
     def test_should_return_all_context_information_on_get(self):
-        skills = self.response.context.get("skills")
-        self.assertIsNotNone(skills)
+        skill_counts = self.response.context.get("skill_counts")
+        self.assertIsNotNone(skill_counts)
         form = self.response.context.get("form")
         self.assertIsNotNone(form)
         skill_prefix = self.response.context.get("skill_id_prefix")
@@ -296,11 +297,32 @@ class TestContractorTaskSearchView(TestCase):
         response = self.client.get(
             self.url,
             {
-                "query": self.test_task1.description[:10],
+                "query": "legacy reporting",
             },
         )
         self.assertQuerysetEqual(response.context["object_list"], [self.test_task1])
 
+    def test_should_return_objects_matching_stemmed_and_partial_words_when_query_sent(self):
+        response = self.client.get(
+            self.url,
+            {
+                "query": "migrating legacy repo",
+            },
+        )
+        self.assertQuerysetEqual(response.context["object_list"], [self.test_task1])
+
+    def test_should_order_objects_by_relevance_when_query_sent(self):
+        self.test_task2.description = "Reporting dashboard"
+        self.test_task2.title = "Reporting"
+        self.test_task2.save()
+        response = self.client.get(
+            self.url,
+            {
+                "query": "reporting",
+            },
+        )
+        self.assertQuerysetEqual(response.context["object_list"], [self.test_task2, self.test_task1])
+
     def test_should_return_objects_filtered_by_budget(self):
         """
         Test if response contains only tasks with minimum budget higher/equal than posted in filter
@@ -353,7 +375,26 @@ class TestContractorTaskSearchView(TestCase):
         )
         self.assertQuerysetEqual(response.context["object_list"], [self.test_task1])
 
-    def test_should_return_skill_list_without_selected(self):
+    def test_should_return_objects_having_skills_also_assigned_to_other_tasks(self):
+        """
+        Test if tasks sharing only a part of selected skills are excluded and each matching task is listed once
+        """
+        self.test_task3.skills.add(self.skills[0], self.skills[1])
+
+        response = self.client.get(
+            self.url,
+            {
+                f"{SKILL_PREFIX}1": self.skills[0].skill,
+                f"{SKILL_PREFIX}2": self.skills[1].skill,
+                f"{SKILL_PREFIX}3": self.skills[3].skill,
+            },
+        )
+        self.assertQuerysetEqual(response.context["object_list"], [self.test_task3])
+
+    def test_should_return_selected_skills_without_full_skill_list(self):
+        """
+        Test checks that only selected skills are rendered, other skills are suggested by the autocomplete endpoint.
+        """
         response = self.client.get(
             self.url,
             {
@@ -362,10 +403,9 @@ class TestContractorTaskSearchView(TestCase):
             },
         )
 
-        skills = response.context.get("skills")
-        self.assertIsNotNone(skills)
-        self.assertNotIn(self.skills[0].skill, skills)
-        self.assertNotIn(self.skills[1].skill, skills)
+        self.assertEqual(response.context["selected_skills"], [self.skills[0], self.skills[1]])
+        self.assertNotIn("skills", response.context)
+        self.assertContains(response, reverse("skill-autocomplete"))
 
 
 class TestContractorOfferCreateView(TestCase):
@@ -826,7 +866,7 @@ class TestContractorTaskListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
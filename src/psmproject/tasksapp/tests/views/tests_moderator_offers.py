@@ -111,7 +111,7 @@ class TestModeratorOfferListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
@@ -303,7 +303,7 @@ class TestModeratorOfferNewListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_not_logged_in(self):
@@ -64,7 +64,7 @@ class TestModeratorTaskListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_redirect_if_user_is_not_allowed(self):
@@ -196,7 +196,7 @@ class TestModeratorTaskNewListView(TestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?after=')
         self.assertEqual(len(response.context["object_list"]), 10)
 
     def test_should_make_redirect_to_proper_address_when_user_has_no_permission_to_use_view(
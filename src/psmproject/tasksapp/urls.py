@@ -73,6 +73,9 @@ urlpatterns = [
     path("offers/moderator/new", moderator_offers.OfferNewListView.as_view(), name="offer-moderator-list-new"),
     path("offer/add/task/<task_pk>", contractor.OfferCreateView.as_view(), name="offer-create"),
     path("offer/task-search", contractor.TasksSearchView.as_view(), name="offer-task-search"),
+    path("offer/saved-searches/", contractor.SavedSearchListView.as_view(), name="saved-searches-list"),
+    path("offer/saved-searches/add", contractor.SavedSearchCreateView.as_view(), name="saved-search-create"),
+    path("offer/saved-searches/<pk>/delete", contractor.SavedSearchDeleteView.as_view(), name="saved-search-delete"),
     path("offer/moderator/<pk>", moderator_offers.OfferDetailView.as_view(), name="offer-moderator-detail"),
     path("offer/moderator/<pk>/edit", moderator_offers.OfferEditView.as_view(), name="offer-moderator-edit"),
     path("offer/<pk>", contractor.OfferDetailView.as_view(), name="offer-detail"),
@@ -10,10 +10,11 @@ from django.views.generic.detail import DetailView
 from django.views.generic.list import ListView
 from tasksapp.mixins import InstanceChatDetailsMixin
 from tasksapp.utils import get_tz_aware_date
-from usersapp.helpers import SpecialUserMixin
+from usersapp.helpers import SpecialUserMixin, has_any_group
 
 from ..forms.complaint import ComplaintSearchForm
 from ..models import Complaint, Task
+from ..pagination import KeysetPaginationMixin
 from .common import SearchListView
 
 
@@ -58,7 +59,7 @@ class ComplaintListView(SpecialUserMixin, SearchListView):
         return queryset
 
 
-class ComplaintNewListView(SpecialUserMixin, ListView):
+class ComplaintNewListView(SpecialUserMixin, KeysetPaginationMixin, ListView):
     """
     This is a view class for displaying list of only not taken complaints. Can be used by administrator or arbiter
     Result list is limited/paginated
@@ -77,7 +78,7 @@ class ComplaintNewListView(SpecialUserMixin, ListView):
         return queryset
 
 
-class ComplaintActiveListView(SpecialUserMixin, ListView):
+class ComplaintActiveListView(SpecialUserMixin, KeysetPaginationMixin, ListView):
     """
     This is a view class for displaying list of complaints taken by the arbiter that are not closed yet
     """
@@ -161,7 +162,7 @@ class ComplaintCloseView(UserPassesTestMixin, View):
 
     def test_func(self):
         user = self.request.user
-        self.in_allowed_group = user.groups.filter(name__in=self.allowed_groups).exists()
+        self.in_allowed_group = has_any_group(user, self.allowed_groups)
         complaint = self.get_object()
         return self.in_allowed_group and user == complaint.arbiter
 
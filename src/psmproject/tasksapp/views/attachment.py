@@ -2,12 +2,13 @@ from typing import Any
 
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views.generic import DetailView
 from django.views.generic.edit import CreateView, DeleteView
-from usersapp.helpers import UsersNonBlockedTestMixin
+from usersapp.helpers import UsersNonBlockedTestMixin, has_any_group
 
+from ..downloads import attachment_response
 from ..forms.complaint import ComplaintAttachmentForm
 from ..forms.solution import SolutionAttachmentStandaloneForm
 from ..forms.tasks import TaskAttachmentForm
@@ -134,7 +135,7 @@ class AttachmentDeleteView(UsersNonBlockedTestMixin, DeleteView):
         obj = self.get_object()
         object_for_attachment = self.get_related_object()
         user = self.request.user
-        in_allowed_group = user.groups.filter(name__in=AttachmentDeleteView.allowed_groups).exists()
+        in_allowed_group = has_any_group(user, AttachmentDeleteView.allowed_groups)
         return (
             getattr(object_for_attachment, self.attachments_object_attributes[type(obj)]["test_func"]) == user
             or in_allowed_group
@@ -235,7 +236,7 @@ class SolutionAttachmentDeleteView(AttachmentDeleteView):
     def test_func(self):
         solution = self.get_related_object()
         user = self.request.user
-        in_allowed_group = user.groups.filter(name__in=AttachmentDeleteView.allowed_groups).exists()
+        in_allowed_group = has_any_group(user, AttachmentDeleteView.allowed_groups)
         if solution:
             return solution.offer.contractor == user or in_allowed_group
         else:
@@ -245,6 +246,7 @@ class SolutionAttachmentDeleteView(AttachmentDeleteView):
 class DownloadAttachmentView(UsersNonBlockedTestMixin, DetailView):
     """
     Class based view for downloading attachments for Complaint, Task, Solution.
+    Files are streamed with support of conditional and range requests, see tasksapp.downloads.
     """
 
     model = None
@@ -284,7 +286,7 @@ class DownloadAttachmentView(UsersNonBlockedTestMixin, DetailView):
         return reverse_lazy("profile")
 
     def is_user_in_allowed_group(self):
-        return self.request.user.groups.filter(name__in=self.allowed_groups).exists()
+        return has_any_group(self.request.user, self.allowed_groups)
 
     def is_user_authorized(self, obj):
         related_obj = self.get_related_object()
@@ -298,7 +300,7 @@ class DownloadAttachmentView(UsersNonBlockedTestMixin, DetailView):
 
     def get(self, request, *args, **kwargs):
         attachment = self.get_object()
-        response = HttpResponse(attachment.attachment, content_type="text/plain")
+        response = attachment_response(request, attachment)
         response["Content-Disposition"] = f'attachment; filename="{attachment.attachment.name}"'
         return response
 
@@ -4,20 +4,19 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
 from django.db.models import Q
-from django.forms.models import model_to_dict
 from django.http import HttpResponseRedirect
 from django.urls import reverse, reverse_lazy
 from django.views.generic import View
 from django.views.generic.edit import CreateView, UpdateView
 from django.views.generic.list import ListView
 from usersapp.helpers import UsersNonBlockedTestMixin, skills_from_text
-from usersapp.models import Skill
 
 from ..forms.tasks import TaskForm, UpdateTaskForm
 from ..models import Offer, Solution, Task
+from ..pagination import KeysetPaginationMixin
 
 
-class TasksListBaseView(LoginRequiredMixin, ListView):
+class TasksListBaseView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     This is a base view class for displaying list of tasks created by currently logged-in user (client), ordered from
     newest. Tasks can be filtered by URL parameter "q". Search phrase will be compared against task title or task
@@ -74,22 +73,22 @@ class TaskCreateView(LoginRequiredMixin, UsersNonBlockedTestMixin, CreateView):
     success_url = reverse_lazy("tasks-client-list")
 
     def get_context_data(self, **kwargs):
-        """Add skills list for skill selection to context,
-        as well as skill prefix which is used to generate skill field names in form"""
+        """Add skill prefix which is used to generate skill field names in form to context,
+        skills to select are suggested by the skill autocomplete endpoint"""
         context = super().get_context_data(**kwargs)
-        skills = Skill.objects.all()
-        context["skills"] = [model_to_dict(skill) for skill in list(skills)]
         context["skill_id_prefix"] = SKILL_PREFIX
         return context
 
     def form_valid(self, form):
-        """Assign current user to the new task and add skills"""
+        """Assign current user to the new task and add skills. Both are committed together, so saved searches
+        are matched against the task with its skills"""
         form.instance.client = self.request.user
-        response = super().form_valid(form)
         skills = [item[1] for item in self.request.POST.items() if item[0].startswith(SKILL_PREFIX)]
-        if skills:
-            skills_objects = skills_from_text(skills)
-            self.object.skills.add(*skills_objects)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if skills:
+                skills_objects = skills_from_text(skills)
+                self.object.skills.add(*skills_objects)
         return response
 
 
@@ -114,15 +113,11 @@ class TaskEditView(UsersNonBlockedTestMixin, UpdateView):
         return super().handle_no_permission()
 
     def get_context_data(self, **kwargs):
-        """Add skills of edited task and all possible skills to context data. Adds also skill_prefix which is used to
+        """Add skills of edited task to context data. Adds also skill_prefix which is used to
         generate skill field name in form"""
         context = super().get_context_data(**kwargs)
-        skills = Skill.objects.all()
         if self.object:
-            task_skills = self.object.skills.all()
-            context["selected_skills"] = list(task_skills)
-            skills = skills.difference(task_skills)
-        context["skills"] = [model_to_dict(skill) for skill in list(skills)]
+            context["selected_skills"] = list(self.object.skills.all())
         context["skill_id_prefix"] = SKILL_PREFIX
         return context
 
@@ -167,7 +162,7 @@ class OfferClientListView(LoginRequiredMixin, ListView):
         return queryset
 
 
-class TaskOfferClientListView(LoginRequiredMixin, ListView):
+class TaskOfferClientListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     This is a view class for displaying list of offers for only one task. Offers are ordered by newest.
     Offers can be filtered by URL parameter "q". Search phrase will be compared against offer description
@@ -9,10 +9,11 @@ from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
 from tasksapp.mixins import InstanceChatDetailsMixin
-from usersapp.helpers import UsersNonBlockedTestMixin
+from usersapp.helpers import UsersNonBlockedTestMixin, has_any_group
 
 from ..forms.complaint import ComplaintForm
 from ..models import Complaint, Task
+from ..pagination import KeysetPaginationMixin
 
 
 class TaskDetailView(LoginRequiredMixin, InstanceChatDetailsMixin, DetailView):
@@ -62,7 +63,7 @@ class TaskDeleteView(UsersNonBlockedTestMixin, DeleteView):
 
     def get_success_url(self):
         user = self.request.user
-        in_allowed_group = user.groups.filter(name__in=TaskDeleteView.allowed_groups).exists()
+        in_allowed_group = has_any_group(user, TaskDeleteView.allowed_groups)
         if in_allowed_group:
             return reverse_lazy("tasks-all-list")
         return reverse_lazy("tasks-client-list")
@@ -72,7 +73,7 @@ class TaskDeleteView(UsersNonBlockedTestMixin, DeleteView):
         if task.status >= Task.TaskStatus.ON_GOING:
             return False
         user = self.request.user
-        in_allowed_group = user.groups.filter(name__in=TaskDeleteView.allowed_groups).exists()
+        in_allowed_group = has_any_group(user, TaskDeleteView.allowed_groups)
         return user == task.client or in_allowed_group
 
     def handle_no_permission(self):
@@ -80,7 +81,7 @@ class TaskDeleteView(UsersNonBlockedTestMixin, DeleteView):
         return HttpResponseRedirect(redirect_url)
 
 
-class SearchListView(ListView):
+class SearchListView(KeysetPaginationMixin, ListView):
     """
     List View with search form
     """
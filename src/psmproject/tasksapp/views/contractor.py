@@ -1,29 +1,45 @@
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db import transaction
 from django.db.models import Q
-from django.forms.models import model_to_dict
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
+from django.views.generic import View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
-from usersapp.helpers import UsersNonBlockedTestMixin, skills_from_text
-from usersapp.models import Skill
+from usersapp.helpers import UsersNonBlockedTestMixin, has_any_group, skills_from_text
 
+from ..facets import task_facets
 from ..forms.offers import OfferForm, TaskSearchForm
 from ..forms.solution import SolutionAttachmentForm, SolutionForm
-from ..models import Offer, Solution, SolutionAttachment, Task
+from ..models import Offer, SavedSearch, Solution, SolutionAttachment, Task
+from ..pagination import KeysetPaginationMixin
+from ..search import get_search_backend
+from ..search_cache import (
+    PAGE_PARAMS,
+    cached_facets,
+    cached_ids,
+    facets_key,
+    normalize_search,
+    results_key,
+)
+from ..skill_index import bitmap_ids, skill_index
 from .common import TaskDetailView
 
 SKILL_PREFIX = "query-skill-"
 
 
-class TasksSearchView(LoginRequiredMixin, ListView):
+class TasksSearchView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     This is a search task list view for contractor to find new to tasks for an offer. \
-    Tasks can be filtered by URL parameter "q". Search phrase will be compared against task title or task
-    description. Tasks can also be filtered by skills, budget end end-date. Result list is limited/paginated.
+    Tasks can be filtered by URL parameter "q". Search phrase is matched against full-text index of task title and
+    description and results are ordered by relevance and recency (see tasksapp.search). Tasks can also be filtered
+    by skills, budget end end-date. Result list is limited/paginated. With TASK_SEARCH_CACHE enabled, matching
+    task ids and facet counts are cached per normalized filters for all contractors (see tasksapp.search_cache),
+    own tasks and tasks with the contractor's offer are left out of them on every request.
     """
 
     model = Task
@@ -32,9 +48,9 @@ class TasksSearchView(LoginRequiredMixin, ListView):
     search_phrase_min = 3
 
     def get_queryset(self, **kwargs):
-        queryset = Task.objects.filter(status=Task.TaskStatus.OPEN).exclude(
-            Q(client=self.request.user) | Q(offers__contractor=self.request.user)
-        )
+        queryset = Task.objects.filter(status=Task.TaskStatus.OPEN)
+        if kwargs.get("for_contractor", True):
+            queryset = queryset.exclude(client=self.request.user).exclude(Offer.task_bid_by(self.request.user))
         form = kwargs.get("form")
         if not form or not form.is_valid():
             return queryset.order_by("-id")
@@ -45,30 +61,112 @@ class TasksSearchView(LoginRequiredMixin, ListView):
         max_days_to_complete = form.cleaned_data.get("max_days_to_complete")
         selected_skills = kwargs.get("selected_skills")
 
+        ordering = ["-id"]
         if len(phrase) >= TasksSearchView.search_phrase_min:
-            queryset = queryset.filter(Q(title__contains=phrase) | Q(description__contains=phrase))
+            if kwargs.get("ranked", True):
+                queryset = get_search_backend().search(queryset, phrase)
+                ordering = ["-search_rank", "-id"]
+            else:
+                queryset = get_search_backend().filter(queryset, phrase)
         if budget:
-            queryset = queryset.filter(budget__gte=budget).distinct()
+            queryset = queryset.filter(budget__gte=budget)
         if min_days_to_complete:
-            queryset = queryset.filter(days_to_complete__gte=min_days_to_complete).distinct()
+            queryset = queryset.filter(days_to_complete__gte=min_days_to_complete)
         if max_days_to_complete:
-            queryset = queryset.filter(days_to_complete__lte=max_days_to_complete).distinct()
+            queryset = queryset.filter(days_to_complete__lte=max_days_to_complete)
         if selected_skills:
-            for skill in selected_skills:
-                queryset = queryset.filter(skills=skill).distinct()
-        return queryset.order_by("-id")
+            queryset = self.filter_by_skills(queryset, selected_skills)
+        return queryset.order_by(*ordering)
+
+    @staticmethod
+    def filter_by_skills(queryset, skills):
+        """
+        Keep tasks having every given skill. With TASK_SKILL_INDEX enabled, matching ids come from the in-process
+        bitmap index, unless there are too many of them to pass in a query. Otherwise each skill adds a join probing
+        the unique (task, skill) index of the task-skill table, which matches at most one row per task, so no
+        DISTINCT is needed.
+        """
+        skill_ids = {skill.id for skill in skills}
+        if settings.TASK_SKILL_INDEX:
+            skill_index.ensure_fresh()
+            matching = skill_index.all_of(skill_ids)
+            if matching.bit_count() <= settings.TASK_SKILL_INDEX_MAX_IDS:
+                return queryset.filter(id__in=bitmap_ids(matching))
+        for skill_id in skill_ids:
+            queryset = queryset.filter(skills=skill_id)
+        return queryset
+
+    def shared_queryset(self, **kwargs):
+        """Tasks matching current filters for any contractor, the ones whose ids and facets are cached."""
+        return self.get_queryset(
+            form=self.search_form, selected_skills=self.selected_skills, for_contractor=False, **kwargs
+        )
+
+    def excluded_task_ids(self):
+        """Ids of open tasks hidden from the current contractor: own ones and ones with the contractor's offer."""
+        user = self.request.user
+        tasks = Task.objects.filter(Q(client=user) | Offer.task_bid_by(user), status=Task.TaskStatus.OPEN)
+        return set(tasks.values_list("id", flat=True))
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.TASK_SEARCH_CACHE:
+            return super().paginate_queryset(queryset, page_size)
+        shared = self.shared_queryset()
+        cached, truncated = cached_ids(results_key(self.search_filters), lambda: shared)
+        ids = [task_id for task_id in cached if task_id not in self.excluded_ids]
+        keyset = self.use_keyset(queryset)
+        before = self.get_cursor(self.before_kwarg) if keyset else None
+        try:
+            paginator, page, object_list, is_paginated = self.paginate_ids(ids, page_size, keyset, not truncated)
+        except Http404:
+            if not truncated:
+                raise
+            page = None
+        if truncated and (page is None or not page.has_next() or (before is not None and before < cached[-1])):
+            # the page reaches past the cached ids, it is read from the database
+            return super().paginate_queryset(queryset, page_size)
+        tasks = Task.objects.in_bulk(object_list)
+        object_list = [tasks[task_id] for task_id in object_list if task_id in tasks]
+        page.object_list = object_list
+        return paginator, page, object_list, is_paginated
+
+    @staticmethod
+    def normalize_filters(form, skills):
+        if not form or not form.is_valid():
+            return normalize_search()
+        phrase = form.cleaned_data.get("query", "")
+        return normalize_search(
+            phrase=phrase if len(phrase) >= TasksSearchView.search_phrase_min else "",
+            budget=form.cleaned_data.get("budget"),
+            min_days=form.cleaned_data.get("min_days_to_complete"),
+            max_days=form.cleaned_data.get("max_days_to_complete"),
+            skill_ids=[skill.id for skill in skills],
+        )
+
+    def get_facets(self):
+        """
+        Facet counts of tasks matching current filters. Cached counts are shared by all contractors, tasks hidden from
+        the current one are counted separately and subtracted.
+        """
+        if not settings.TASK_SEARCH_CACHE:
+            return task_facets(
+                self.get_queryset(form=self.search_form, selected_skills=self.selected_skills, ranked=False)
+            )
+        queryset = self.shared_queryset(ranked=False)
+        facets = cached_facets(facets_key(self.search_filters), lambda: task_facets(queryset))
+        if self.excluded_ids:
+            facets = facets.without(task_facets(queryset.filter(id__in=self.excluded_ids)))
+        return facets
 
     def get_context_data(self, **kwargs):
-        """Add skills list for skill selection to context,
-        as well as skill prefix which is used to generate skill field names in form"""
+        """Add number of found tasks having each skill for skill suggestions to context,
+        as well as skill prefix which is used to generate skill field names in form, and budget and days facets"""
         context = super().get_context_data(**kwargs)
-        skills = Skill.objects.all()
+        facets = kwargs.get("facets")
 
         selected_skills = kwargs.get("selected_skills")
         if selected_skills:
             context["selected_skills"] = selected_skills
-            selected_ids = [skill.id for skill in selected_skills]
-            skills = skills.exclude(id__in=selected_ids)
         form = kwargs.get("form")
         if form:
             context["form"] = kwargs.get("form")
@@ -76,19 +174,94 @@ class TasksSearchView(LoginRequiredMixin, ListView):
         else:
             context["form"] = TaskSearchForm()
 
-        context["skills"] = [model_to_dict(skill) for skill in list(skills)]
+        context["skill_counts"] = facets.skills
+        context["budget_facets"] = facets.budget_choices()
+        context["days_facets"] = facets.days_choices()
         context["skill_id_prefix"] = SKILL_PREFIX
+        context["search_params"] = [item for item in self.request.GET.items() if item[0] not in PAGE_PARAMS]
         return context
 
     def get(self, request, *args, **kwargs):
         form = TaskSearchForm(request.GET) if bool(request.GET) else None
         selected_skills = [item[1] for item in self.request.GET.items() if item[0].startswith(SKILL_PREFIX)]
         skills_objects = skills_from_text(selected_skills)
+        self.search_form, self.selected_skills = form, skills_objects
+        self.search_filters = self.normalize_filters(form, skills_objects)
         self.object_list = self.get_queryset(form=form, selected_skills=skills_objects)
-        return self.render_to_response(self.get_context_data(form=form, selected_skills=skills_objects))
+        self.excluded_ids = self.excluded_task_ids() if settings.TASK_SEARCH_CACHE else set()
+        facets = self.get_facets()
+        return self.render_to_response(self.get_context_data(form=form, selected_skills=skills_objects, facets=facets))
+
+
+class SavedSearchListView(LoginRequiredMixin, ListView):
+    """
+    This view displays task searches saved by currently logged-in user (contractor), with links running them again
+    """
+
+    model = SavedSearch
+    template_name = "tasksapp/saved_searches_list.html"
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(contractor=self.request.user).prefetch_related("skills").order_by("-id")
+
+    @staticmethod
+    def search_url(saved_search):
+        params = {
+            "query": saved_search.query,
+            "budget": saved_search.budget,
+            "min_days_to_complete": saved_search.min_days_to_complete,
+            "max_days_to_complete": saved_search.max_days_to_complete,
+        }
+        params = {name: value for name, value in params.items() if value}
+        params.update((f"{SKILL_PREFIX}{skill.id}", skill.skill) for skill in saved_search.skills.all())
+        return f"{reverse('offer-task-search')}?{urlencode(params)}"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["saved_searches"] = [(search, self.search_url(search)) for search in context["object_list"]]
+        return context
+
+
+class SavedSearchCreateView(LoginRequiredMixin, View):
+    """
+    This view saves task search filters posted from the search page for the logged-in user (contractor), who is
+    notified about tasks becoming open which match them
+    """
+
+    def post(self, request, *args, **kwargs):
+        form = TaskSearchForm(request.POST)
+        skills = skills_from_text([value for name, value in request.POST.items() if name.startswith(SKILL_PREFIX)])
+        filters = TasksSearchView.normalize_filters(form, skills)
+        if not any(filters.values()):
+            messages.warning(request, "search without filters cannot be saved")
+            return HttpResponseRedirect(reverse("offer-task-search"))
+        with transaction.atomic():
+            saved_search = SavedSearch.objects.create(
+                contractor=request.user,
+                query=filters["query"],
+                budget=form.cleaned_data.get("budget"),
+                min_days_to_complete=form.cleaned_data.get("min_days_to_complete"),
+                max_days_to_complete=form.cleaned_data.get("max_days_to_complete"),
+            )
+            saved_search.skills.set(skills)
+        messages.success(request, "search saved, you will be notified about new matching tasks")
+        return HttpResponseRedirect(reverse("saved-searches-list"))
+
+
+class SavedSearchDeleteView(LoginRequiredMixin, DeleteView):
+    """
+    This view deletes task search saved by currently logged-in user (contractor)
+    """
+
+    model = SavedSearch
+    http_method_names = ["post"]
+    success_url = reverse_lazy("saved-searches-list")
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(contractor=self.request.user)
 
 
-class OfferListView(LoginRequiredMixin, ListView):
+class OfferListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     This is a base view class for displaying list of offers created by currently logged-in user (contractor), ordered
     from newest. Offers can be filtered by URL parameter "q". Search phrase will be compared against offer description,
@@ -112,7 +285,7 @@ class OfferListView(LoginRequiredMixin, ListView):
         return queryset
 
 
-class TasksListView(LoginRequiredMixin, ListView):
+class TasksListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     This View displays list of tasks which contractor is currently assigned-to, ordered from newest. Tasks can be
     filtered by URL parameter "q". Search phrase will be compared against task title or task description.
@@ -137,7 +310,7 @@ class TasksListView(LoginRequiredMixin, ListView):
         return queryset
 
 
-class TasksClosedListView(LoginRequiredMixin, ListView):
+class TasksClosedListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     This View displays list of closed tasks which contractor was assigned-to, ordered from newest. Tasks can be
     filtered by URL parameter "q". Search phrase will be compared against task title or task description.
@@ -261,7 +434,7 @@ class OfferDeleteView(UsersNonBlockedTestMixin, DeleteView):
             messages.warning(self.request, "cannot delete accepted offer")
             return False
         user = self.request.user
-        in_allowed_group = user.groups.filter(name__in=OfferDeleteView.allowed_groups).exists()
+        in_allowed_group = has_any_group(user, OfferDeleteView.allowed_groups)
         return user == offer.contractor or in_allowed_group
 
     def handle_no_permission(self):
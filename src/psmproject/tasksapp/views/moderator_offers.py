@@ -10,6 +10,7 @@ from usersapp.helpers import SpecialUserMixin
 
 from ..forms.offers import OfferModeratorForm, OfferSearchForm
 from ..models import Offer
+from ..pagination import KeysetPaginationMixin
 from .common import SearchListView
 
 
@@ -44,7 +45,7 @@ class OfferListView(SpecialUserMixin, SearchListView):
         return queryset
 
 
-class OfferNewListView(SpecialUserMixin, ListView):
+class OfferNewListView(SpecialUserMixin, KeysetPaginationMixin, ListView):
     """
     This is a view class for displaying list of only newest offers. It can only be used by administrator, arbiter or
     moderator.
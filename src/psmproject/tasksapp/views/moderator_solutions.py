@@ -10,6 +10,7 @@ from usersapp.helpers import SpecialUserMixin
 
 from ..forms.solution import SolutionModeratorForm, SolutionSearchForm
 from ..models import Solution
+from ..pagination import KeysetPaginationMixin
 from .common import SearchListView
 
 
@@ -42,7 +43,7 @@ class SolutionListView(SpecialUserMixin, SearchListView):
         return queryset
 
 
-class SolutionNewListView(SpecialUserMixin, ListView):
+class SolutionNewListView(SpecialUserMixin, KeysetPaginationMixin, ListView):
     """
     This is a view class for displaying list of only newest solutions. It can only be used by administrator, arbiter or
     moderator.
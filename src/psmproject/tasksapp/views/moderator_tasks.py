@@ -12,6 +12,7 @@ from usersapp.helpers import SpecialUserMixin
 
 from ..forms.tasks import ModeratorUpdateTaskForm, TaskSearchModeratorForm
 from ..models import Task
+from ..pagination import KeysetPaginationMixin
 from .common import SearchListView
 
 User = get_user_model()
@@ -45,7 +46,7 @@ class TasksListView(SpecialUserMixin, SearchListView):
         return queryset
 
 
-class TasksNewListView(SpecialUserMixin, ListView):
+class TasksNewListView(SpecialUserMixin, KeysetPaginationMixin, ListView):
     """
     This View displays newest tasks. Result list is limited/paginated
     View enabled only for administrators, arbiters and moderators
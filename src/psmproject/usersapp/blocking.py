@@ -0,0 +1,78 @@
+"""
+Blocked status of users kept in cache, so UsersNonBlockedTestMixin checks a single key instead of joining groups.
+
+Each user has an entry telling whether the user is blocked. Entries of blocked users expire at the end of the ban and
+entries of other users after BLOCKED_USERS_CACHE_TIMEOUT seconds, so bans are lifted without waiting for the
+unblock_users task. A missing entry is loaded from the database: the user is blocked when in the blocked users group,
+unless all bans of the user have ended. The cache is Redis in production (shared by all processes) and local memory
+otherwise. BlockUserView and UnblockUserView write entries directly, other changes of groups drop them
+(see usersapp.signals).
+"""
+
+import math
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from .models import BlockedUser
+
+BLOCKED_KEY = "blocked-user:{user_id}"
+
+
+def blocked_key(user_id):
+    return BLOCKED_KEY.format(user_id=user_id)
+
+
+def seconds_until(end: Optional[datetime]):
+    """Cache timeout of a ban ending at end, None for bans without end."""
+    if end is None:
+        return None
+    return max(math.ceil((end - now()).total_seconds()), 0)
+
+
+def set_blocked(user_id, end: Optional[datetime] = None):
+    """Mark the user blocked until end, or without end."""
+    timeout = seconds_until(end)
+    if timeout == 0:
+        set_not_blocked(user_id)
+        return
+    cache.set(blocked_key(user_id), True, timeout)
+
+
+def set_not_blocked(user_id):
+    cache.set(blocked_key(user_id), False, settings.BLOCKED_USERS_CACHE_TIMEOUT)
+
+
+def forget_blocked(user_id):
+    cache.delete(blocked_key(user_id))
+
+
+def forget_blocked_many(user_ids):
+    cache.delete_many([blocked_key(user_id) for user_id in user_ids])
+
+
+def refresh_blocked(user):
+    """Load blocked status of the user from the database into cache and return it."""
+    if not user.groups.filter(name=settings.GROUP_NAMES.get("BLOCKED_USER")).exists():
+        set_not_blocked(user.pk)
+        return False
+    ends = list(BlockedUser.objects.filter(blocked_user=user).values_list("blocking_end_date", flat=True))
+    if not ends or None in ends:
+        # added to the group without a ban record, or blocked without end
+        set_blocked(user.pk)
+        return True
+    end = max(ends)
+    set_blocked(user.pk, end)
+    return end > now()
+
+
+def is_blocked(user):
+    if not user.is_authenticated:
+        return False
+    blocked = cache.get(blocked_key(user.pk))
+    if blocked is None:
+        return refresh_blocked(user)
+    return blocked
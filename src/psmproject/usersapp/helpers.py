@@ -1,24 +1,62 @@
-from typing import List
+from typing import Dict, FrozenSet, Iterable, List
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
 from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 
+from .blocking import is_blocked
 from .models import Skill
+from .skill_autocomplete import skill_autocomplete
 
 
 def skills_from_text(skills_str: List[str], create: bool = False) -> List[Skill]:
-    skills = []
-    for skill_str in skills_str:
-        if create:
-            skill, created = Skill.objects.get_or_create(skill__iexact=skill_str, defaults={"skill": skill_str})
-        else:
-            skill = Skill.objects.filter(skill__iexact=skill_str).first()
-        if skill:
-            skills.append(skill)
-
+    """
+    Resolves skill names (case-insensitive) with a single query, keeping the order of given names.
+    Unknown names are skipped, or created all at once with a single bulk insert when create is set.
+    """
+    if not skills_str:
+        return []
+    names = {skill_str.lower() for skill_str in skills_str}
+    found = {
+        skill.skill.lower(): skill
+        for skill in Skill.objects.annotate(skill_lower=Lower("skill")).filter(skill_lower__in=names)
+    }
+    if create:
+        missing = {}
+        for skill_str in skills_str:
+            if skill_str.lower() not in found:
+                missing.setdefault(skill_str.lower(), Skill(skill=skill_str))
+        if missing:
+            found.update(create_skills(missing))
+    return [found[skill_str.lower()] for skill_str in skills_str if skill_str.lower() in found]
+
+
+def create_skills(skills: Dict[str, Skill]) -> Dict[str, Skill]:
+    """
+    Inserts skills given by lowercase name in one query. Falls back to creating them one by one when some of them
+    were just created by another request.
+    """
+    try:
+        with transaction.atomic():
+            Skill.objects.bulk_create(skills.values())
+    except IntegrityError:
+        transaction.on_commit(skill_autocomplete.clear)
+        return {
+            name: Skill.objects.get_or_create(skill__iexact=skill.skill, defaults={"skill": skill.skill})[0]
+            for name, skill in skills.items()
+        }
+    # bulk_create sends no post_save signals, see usersapp.signals
+    transaction.on_commit(skill_autocomplete.clear)
+    if any(skill.pk is None for skill in skills.values()):
+        # database does not return primary keys of inserted rows
+        return {
+            skill.skill.lower(): skill
+            for skill in Skill.objects.annotate(skill_lower=Lower("skill")).filter(skill_lower__in=skills.keys())
+        }
     return skills
 
 
@@ -39,9 +77,7 @@ class SpecialUserMixin(UserPassesTestMixin):
     redirect_url = reverse_lazy("dashboard")
 
     def test_func(self):
-        user = self.request.user
-        in_allowed_group = user.groups.filter(name__in=self.allowed_groups).exists()
-        return in_allowed_group
+        return has_any_group(self.request.user, self.allowed_groups)
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -51,17 +87,13 @@ class SpecialUserMixin(UserPassesTestMixin):
 
 class UsersNonBlockedTestMixin(UserPassesTestMixin):
     """
-    Mixin to check if user is not blocked
+    Mixin to check if user is not blocked, the blocked status is read from cache (see usersapp.blocking)
     """
 
     redirect_url = reverse_lazy("dashboard")
-    blocked_group = [
-        settings.GROUP_NAMES.get("BLOCKED_USER"),
-    ]
 
     def test_func(self):
-        user = self.request.user
-        return not user.groups.filter(name__in=self.blocked_group).exists()
+        return not is_blocked(self.request.user)
 
     def handle_no_permission(self):
         if not self.request.user.is_authenticated:
@@ -70,5 +102,31 @@ class UsersNonBlockedTestMixin(UserPassesTestMixin):
         return HttpResponseRedirect(self.redirect_url)
 
 
+GROUP_NAMES_ATTR = "_group_names"
+
+
+def group_names(user) -> FrozenSet[str]:
+    """
+    Names of groups of the user, loaded with a single query and kept on the user instance. request.user lives as long
+    as the request, so all permission checks of a request (mixins, templates) share one query.
+    Kept names are dropped when groups of the instance change, see usersapp.signals.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    names = getattr(user, GROUP_NAMES_ATTR, None)
+    if names is None:
+        names = frozenset(user.groups.values_list("name", flat=True))
+        setattr(user, GROUP_NAMES_ATTR, names)
+    return names
+
+
+def clear_group_names(user):
+    user.__dict__.pop(GROUP_NAMES_ATTR, None)
+
+
 def has_group(user, group):
-    return user.groups.filter(name=group).exists()
+    return group in group_names(user)
+
+
+def has_any_group(user, groups: Iterable[str]):
+    return not group_names(user).isdisjoint(groups)
@@ -0,0 +1,89 @@
+"""
+Django command comparing the previous unblock_users job, checking and removing blocked users one by one, with
+the set-based one removing all users without an active ban with a single DELETE. Only the removal is timed, so no
+run of the job is scheduled for the generated bans.
+"""
+
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.timezone import now
+from usersapp.models import BlockedUser
+from usersapp.tasks import remove_expired_blocked_users
+
+User = get_user_model()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Measure unblock_users job for generated blocked users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000, help="number of generated blocked users")
+        parser.add_argument("--expired", type=float, default=0.5, help="fraction of users with ended bans")
+
+    def handle(self, *args, **options):
+        group = Group.objects.get(name=settings.GROUP_NAMES.get("BLOCKED_USER"))
+        for label, job in (("per-user loop", self.unblock_users_loop), ("set-based", remove_expired_blocked_users)):
+            with transaction.atomic():
+                self.generate_data(group, options["users"], options["expired"])
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries):
+                    start = time.perf_counter()
+                    job(group)
+                    seconds = time.perf_counter() - start
+                remaining = User.groups.through.objects.filter(group=group).count()
+                self.stdout.write(
+                    f"{label:13}: {seconds * 1000:10.1f} ms, {queries.count} queries, "
+                    f"{remaining} users left blocked"
+                )
+                transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark data rolled back."))
+
+    @staticmethod
+    def generate_data(group, nb_users, expired):
+        prefix = uuid4().hex[:8]
+        moderator = User.objects.create(username=f"bench_{prefix}")
+        users = User.objects.bulk_create(
+            (User(username=f"bench_{prefix}_{index}") for index in range(nb_users)), batch_size=10000
+        )
+        User.groups.through.objects.bulk_create(
+            (User.groups.through(user_id=user.id, group_id=group.id) for user in users), batch_size=10000
+        )
+        nb_expired = int(nb_users * expired)
+        BlockedUser.objects.bulk_create(
+            (
+                BlockedUser(
+                    blocked_user=user,
+                    blocking_user=moderator,
+                    reason="benchmark",
+                    blocking_end_date=now() + timedelta(days=-1 if index < nb_expired else 1),
+                )
+                for index, user in enumerate(users)
+            ),
+            batch_size=10000,
+        )
+
+    @staticmethod
+    def unblock_users_loop(group):
+        # previous implementation of usersapp.tasks.unblock_users
+        for user in group.user_set.all():
+            active_ban_exists = BlockedUser.objects.filter(
+                blocked_user=user, blocking_end_date__gt=now(), full_blocking=False
+            ).exists()
+            if not active_ban_exists:
+                group.user_set.remove(user)
@@ -6,6 +6,7 @@ import os
 from functools import wraps
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
 User = get_user_model()
@@ -43,6 +44,8 @@ class Command(BaseCommand):
                 user.set_password(user.password)
                 user.save()
 
+            call_command("rebuild_message_counts")
+            call_command("rebuild_task_search_index")
             self.stdout.write(self.style.SUCCESS("Fixtures loaded."))
 
         else:
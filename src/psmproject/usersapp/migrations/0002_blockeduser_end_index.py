@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usersapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blockeduser",
+            index=models.Index(fields=["blocking_end_date"], name="usersapp_blockeduser_end"),
+        ),
+    ]
@@ -175,6 +175,9 @@ class BlockedUser(models.Model):
     reason = models.TextField(verbose_name=_("reason"))
     full_blocking = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [models.Index(fields=["blocking_end_date"], name="usersapp_blockeduser_end")]
+
     def __str__(self):
         return _(f"Blocked user {self.blocked_user}")
 
@@ -1,7 +1,55 @@
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from tasksapp.utils import receiver_not_in_test
+
+from .blocking import forget_blocked
+from .helpers import clear_group_names
+from .models import BlockedUser, Skill
+from .skill_autocomplete import skill_autocomplete
+from .tasks import schedule_unblock_users
 
 
 def create_groups(sender, **kwargs):
     for group in settings.GROUP_NAMES:
         Group.objects.get_or_create(name=settings.GROUP_NAMES.get(group))
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def clear_skill_autocomplete(sender, **kwargs):
+    transaction.on_commit(skill_autocomplete.clear)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def clear_cached_group_names(sender, instance, action, reverse, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        clear_group_names(instance)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def forget_blocked_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    user_ids = [instance.pk] if not reverse else list(pk_set or ())
+    for user_id in user_ids:
+        # again after commit, as other requests could cache the old status in the meantime
+        forget_blocked(user_id)
+        transaction.on_commit(lambda user_id=user_id: forget_blocked(user_id))
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_blocked_of_new_user(sender, instance, created, **kwargs):
+    # ids of deleted users can be reused by new ones, which must not inherit their entries
+    if created:
+        forget_blocked(instance.pk)
+
+
+@receiver_not_in_test(post_save, sender=BlockedUser)
+def schedule_unblock_of_ban(sender, instance, **kwargs):
+    if instance.blocking_end_date and not instance.full_blocking:
+        end = instance.blocking_end_date
+        transaction.on_commit(lambda: schedule_unblock_users(end))
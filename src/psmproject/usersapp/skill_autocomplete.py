@@ -0,0 +1,69 @@
+import re
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+from .models import Skill
+
+WORD_SEPARATOR_RE = re.compile(r"[\s\-_/.]+")
+
+
+class SkillAutocomplete:
+    """
+    Process-local index of skill names for prefix lookups. Lowercase names, and words following the first one
+    (e.g. "rest" of "Django REST"), are kept in sorted lists of (key, skill id) pairs, so a prefix lookup is
+    a bisect to the first key not lower than the prefix followed by a scan while keys start with it.
+    The index is built on first use and dropped by usersapp.signals when a skill changes in this process.
+    Changes made by other processes are picked up when the index is rebuilt after max_age seconds.
+    """
+
+    def __init__(self, max_age=None):
+        self._max_age = max_age
+        self._index = None
+        self.built_at = None
+
+    @property
+    def max_age(self):
+        return self._max_age if self._max_age is not None else settings.SKILL_AUTOCOMPLETE_MAX_AGE
+
+    def build(self):
+        names: Dict[int, str] = {}
+        name_keys: List[Tuple[str, int]] = []
+        word_keys: List[Tuple[str, int]] = []
+        for skill_id, name in Skill.objects.values_list("id", "skill").iterator():
+            names[skill_id] = name
+            name_keys.append((name.lower(), skill_id))
+            word_keys.extend((word, skill_id) for word in WORD_SEPARATOR_RE.split(name.lower())[1:] if word)
+        name_keys.sort()
+        word_keys.sort()
+        self._index = (names, name_keys, word_keys)
+        self.built_at = time.monotonic()
+
+    def clear(self):
+        self._index = None
+        self.built_at = None
+
+    def ensure_fresh(self):
+        if self._index is None or time.monotonic() - self.built_at > self.max_age:
+            self.build()
+
+    def complete(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        """Skills (id, name) with name or one of its words starting with prefix, name matches first."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        self.ensure_fresh()
+        names, name_keys, word_keys = self._index
+        found: Dict[int, str] = {}
+        for keys in (name_keys, word_keys):
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(found) < limit and keys[position][0].startswith(prefix):
+                skill_id = keys[position][1]
+                found.setdefault(skill_id, names[skill_id])
+                position += 1
+        return list(found.items())
+
+
+skill_autocomplete = SkillAutocomplete()
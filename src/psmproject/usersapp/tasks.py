@@ -1,18 +1,71 @@
 from celery import shared_task
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef
 from django.utils.timezone import now
+from usersapp.blocking import forget_blocked_many, seconds_until
 from usersapp.models import BlockedUser
 
-BLOCKED_USER_GROUP = Group.objects.get(name=settings.GROUP_NAMES.get("BLOCKED_USER"))
+NEXT_UNBLOCK_KEY = "unblock-users:next"
+
+
+def expired_blocked_memberships(group):
+    """Memberships in the blocked users group of users without an active (not full) ban."""
+    active_bans = BlockedUser.objects.filter(
+        blocked_user=OuterRef("user_id"), blocking_end_date__gt=now(), full_blocking=False
+    )
+    return get_user_model().groups.through.objects.filter(group=group).exclude(Exists(active_bans))
+
+
+def next_ban_end():
+    """End of the earliest active (not full) ban, read from the blocking_end_date index."""
+    return BlockedUser.objects.filter(blocking_end_date__gt=now(), full_blocking=False).aggregate(
+        end=Min("blocking_end_date")
+    )["end"]
+
+
+def schedule_unblock_users(end):
+    """
+    Run unblock_users at end, unless a run is already scheduled before it. The pending run is kept in cache until
+    its time, so only the earliest ban end waits in the broker and later ones are picked up by that run. A pending
+    time already passed belongs to the run calling this, which must schedule the next one.
+    """
+    current = now()
+    if end is None or end <= current:
+        return
+    scheduled = cache.get(NEXT_UNBLOCK_KEY)
+    if scheduled is not None and current < scheduled <= end:
+        return
+    cache.set(NEXT_UNBLOCK_KEY, end, seconds_until(end))
+    unblock_users.apply_async(eta=end)
+
+
+def remove_expired_blocked_users(group):
+    """
+    Remove users without an active ban from the blocked users group with one DELETE over the user-group table,
+    instead of checking and removing users one by one. Return ids of unblocked users.
+    """
+    with transaction.atomic():
+        memberships = expired_blocked_memberships(group)
+        user_ids = list(memberships.values_list("user_id", flat=True))
+        if user_ids:
+            # bulk delete sends no m2m_changed signals, so cached blocked status is dropped here
+            memberships.delete()
+            transaction.on_commit(lambda: forget_blocked_many(user_ids))
+    return user_ids
 
 
 @shared_task
 def unblock_users():
-    for user in BLOCKED_USER_GROUP.user_set.all():
-        active_ban_exists = BlockedUser.objects.filter(
-            blocked_user=user, blocking_end_date__gt=now(), full_blocking=False
-        ).exists()
-
-        if not active_ban_exists:
-            BLOCKED_USER_GROUP.user_set.remove(user)
+    """
+    Unblock users whose bans ended, then schedule the run for the next ban end. Return number of unblocked users.
+    """
+    group = Group.objects.filter(name=settings.GROUP_NAMES.get("BLOCKED_USER")).first()
+    if group is None:
+        return 0
+    user_ids = remove_expired_blocked_users(group)
+    schedule_unblock_users(next_ban_end())
+    return len(user_ids)
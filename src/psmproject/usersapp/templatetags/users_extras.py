@@ -1,8 +1,9 @@
 from django import template
+from usersapp import helpers
 
 register = template.Library()
 
 
 @register.filter(name="has_group")
 def has_group(user, group_name):
-    return user.groups.filter(name=group_name).exists()
+    return helpers.has_group(user, group_name)
@@ -1,5 +1,17 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, Group
+from django.db import connection
 from django.test import TestCase
-from usersapp.helpers import skills_from_text, skills_to_text
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from factories.factories import TaskFactory, UserFactory
+from usersapp.helpers import (
+    group_names,
+    has_any_group,
+    has_group,
+    skills_from_text,
+    skills_to_text,
+)
 from usersapp.models import Skill
 
 
@@ -40,6 +52,33 @@ class TestSkillsFromText(TestCase):
 
         self.assertEqual(existing.id, skills[existing_index].id)
 
+    def test_should_resolve_existing_skills_case_insensitive_with_one_query(self):
+        """
+        Test that checks if helper function finds all existing skills, ignoring letter case, in a single query
+        """
+        existing = [Skill.objects.create(skill=skill_str) for skill_str in self.skills_str]
+
+        with self.assertNumQueries(1):
+            skills = skills_from_text([skill_str.upper() for skill_str in reversed(self.skills_str)] + ["unknown"])
+
+        self.assertListEqual(skills, list(reversed(existing)))
+
+    def test_should_create_missing_skills_with_one_insert(self):
+        """
+        Test that checks if helper function creates all unknown skills at once, once per name ignoring letter case
+        """
+        existing = Skill.objects.create(skill="python")
+
+        with CaptureQueriesContext(connection) as queries:
+            skills = skills_from_text(["Python", "java", "Django", "JAVA"], create=True)
+
+        inserts = [query for query in queries.captured_queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual([skill.skill for skill in skills], ["python", "java", "Django", "java"])
+        self.assertEqual(skills[0], existing)
+        self.assertTrue(all(skill.pk for skill in skills))
+        self.assertEqual(Skill.objects.count(), 3)
+
 
 class TestSkillsToText(TestCase):
     def setUp(self):
@@ -69,3 +108,55 @@ class TestSkillsToText(TestCase):
 
         skills_as_string = skills_to_text([])
         self.assertListEqual(skills_as_string, [])
+
+
+class TestGroupNames(TestCase):
+    """
+    Test helper functions resolving groups of the user
+    """
+
+    def setUp(self):
+        self.moderator_group = Group.objects.get(name=settings.GROUP_NAMES.get("MODERATOR"))
+        self.user = UserFactory.create(username="group_names_user")
+        self.user.groups.add(self.moderator_group)
+
+    def test_should_load_group_names_once_per_user_instance(self):
+        """
+        Test that checks if repeated group checks of the same user instance run a single query
+        """
+        with self.assertNumQueries(1):
+            self.assertTrue(has_group(self.user, settings.GROUP_NAMES.get("MODERATOR")))
+            self.assertFalse(has_group(self.user, settings.GROUP_NAMES.get("ARBITER")))
+            self.assertTrue(has_any_group(self.user, settings.GROUP_NAMES.values()))
+
+    def test_should_reload_group_names_after_groups_change(self):
+        """
+        Test that checks if group names kept on the user instance are dropped when the user groups change
+        """
+        blocked = settings.GROUP_NAMES.get("BLOCKED_USER")
+        self.assertFalse(has_group(self.user, blocked))
+
+        self.user.groups.add(Group.objects.get(name=blocked))
+
+        self.assertEqual(group_names(self.user), {settings.GROUP_NAMES.get("MODERATOR"), blocked})
+
+    def test_should_return_no_groups_for_anonymous_user(self):
+        """
+        Test that checks if anonymous user has no groups and no query is run
+        """
+        with self.assertNumQueries(0):
+            self.assertEqual(group_names(AnonymousUser()), frozenset())
+
+    def test_should_query_groups_once_per_request(self):
+        """
+        Test that checks if permission mixins and navbar template of a page share a single group query
+        """
+        task = TaskFactory.create()
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("task-moderator-detail", kwargs={"pk": task.id}))
+
+        self.assertEqual(response.status_code, 200)
+        group_queries = [query for query in queries.captured_queries if '"auth_group"' in query["sql"]]
+        self.assertEqual(len(group_queries), 1)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from factories.factories import UserFactory
+from usersapp.blocking import blocked_key, is_blocked, set_blocked
+from usersapp.models import BlockedUser
+
+
+class TestBlockedUsersCache(TestCase):
+    """
+    Test case for blocked status of users kept in cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.blocked_group = Group.objects.get(name=settings.GROUP_NAMES.get("BLOCKED_USER"))
+        self.user = UserFactory.create(username="blocking_user")
+        self.administrator = UserFactory.create(username="blocking_administrator")
+        self.administrator.groups.add(Group.objects.get(name=settings.GROUP_NAMES.get("ADMINISTRATOR")))
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def block(self, days=4):
+        self.client.force_login(self.administrator)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("block-user"),
+                {"blocked_user": self.user.id, "reason": "test", "blocking_end_date": now() + timedelta(days=days)},
+            )
+
+    def test_should_check_blocked_user_without_queries(self):
+        """
+        Test checks that blocking a user stores the blocked status, which is then checked without database queries.
+        """
+        self.block()
+        self.assertFalse(is_blocked(self.administrator))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_blocked(self.user))
+            self.assertFalse(is_blocked(self.administrator))
+
+    def test_should_keep_blocked_status_until_end_of_ban(self):
+        """
+        Test checks that the blocked status expires together with the ban.
+        """
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.block(days=2)
+
+        cache_set.assert_called_once()
+        key, blocked, timeout = cache_set.call_args.args
+        self.assertEqual((key, blocked), (blocked_key(self.user.id), True))
+        self.assertAlmostEqual(timeout, 2 * 24 * 3600, delta=60)
+
+    def test_should_not_block_user_when_all_bans_ended(self):
+        """
+        Test checks that a user still in the blocked users group is not blocked once the bans ended.
+        """
+        self.user.groups.add(self.blocked_group)
+        BlockedUser.objects.create(
+            blocked_user=self.user, blocking_user=self.administrator, reason="test", blocking_end_date=now()
+        )
+
+        self.assertFalse(is_blocked(self.user))
+
+    def test_should_refresh_status_when_user_is_added_to_blocked_group(self):
+        """
+        Test checks that a cached "not blocked" status is dropped when the user is added to the blocked users group.
+        """
+        self.assertFalse(is_blocked(self.user))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blocked_group.user_set.add(self.user)
+
+        self.assertTrue(is_blocked(self.user))
+
+    def test_should_unblock_user(self):
+        """
+        Test checks that unblocking a user before the end of the ban lets the user in at once.
+        """
+        self.block()
+        blocked_user_record = BlockedUser.objects.get(blocked_user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("unblock-user", kwargs={"pk": blocked_user_record.id}))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_blocked(self.user))
+
+    def test_should_not_keep_blocked_status_for_new_user(self):
+        """
+        Test checks that a new user does not get the blocked status of a previous user with the same id.
+        """
+        user_id = self.user.id
+        set_blocked(user_id)
+        self.user.delete()
+
+        new_user = UserFactory.create(id=user_id, username="blocking_new_user")
+
+        self.assertFalse(is_blocked(new_user))
+
+    def test_should_redirect_blocked_user_from_write_views(self):
+        """
+        Test checks that a blocked user cannot open views for non-blocked users.
+        """
+        self.block()
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("task-create"))
+
+        self.assertRedirects(response, reverse("dashboard"))
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.timezone import now
+from factories.factories import UserFactory
+from usersapp.blocking import is_blocked, set_blocked
+from usersapp.models import BlockedUser
+from usersapp.tasks import schedule_unblock_users, unblock_users
+
+
+class TestUnblockUsersTask(TestCase):
+    """
+    Test case for the task removing users with ended bans from the blocked users group.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.blocked_group = Group.objects.get(name=settings.GROUP_NAMES.get("BLOCKED_USER"))
+        self.moderator = UserFactory.create(username="unblock_moderator")
+        apply_async = patch.object(unblock_users, "apply_async")
+        self.apply_async = apply_async.start()
+        self.addCleanup(apply_async.stop)
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def blocked_user(self, username, days):
+        user = UserFactory.create(username=username)
+        user.groups.add(self.blocked_group)
+        BlockedUser.objects.create(
+            blocked_user=user, blocking_user=self.moderator, reason="test", blocking_end_date=now() + timedelta(days)
+        )
+        return user
+
+    def test_should_remove_only_users_without_active_ban(self):
+        """
+        Test checks that users whose bans ended are removed from the blocked users group and others stay there.
+        """
+        expired = self.blocked_user("unblock_expired", days=-1)
+        active = self.blocked_user("unblock_active", days=1)
+        without_ban = UserFactory.create(username="unblock_without_ban")
+        without_ban.groups.add(self.blocked_group)
+
+        self.assertEqual(unblock_users(), 2)
+
+        self.assertEqual(list(self.blocked_group.user_set.all()), [active])
+        self.assertFalse(expired.groups.exists())
+
+    def test_should_unblock_users_with_constant_number_of_queries(self):
+        """
+        Test checks that the number of queries does not depend on the number of blocked users.
+        """
+        for index in range(5):
+            self.blocked_user(f"unblock_expired_{index}", days=-1)
+
+        # group, savepoint, users to unblock, delete, savepoint release, next ban end
+        with self.assertNumQueries(6):
+            unblock_users()
+
+    def test_should_drop_cached_blocked_status_of_unblocked_users(self):
+        """
+        Test checks that unblocked users are not kept blocked by their cached status.
+        """
+        user = UserFactory.create(username="unblock_cached")
+        user.groups.add(self.blocked_group)
+        set_blocked(user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unblock_users()
+
+        self.assertFalse(is_blocked(user))
+
+    def test_should_do_nothing_without_blocked_users_group(self):
+        """
+        Test checks that the task works on a database without the blocked users group.
+        """
+        self.blocked_group.delete()
+
+        self.assertEqual(unblock_users(), 0)
+
+    def test_should_schedule_next_run_at_end_of_earliest_active_ban(self):
+        """
+        Test checks that after unblocking users the task schedules itself at the end of the earliest active ban.
+        """
+        self.blocked_user("unblock_expired", days=-1)
+        self.blocked_user("unblock_later", days=2)
+        earliest = self.blocked_user("unblock_earliest", days=1)
+
+        unblock_users()
+
+        self.apply_async.assert_called_once_with(eta=BlockedUser.objects.get(blocked_user=earliest).blocking_end_date)
+
+    def test_should_schedule_next_ban_end_from_scheduled_run(self):
+        """
+        Test checks that the run started at the scheduled ban end schedules the end of the next ban, although the
+        pending run is still kept in cache.
+        """
+        first = self.blocked_user("unblock_first", days=1)
+        second = self.blocked_user("unblock_second", days=2)
+        first_end = BlockedUser.objects.get(blocked_user=first).blocking_end_date
+        schedule_unblock_users(first_end)
+
+        with patch("usersapp.tasks.now", return_value=first_end):
+            self.assertEqual(unblock_users(), 1)
+
+        self.assertEqual(
+            [call.kwargs["eta"] for call in self.apply_async.call_args_list],
+            [first_end, BlockedUser.objects.get(blocked_user=second).blocking_end_date],
+        )
+
+    def test_should_keep_only_earliest_scheduled_run(self):
+        """
+        Test checks that a run is scheduled only for ends before the already scheduled one, and not for past ends.
+        """
+        end = now() + timedelta(hours=2)
+
+        for scheduled_end in (end, end + timedelta(hours=1), end - timedelta(hours=1), now() - timedelta(hours=1)):
+            schedule_unblock_users(scheduled_end)
+
+        self.assertEqual(
+            [call.kwargs["eta"] for call in self.apply_async.call_args_list], [end, end - timedelta(hours=1)]
+        )
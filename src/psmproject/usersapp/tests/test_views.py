@@ -2,11 +2,12 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth.models import Group
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.utils.timezone import now
 from factories.factories import UserFactory
-from usersapp.models import BlockedUser
+from usersapp.models import BlockedUser, Skill
+from usersapp.skill_autocomplete import skill_autocomplete
 
 client = Client()
 
@@ -294,3 +295,62 @@ class TestUnblockUserView(TestCase):
         response = self.client.post(reverse("unblock-user", kwargs={"pk": self.blocked_user.id}))
 
         self.assertRedirects(response, reverse("dashboard"))
+
+
+class TestSkillAutocompleteView(TestCase):
+    """
+    Test case for the skill autocomplete view.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        skill_autocomplete.clear()
+        self.addCleanup(skill_autocomplete.clear)
+        self.django = Skill.objects.create(skill="Django")
+        self.django_rest = Skill.objects.create(skill="Django REST")
+        self.rest_api = Skill.objects.create(skill="REST API")
+        self.client.force_login(UserFactory.create())
+
+    def complete(self, prefix):
+        response = self.client.get(reverse("skill-autocomplete"), {"q": prefix})
+        self.assertEqual(response.status_code, 200)
+        return [skill["skill"] for skill in response.json()["skills"]]
+
+    def test_should_return_skills_starting_with_prefix_ignoring_case(self):
+        """
+        Test checks that skills with name starting with the prefix are returned, whatever the letter case.
+        """
+        self.assertEqual(self.complete("DJ"), ["Django", "Django REST"])
+        self.assertEqual(self.complete("x"), [])
+        self.assertEqual(self.complete(""), [])
+
+    def test_should_return_word_matches_after_name_matches(self):
+        """
+        Test checks that skills with a later word starting with the prefix follow skills whose name starts with it.
+        """
+        self.assertEqual(self.complete("rest"), ["REST API", "Django REST"])
+
+    @override_settings(SKILL_AUTOCOMPLETE_LIMIT=1)
+    def test_should_limit_number_of_suggestions(self):
+        """
+        Test checks that no more skills than configured limit are returned.
+        """
+        self.assertEqual(self.complete("django"), ["Django"])
+
+    def test_should_suggest_skill_added_after_index_was_built(self):
+        """
+        Test checks that the index is rebuilt after a skill is created.
+        """
+        self.complete("py")
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(skill="Python")
+
+        self.assertEqual(self.complete("py"), ["Python"])
+
+    def test_should_redirect_if_not_logged_in(self):
+        """
+        Test checks that suggestions are available only to logged in users.
+        """
+        self.client.logout()
+        response = self.client.get(reverse("skill-autocomplete"), {"q": "dj"})
+        self.assertEqual(response.status_code, 302)
@@ -6,6 +6,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("profile/", views.ProfileView.as_view(), name="profile"),
     path("accounts/", include("allauth.urls")),
+    path("skills/", views.SkillAutocompleteView.as_view(), name="skill-autocomplete"),
     path("set_role/<role_id>", views.SetRoleView.as_view(), name="set-role"),
     path("block_user/", views.BlockUserView.as_view(), name="block-user"),
     path("block_user/<int:pk>", views.BlockedUserDetailView.as_view(), name="blocked-user-detail"),
@@ -4,14 +4,16 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import Group
 from django.db import transaction
 from django.db.models import Q
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from django.urls import reverse, reverse_lazy
 from django.utils.timezone import now
 from django.views.generic import CreateView, DetailView, ListView, TemplateView, View
 
+from .blocking import refresh_blocked, set_not_blocked
 from .forms import BlockUserForm
 from .helpers import SpecialUserMixin
 from .models import BlockedUser
+from .skill_autocomplete import skill_autocomplete
 
 
 class ProfileView(LoginRequiredMixin, TemplateView):
@@ -25,6 +27,17 @@ class ProfileView(LoginRequiredMixin, TemplateView):
     template_name = "usersapp/profile.html"
 
 
+class SkillAutocompleteView(LoginRequiredMixin, View):
+    """
+    JSON list of skills with name or one of its words starting with "q" parameter, served from the in-process
+    prefix index (see usersapp.skill_autocomplete).
+    """
+
+    def get(self, request, *args, **kwargs):
+        skills = skill_autocomplete.complete(request.GET.get("q", ""), settings.SKILL_AUTOCOMPLETE_LIMIT)
+        return JsonResponse({"skills": [{"id": skill_id, "skill": name} for skill_id, name in skills]})
+
+
 class SetRoleView(View):
     def post(self, request, *args, **kwargs):
         role_id = kwargs["role_id"]
@@ -64,7 +77,9 @@ class BlockUserView(SpecialUserMixin, CreateView):
             form.instance.blocking_end_date = None
         else:
             blocked_user.groups.add(Group.objects.get(name=settings.GROUP_NAMES.get("BLOCKED_USER")))
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        transaction.on_commit(lambda: refresh_blocked(blocked_user))
+        return response
 
 
 class BlockedUserDetailView(SpecialUserMixin, DetailView):
@@ -135,5 +150,7 @@ class UnblockUserView(SpecialUserMixin, View):
                 Group.objects.get(name=settings.GROUP_NAMES.get("BLOCKED_USER"))
             )
             blocked_user_record.save()
+            user_id = blocked_user_record.blocked_user_id
+            transaction.on_commit(lambda: set_not_blocked(user_id))
             messages.success(self.request, self.get_success_message(), extra_tags="success")
         return HttpResponseRedirect(reverse(self.success_url))